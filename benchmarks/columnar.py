@@ -0,0 +1,86 @@
+"""
+Time vectorized activity analytics on a synthetic columnar message store
+
+Builds N messages directly as arrays, saves and memory-maps them, runs the
+MessageStore aggregations and compares with a plain Python loop over message
+dicts on a sample. Requires numpy.
+
+    python benchmarks/columnar.py --messages 50000000 --sample 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+
+from slack.columnar import MessageStore  # noqa: E402
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f'{label:<45} {time.perf_counter() - start:8.3f}s')
+    return result
+
+
+def synthetic(messages: int, users: int, channels: int, seed: int = 0) -> MessageStore:
+    rng = np.random.default_rng(seed)
+    start = 1.5e9
+    ts = np.sort(rng.uniform(start, start + 365 * 86400, messages))
+    # a third of the messages are replies, posted within a day of their parent
+    thread_ts = np.full(messages, np.nan)
+    replies = rng.random(messages) < 0.33
+    thread_ts[replies] = np.floor(ts[replies] - rng.exponential(1800, replies.sum()).clip(1, 86400))
+    columns = {
+        'ts': ts,
+        'user': (rng.zipf(1.3, messages) % users).astype(np.int32),
+        'channel': rng.integers(0, channels, messages, dtype=np.int32),
+        'reply_count': np.where(rng.random(messages) < 0.05, rng.integers(1, 20, messages), 0).astype(np.int32),
+        'thread_ts': thread_ts,
+    }
+    return MessageStore(columns, [f'U{n:08d}' for n in range(users)], [f'C{n:08d}' for n in range(channels)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=10000000)
+    parser.add_argument('--sample', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--channels', type=int, default=2000)
+    args = parser.parse_args()
+
+    store = timed(f'generate {args.messages} messages', lambda: synthetic(args.messages, args.users, args.channels))
+
+    with tempfile.TemporaryDirectory() as path:
+        timed('save', lambda: store.save(path))
+        store = timed('load (mmap)', lambda: MessageStore.load(path))
+
+        timed('messages_per_hour', store.messages_per_hour)
+        timed('hour_of_day', store.hour_of_day)
+        timed('per_channel', store.per_channel)
+        timed('replies_per_channel', store.replies_per_channel)
+        timed('top_posters', store.top_posters)
+        timed('top_posters in one channel', lambda: store.top_posters(channel=store.channels[0]))
+        timed('reply_latency_stats', store.reply_latency_stats)
+
+        sample = min(args.sample, len(store))
+        dicts = [
+            {'ts': f'{store.ts[i]:.6f}', 'user': store.users[store.user[i]], 'channel': store.channels[store.channel[i]]}
+            for i in range(sample)
+        ]
+        print(f'--- {sample} message dicts, Python loop vs store')
+        timed('loop: messages per hour', lambda: Counter(int(float(m['ts'])) // 3600 for m in dicts))
+        timed('loop: top posters', lambda: Counter(m['user'] for m in dicts).most_common(10))
+        small = MessageStore.from_messages(dicts)
+        timed('store: messages_per_hour', small.messages_per_hour)
+        timed('store: top_posters', small.top_posters)
+        del store, small
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare per-message encode cost of chat.postMessage with and without a compiled MessageTemplate
+
+The baseline mirrors what an alerting loop does today: build the attachments,
+serialize them to JSON, merge the kwargs and form-encode the whole payload.
+
+    python benchmarks/message_template.py --messages 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from request_overhead import CannedTransport  # noqa: E402
+from slack.endpoints import encode_params  # noqa: E402
+from slack.slack import SlackApiManager  # noqa: E402
+from slack.template import MessageTemplate, Slot, render_params  # noqa: E402
+
+
+def attachments(title: str, value: str) -> list:
+    return [{
+        'fallback': f'{title}: {value}',
+        'color': 'danger',
+        'pretext': 'Production alert',
+        'title': title,
+        'title_link': 'https://status.example.com/incidents',
+        'fields': [
+            {'title': 'Service', 'value': 'api-gateway', 'short': True},
+            {'title': 'Region', 'value': 'eu-west-1', 'short': True},
+            {'title': 'Value', 'value': value, 'short': True},
+            {'title': 'Runbook', 'value': 'https://wiki.example.com/runbooks/api-gateway', 'short': False},
+        ],
+        'footer': 'monitoring',
+        'mrkdwn_in': ['text', 'pretext'],
+    }]
+
+
+def per_message(label: str, func, messages: int):
+    start = time.perf_counter()
+    for n in range(messages):
+        func(n)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {elapsed / messages * 1e6:8.2f} us/message  {messages / elapsed:10.0f} messages/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    template = MessageTemplate(
+        channel=Slot('channel'),
+        text=Slot('text'),
+        as_user=False,
+        username='monitoring',
+        icon_emoji=':rotating_light:',
+        attachments=[dict(attachments('', '')[0], fallback=Slot('fallback'), title=Slot('title'), fields=[
+            {'title': 'Service', 'value': 'api-gateway', 'short': True},
+            {'title': 'Region', 'value': 'eu-west-1', 'short': True},
+            {'title': 'Value', 'value': Slot('value'), 'short': True},
+            {'title': 'Runbook', 'value': 'https://wiki.example.com/runbooks/api-gateway', 'short': False},
+        ])],
+    )
+
+    def values(n: int) -> dict:
+        title = f'p99 latency above threshold #{n}'
+        value = f'{n % 1000} ms'
+        return {'channel': 'C0123456789', 'text': f'Alert {n}', 'title': title, 'value': value,
+                'fallback': f'{title}: {value}'}
+
+    def baseline(n: int):
+        v = values(n)
+        data = {'channel': v['channel'], 'text': v['text']}
+        data.update(as_user=False, username='monitoring', icon_emoji=':rotating_light:',
+                    attachments=json.dumps(attachments(v['title'], v['value']), ensure_ascii=False,
+                                           separators=(',', ':')))
+        return encode_params(data)
+
+    def compiled(n: int):
+        return template.render(**values(n))
+
+    expected = encode_params(render_params(template, **values(7)))
+    if compiled(7) != expected or baseline(7) != expected:
+        sys.exit('template and baseline encodings differ')
+
+    per_message('encode: dict merge + json + urlencode', baseline, args.messages)
+    per_message('encode: compiled template', compiled, args.messages)
+    per_message('slot values only (lower bound)', values, args.messages)
+
+    manager = SlackApiManager('xoxb-bench', transport=CannedTransport({'ok': True, 'ts': '1.000000'}))
+    calls = args.messages // 4
+    per_message('postMessage with canned response', lambda n: manager.chat.postMessage(
+        'C0123456789', f'Alert {n}', as_user=False, username='monitoring', icon_emoji=':rotating_light:',
+        attachments=json.dumps(attachments(f'p99 latency above threshold #{n}', f'{n % 1000} ms'),
+                               ensure_ascii=False, separators=(',', ':'))), calls)
+    per_message('postTemplate with canned response', lambda n: manager.chat.postTemplate(template, **values(n)), calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark ParallelStage throughput for a CPU-bound transform at increasing worker counts
+
+    python benchmarks/pipeline.py --messages 500000 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from slack.pipeline import ParallelStage, flatten_attachments  # noqa: E402
+from slack.search import tokenize  # noqa: E402
+
+
+def transform(message: dict) -> dict:
+    message = flatten_attachments(message)
+    message['tokens'] = len(tokenize(message['text'] + message.get('attachments_text', '')))
+    return message
+
+
+def corpus(messages: int):
+    for i in range(messages):
+        yield {
+            'ts': f'{1500000000 + i}.000000',
+            'user': f'U{i % 1000:05d}',
+            'text': f'message {i} with <@U{i % 1000:05d}> and some more words ' * 4,
+            'attachments': [{'title': 'alert', 'text': 'disk usage above threshold' * 3,
+                             'fields': [{'title': 'host', 'value': f'web-{i % 50}'}]}]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=500000)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for message in corpus(args.messages):
+        transform(message)
+    baseline = time.perf_counter() - start
+    print(f'{"in-process":<12} {args.messages / baseline:12.0f} msg/s')
+
+    for workers in args.workers:
+        with ParallelStage(transform, workers=workers, batch_size=args.batch_size) as stage:
+            start = time.perf_counter()
+            count = sum(1 for _ in stage.run(corpus(args.messages)))
+            elapsed = time.perf_counter() - start
+        assert count == args.messages
+        print(f'{workers:>3} workers  {args.messages / elapsed:12.0f} msg/s  '
+              f'speedup {baseline / elapsed:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Replay a cassette against a local stand-in and report throughput, latency and memory
+
+Record real traffic by passing a RecordingTransport to SlackApiManager, or let
+the script synthesise a cassette with Poisson arrivals:
+
+    python benchmarks/replay.py traffic.ndjson --speed 10 --concurrency 32
+    python benchmarks/replay.py synthetic.ndjson --synthesize 20000 --span 600 --speed 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from slack.replay import CASSETTE_VERSION, Cassette, replay  # noqa: E402
+
+
+def synthesize(path: str, calls: int, span: float, seed: int = 0):
+    rng = random.Random(seed)
+    channels = [f'C{n:08d}' for n in range(200)]
+    rate = calls / span
+    at = 0.0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'cassette': CASSETTE_VERSION, 'recorded': time.time()}) + '\n')
+        for n in range(calls):
+            at += rng.expovariate(rate)
+            channel = rng.choice(channels)
+            if n % 4 == 0:
+                method = 'chat.postMessage'
+                params = {'channel': channel, 'text': f'alert {n}', 'as_user': 'false'}
+                body = {'ok': True, 'channel': channel, 'ts': f'{1600000000 + n}.000100'}
+                elapsed = rng.uniform(0.05, 0.25)
+            else:
+                method = 'channels.history'
+                params = {'channel': channel, 'count': '100', 'inclusive': 'false', 'oldest': '0', 'unreads': 'false'}
+                body = {'ok': True, 'has_more': False, 'messages': [
+                    {'type': 'message', 'user': f'U{i:08d}', 'text': f'message {i} ' * 8, 'ts': f'{1600000000 + i}.000100'}
+                    for i in range(rng.randint(10, 100))
+                ]}
+                elapsed = rng.uniform(0.1, 0.6)
+
+            f.write(json.dumps({
+                'at': round(at, 6), 'verb': 'POST', 'method': method, 'params': params,
+                'status': 200, 'retry_after': None, 'body': json.dumps(body), 'elapsed': round(elapsed, 6)
+            }) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cassette')
+    parser.add_argument('--speed', type=float, default=10.0)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--synthesize', type=int, default=0, help='write a synthetic cassette with this many calls first')
+    parser.add_argument('--span', type=float, default=600.0, help='seconds covered by the synthetic cassette')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc')
+    args = parser.parse_args()
+
+    if args.synthesize:
+        synthesize(args.cassette, args.synthesize, args.span)
+
+    cassette = Cassette(args.cassette)
+    print(f'{len(cassette)} calls over {cassette.duration:.0f}s, replaying at {args.speed:g}x '
+          f'on {args.concurrency} threads')
+
+    report = replay(cassette, speed=args.speed, concurrency=args.concurrency, trace_memory=not args.no_memory)
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark MessageIndex ingest, save/load and query latency on a synthetic corpus
+
+    python benchmarks/search_index.py --messages 2000000
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from slack.search import MessageIndex  # noqa: E402
+
+
+def corpus(messages: int, channels: int, vocabulary: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = [f'w{i}' for i in range(vocabulary)]
+    # zipf-like word frequencies, like real chat text
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary)))
+    texts = [
+        ' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(3, 20)))
+        for _ in range(min(messages, 100000))
+    ]
+    ts = 1500000000.0
+    for _ in range(messages):
+        ts += rng.random()
+        yield f'C{rng.randrange(channels):05d}', {'ts': f'{ts:.6f}', 'text': rng.choice(texts)}
+
+
+def timed(label: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f'{label:<28} {time.perf_counter() - start:10.3f} s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2000000)
+    parser.add_argument('--channels', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    index = MessageIndex()
+    timed(f'ingest {args.messages} messages', index.ingest_stream,
+          corpus(args.messages, args.channels, args.vocabulary))
+
+    with tempfile.TemporaryDirectory() as path:
+        timed('save', index.save, path)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f'{"index size":<28} {size / 2 ** 20:10.1f} MiB')
+        index.close()
+
+        index = timed('load', MessageIndex.load, path)
+
+        rng = random.Random(1)
+        queries = [
+            ('term', {'query': f'w{rng.randrange(2000)}', 'limit': 20}),
+            ('two terms', {'query': f'w{rng.randrange(200)} w{rng.randrange(200)}', 'limit': 20}),
+            ('phrase', {'phrase': f'w{rng.randrange(50)} w{rng.randrange(50)}', 'limit': 20}),
+            ('term in channel', {'query': f'w{rng.randrange(2000)}', 'channel': 'C00001'}),
+            ('term in time range', {'query': f'w{rng.randrange(2000)}',
+                                    'oldest': 1500000000.0, 'latest': 1500100000.0}),
+        ]
+        for label, kwargs in queries:
+            start = time.perf_counter()
+            for _ in range(args.queries):
+                index.search(**kwargs)
+            elapsed = (time.perf_counter() - start) / args.queries
+            print(f'{"query: " + label:<28} {elapsed * 1000:10.3f} ms')
+
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Stress one shared SlackApiManager from hundreds of threads against a local stand-in
+
+Every response echoes the requested channel, so any cross-talk between threads
+(shared sessions, shared mutable state) shows up as a mismatch.
+
+    python benchmarks/stress_threads.py --threads 300 --calls 50
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from slack.slack import SlackApiManager  # noqa: E402
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        channel = params.get('channel', [''])[0]
+        body = json.dumps({'ok': True, 'channel': {'id': channel, 'name': f'name-{channel}'}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=300)
+    parser.add_argument('--calls', type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    manager = SlackApiManager('xoxb-stress', url=f'http://127.0.0.1:{server.server_port}/api/')
+    errors = []
+
+    def worker(n: int):
+        for i in range(args.calls):
+            channel = f'C{n:04d}{i:04d}'
+            result = manager.channel.info(channel)
+            if result.get('id') != channel:
+                errors.append((channel, result))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(worker, range(args.threads)))
+    elapsed = time.perf_counter() - start
+
+    total = args.threads * args.calls
+    print(f'{total} calls on {args.threads} threads in {elapsed:.2f}s ({total / elapsed:.0f} calls/s)')
+    print(f'mismatched responses: {len(errors)}')
+
+    manager.transport.close()
+    server.shutdown()
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
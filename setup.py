@@ -35,6 +35,10 @@ setup(
     include_package_data=True,
     author='tmp',
     install_requires=install_requires,
+    extras_require={
+        # slack.columnar.MessageStore
+        'columnar': ['numpy'],
+    },
     dependency_links=dependency_links,
     author_email=''
 )
@@ -0,0 +1,130 @@
+"""
+Concurrent dispatch of heterogeneous Slack API calls
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Union
+
+from .tracing import propagate, span
+from .transport import SlackApiError
+
+
+class CallResult:
+    __slots__ = ('method', 'value', 'error')
+
+    def __init__(self, method: str, value: Any = None, error: Union[Exception, None] = None):
+        """
+        Outcome of one dispatched call
+
+        Args:
+            method (str) : Name of the called method, e.g. 'user.info'
+            value : Return value of the method
+            error (Exception or None) : Exception raised by the call or error reported by Slack
+        """
+        self.method = method
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.ok:
+            return f'CallResult({self.method!r}, value={self.value!r})'
+        return f'CallResult({self.method!r}, error={self.error!r})'
+
+
+class BatchDispatcher:
+    def __init__(self, manager, max_workers: int = 8):
+        """
+        Run independent SlackApiManager calls concurrently
+
+        Calls share the manager's transport, so they use its connection pool and
+        rate limiter. Instead of the log-and-return-empty behaviour of the plain
+        methods, the response of every call is inspected and failures are
+        reported per call in CallResult.error.
+
+        Args:
+            manager (SlackApiManager) :
+                Api manager the calls are made on.
+            max_workers (int) :
+                The maximum number of calls in flight.
+        """
+        self.manager = manager
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='slack-batch')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def _resolve(self, method: Union[str, Callable]) -> Callable:
+        if callable(method):
+            return method
+
+        target = self.manager
+        for name in method.split('.'):
+            target = getattr(target, name)
+        return target
+
+    def _call(self, method: Union[str, Callable], args: tuple, kwargs: dict) -> CallResult:
+        name = method if isinstance(method, str) else getattr(method, '__qualname__', repr(method))
+        transport = self.manager.transport
+        transport.last_response = None
+
+        try:
+            value = self._resolve(method)(*args, **kwargs)
+        except Exception as e:
+            return CallResult(name, error=e)
+
+        res = transport.last_response
+        if res is not None:
+            if res.status_code != 200:
+                return CallResult(name, value, SlackApiError(name, f'HTTP {res.status_code}', res))
+            try:
+                body = res.json()
+            except ValueError:
+                body = {}
+            if body.get('ok') is False:
+                return CallResult(name, value, SlackApiError(name, body.get('error', 'unknown_error'), res))
+
+        return CallResult(name, value)
+
+    def submit(self, method: Union[str, Callable], *args, **kwargs) -> 'Future[CallResult]':
+        """
+
+        Args:
+            method (str or callable) :
+                Dotted path on the manager such as 'user.info' or 'chat.postMessage',
+                or any callable making calls through the manager.
+            *args : Positional arguments for the method
+            **kwargs : Keyword arguments for the method
+
+        Returns:
+            Future resolving to a CallResult
+        """
+        return self.executor.submit(propagate(self._call), method, args, kwargs)
+
+    def run(self, calls: Iterable[tuple]) -> List[CallResult]:
+        """
+
+        Args:
+            calls (iterable of tuple) :
+                (method,), (method, args) or (method, args, kwargs) entries.
+
+        Returns:
+            list: CallResult per call, in submission order
+        """
+        with span('batch') as current:
+            futures = []
+            for call in calls:
+                call = tuple(call)
+                method, args, kwargs = call[0], call[1] if len(call) > 1 else (), call[2] if len(call) > 2 else {}
+                futures.append(self.submit(method, *args, **kwargs))
+            results = [future.result() for future in futures]
+            current.set('calls', len(results))
+        return results
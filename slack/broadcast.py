@@ -0,0 +1,139 @@
+"""
+Fan-out of one chat.postMessage to many channels
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Union
+
+from .template import MessageTemplate, Slot
+from .tracing import propagate, span
+from .utils import Functions
+
+
+class BroadcastResult:
+    __slots__ = ('sent', 'failed', 'skipped')
+
+    def __init__(self):
+        """
+        Outcome of a broadcast
+
+        Attributes:
+            sent (dict) : ts of the posted message per channel
+            failed (dict) : Slack error code or http status per channel
+            skipped (dict) : ts per channel already posted by an earlier run of the same journal
+        """
+        self.sent = {}  # type: Dict[str, str]
+        self.failed = {}  # type: Dict[str, str]
+        self.skipped = {}  # type: Dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return f'BroadcastResult(sent={len(self.sent)}, failed={len(self.failed)}, skipped={len(self.skipped)})'
+
+
+def _load_journal(path: str) -> Dict[str, str]:
+    posted = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # torn last line of an interrupted run
+                    continue
+                posted[entry['channel']] = entry['ts']
+    except FileNotFoundError:
+        pass
+    return posted
+
+
+def broadcast(
+        chat,
+        channels: Iterable[str],
+        text: str,
+        journal: Union[str, None] = None,
+        max_workers: int = 8,
+        **kwargs) -> BroadcastResult:
+    """
+    Post the same message to every channel concurrently
+
+    The request body is encoded once; each send only prepends its channel.
+    Requests go through the chat manager's transport, so its rate limiter
+    paces the fan-out. With a journal, every posted channel is appended to
+    the file as soon as Slack confirms it, and channels found there are
+    skipped when the broadcast is run again after an interruption. A crash
+    between Slack's reply and the journal write can still repeat that one
+    channel.
+
+    Args:
+        chat (SlackApiManager.Chat) : Chat api manager used to post
+        channels (iterable of str) : Target channel ids
+        text (str) : Message text
+        journal (str or None) : NDJSON file recording posted channels, for resuming
+        max_workers (int) : Concurrent posts
+        **kwargs : Other chat.postMessage parameters, e.g. attachments
+
+    Returns:
+        BroadcastResult
+    """
+    logger = Functions.PrintFunc()
+    result = BroadcastResult()
+
+    template = MessageTemplate(channel=Slot('channel'), text=text, **kwargs)
+    posted = _load_journal(journal) if journal is not None else {}
+
+    targets = []
+    for channel in dict.fromkeys(channels):
+        if channel in posted:
+            result.skipped[channel] = posted[channel]
+        else:
+            targets.append(channel)
+
+    if not targets:
+        return result
+
+    lock = threading.Lock()
+    journal_file = open(journal, 'a', encoding='utf-8') if journal is not None else None
+
+    def post(channel: str):
+        try:
+            res = chat._send('chat.postMessage', template.render(channel=channel))
+            body = res.json() if res is not None else None
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        else:
+            if res is None:
+                last = chat.transport.last_response
+                error = f'http {last.status_code}' if last is not None else 'http error'
+            elif body.get('ok') and body.get('ts'):
+                with lock:
+                    result.sent[channel] = body['ts']
+                    if journal_file is not None:
+                        journal_file.write(json.dumps({'channel': channel, 'ts': body['ts']}) + '\n')
+                        journal_file.flush()
+                        os.fsync(journal_file.fileno())
+                return
+            elif body.get('ok'):
+                error = 'missing_ts'
+            else:
+                error = body.get('error', 'unknown_error')
+
+        logger.warning(f'Broadcast to {channel} failed: {error}')
+        with lock:
+            result.failed[channel] = error
+
+    try:
+        with span('broadcast', channels=len(targets)) as current:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(propagate(post), targets))
+            current.set('failed', len(result.failed))
+    finally:
+        if journal_file is not None:
+            journal_file.close()
+
+    return result
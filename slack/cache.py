@@ -0,0 +1,250 @@
+"""
+Disk-backed cache of read-only Slack API responses
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from .transport import SlackApiError, Transport
+from .utils import Functions
+
+DEFAULT_TTLS = {
+    'users.list': 3600,
+    'users.info': 3600,
+    'channels.list': 600,
+    'channels.info': 300,
+    'channels.history': 60,
+    'channels.replies': 60,
+}
+
+# Slack puts "ok" first, so successful bodies are recognised without decoding them
+_OK = re.compile(rb'\s*\{\s*"ok"\s*:\s*true').match
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    stored REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+'''
+
+
+def cache_key(method: str, query: str, scope: str = '') -> str:
+    """
+    Key of a call: its scope, the api method and its parameters sorted by name
+
+    Args:
+        method (str) : Api method, e.g. 'users.list'
+        query (str) : Form-encoded parameters; a token parameter is not part of the key
+        scope (str) : Whose data the response is, see cache_scope
+
+    Returns:
+        str
+    """
+    params = sorted((key, value) for key, value in parse_qsl(query, keep_blank_values=True) if key != 'token')
+    normalized = scope + '\n' + '&'.join(f'{key}={value}' for key, value in params)
+    return f'{method}:' + hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def cache_scope(base_url: str, token: str) -> str:
+    """
+    Digest of the base url and the token, so that managers of different
+    workspaces sharing one cache file never see each other's responses;
+    the token itself is never stored
+    """
+    return hashlib.blake2b(f'{base_url}\n{token}'.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CachingTransport:
+    def __init__(
+            self,
+            path: str,
+            transport: Union[Transport, None] = None,
+            ttls: Union[Dict[str, float], None] = None,
+            max_bytes: int = 256 * 2 ** 20,
+            offline: bool = False):
+        """
+        Transport wrapper answering read endpoints from an SQLite file
+
+        Only methods listed in ttls are cached, and only successful (ok: true)
+        responses are stored. Entries are keyed on a digest of the base url
+        and the token besides the call itself, so managers of different
+        workspaces can share one file. Streamed calls bypass the cache, so
+        their bodies are never read into memory. Least recently used entries
+        are evicted once the bodies exceed max_bytes. In offline mode entries
+        never expire and a miss raises SlackApiError instead of reaching the
+        network.
+
+        Args:
+            path (str) : Cache database file
+            transport (Transport or None) : Transport used on misses
+            ttls (dict or None) : Seconds an entry stays fresh per api method, DEFAULT_TTLS when None
+            max_bytes (int) : Upper bound of the stored bodies
+            offline (bool) : Serve only from the cache
+        """
+        if not path:
+            raise ValueError('path is empty.')
+
+        self.logger = Functions.PrintFunc()
+        self.path = path
+        self.transport = transport or Transport()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.offline = offline
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self._local = threading.local()
+
+    def __getattr__(self, name: str):
+        return getattr(self.transport, name)
+
+    @property
+    def last_response(self) -> Union[requests.Response, None]:
+        """
+        Last response, cached or fetched, returned on the calling thread
+        """
+        return getattr(self._local, 'response', None)
+
+    @last_response.setter
+    def last_response(self, res: Union[requests.Response, None]):
+        self._local.response = res
+
+    def _lookup(self, key: str, ttl: float) -> Union[bytes, None]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT stored, body FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or (not self.offline and now - row[0] > ttl):
+                return None
+            self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            return row[1]
+
+    def _store(self, key: str, method: str, body: bytes):
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, method, stored, accessed, size, body) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, method, now, now, len(body), body))
+            self._size += len(body) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # drop least recently used entries until the cache is back under 90% of max_bytes
+        target = self.max_bytes * 0.9
+        rows = self._db.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self.evictions += len(evicted)
+
+    @staticmethod
+    def _response(url: str, body: bytes) -> requests.Response:
+        res = requests.Response()
+        res.status_code = 200
+        res.url = url
+        res.encoding = 'utf-8'
+        res.headers['Content-Type'] = 'application/json; charset=utf-8'
+        res.headers['X-Cache'] = 'hit'
+        res._content = body
+        res._content_consumed = True
+        return res
+
+    def _parse(self, url: str, kwargs: dict) -> Tuple[str, str, str]:
+        parts = urlsplit(url)
+        data = kwargs.get('data')
+        query = data.decode('utf-8') if isinstance(data, bytes) else (data or parts.query)
+        base, _, method = parts.path.rpartition('/')
+
+        authorization = (kwargs.get('headers') or {}).get('Authorization', '')
+        token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') \
+            else dict(parse_qsl(query)).get('token', '')
+        return method, query, cache_scope(f'{parts.scheme}://{parts.netloc}{base}/', token)
+
+    def request(self, verb: str, url: str, **kwargs) -> requests.Response:
+        method, query, scope = self._parse(url, kwargs)
+        ttl = self.ttls.get(method)
+        if ttl is None or (kwargs.get('stream') and not self.offline):
+            if self.offline:
+                raise SlackApiError(method, 'offline_not_cacheable')
+            res = self.transport.request(verb, url, **kwargs)
+            self._local.response = res
+            return res
+
+        key = cache_key(method, query, scope)
+        body = self._lookup(key, ttl)
+        if body is not None:
+            self.hits += 1
+            res = self._response(url, body)
+            self._local.response = res
+            return res
+
+        self.misses += 1
+        if self.offline:
+            raise SlackApiError(method, 'offline_cache_miss')
+
+        res = self.transport.request(verb, url, **kwargs)
+        if res.status_code == 200:
+            content = res.content
+            if _OK(content):
+                self._store(key, method, content)
+        self._local.response = res
+        return res
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': self._size
+            }
+
+    def clear(self, method: Union[str, None] = None):
+        """
+        Drop every entry, or the entries of one api method
+        """
+        with self._lock:
+            if method is None:
+                self._db.execute('DELETE FROM responses')
+            else:
+                self._db.execute('DELETE FROM responses WHERE method = ?', (method,))
+            self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+        self.transport.close()
@@ -0,0 +1,302 @@
+"""
+Columnar store of exported channel history with vectorized activity analytics
+"""
+import gzip
+import json
+import os
+from array import array
+from typing import Dict, Iterable, List, Tuple, Union
+
+COLUMNS = ('ts', 'user', 'channel', 'reply_count', 'thread_ts')
+
+
+def _numpy():
+    # numpy is optional (the "columnar" extra in setup.py), so it is only imported once a store is built
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for MessageStore (pip install numpy, or the columnar extra)')
+    return numpy
+
+
+class MessageStoreBuilder:
+    def __init__(self):
+        """
+        Accumulates messages into compact typed buffers before building a MessageStore
+
+        Users and channels are interned to int32 indexes; a message without a
+        user (e.g. bot or system messages) gets -1 and a message outside a
+        thread gets NaN as thread_ts.
+        """
+        self.users = []  # type: List[str]
+        self.channels = []  # type: List[str]
+        self._user_index = {}  # type: Dict[str, int]
+        self._channel_index = {}  # type: Dict[str, int]
+
+        self._ts = array('d')
+        self._user = array('i')
+        self._channel = array('i')
+        self._reply_count = array('i')
+        self._thread_ts = array('d')
+
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    def _intern(self, value: str, index: Dict[str, int], values: List[str]) -> int:
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
+    def add(self, message: dict, channel: Union[str, None] = None):
+        """
+
+        Args:
+            message (dict) : Message of channels.history or an export line
+            channel (str or None) : Channel of the message, message['channel'] when None
+        """
+        channel = channel or message['channel']
+        user = message.get('user')
+        thread_ts = message.get('thread_ts')
+
+        self._ts.append(float(message['ts']))
+        self._user.append(-1 if user is None else self._intern(user, self._user_index, self.users))
+        self._channel.append(self._intern(channel, self._channel_index, self.channels))
+        self._reply_count.append(message.get('reply_count', 0))
+        self._thread_ts.append(float('nan') if thread_ts is None else float(thread_ts))
+
+    def extend(self, messages: Iterable[dict], channel: Union[str, None] = None):
+        for message in messages:
+            self.add(message, channel)
+
+    def build(self) -> 'MessageStore':
+        """
+        Wrap the buffers as NumPy arrays without copying; the builder cannot be extended afterwards
+        """
+        np = _numpy()
+        return MessageStore({
+            'ts': np.frombuffer(self._ts, dtype=np.float64),
+            'user': np.frombuffer(self._user, dtype=np.int32),
+            'channel': np.frombuffer(self._channel, dtype=np.int32),
+            'reply_count': np.frombuffer(self._reply_count, dtype=np.int32),
+            'thread_ts': np.frombuffer(self._thread_ts, dtype=np.float64),
+        }, list(self.users), list(self.channels))
+
+
+class MessageStore:
+    def __init__(self, columns: dict, users: List[str], channels: List[str]):
+        """
+        One NumPy array per message field, sharing the message order
+
+        Args:
+            columns (dict) : Arrays named ts, user, channel, reply_count and thread_ts
+            users (list) : User id per user index
+            channels (list) : Channel id per channel index
+        """
+        self.np = _numpy()
+        missing = [name for name in COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f'columns {missing} are missing.')
+
+        self.ts = columns['ts']
+        self.user = columns['user']
+        self.channel = columns['channel']
+        self.reply_count = columns['reply_count']
+        self.thread_ts = columns['thread_ts']
+        self.users = users
+        self.channels = channels
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[dict], channel: Union[str, None] = None) -> 'MessageStore':
+        builder = MessageStoreBuilder()
+        builder.extend(messages, channel)
+        return builder.build()
+
+    @classmethod
+    def from_ndjson(cls, paths: Iterable[str]) -> 'MessageStore':
+        """
+        Build a store from export files, e.g. ExportWriter.files
+
+        Args:
+            paths (iterable of str) : NDJSON files, gzip compressed when ending in .gz
+        """
+        builder = MessageStoreBuilder()
+        for path in paths:
+            opener = gzip.open if path.endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                builder.extend(json.loads(line) for line in f)
+        return builder.build()
+
+    def save(self, path: str):
+        """
+        Write one .npy file per column plus the user and channel ids to a directory
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in COLUMNS:
+            self.np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'ids.json'), 'w', encoding='utf-8') as f:
+            json.dump({'users': self.users, 'channels': self.channels}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'MessageStore':
+        """
+
+        Args:
+            path (str) : Directory written by save()
+            mmap (bool) : Memory-map the columns instead of reading them into memory
+
+        Returns:
+            MessageStore
+        """
+        np = _numpy()
+        columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+            for name in COLUMNS
+        }
+        with open(os.path.join(path, 'ids.json'), encoding='utf-8') as f:
+            ids = json.load(f)
+        return cls(columns, ids['users'], ids['channels'])
+
+    def mask(
+            self,
+            channel: Union[str, None] = None,
+            user: Union[str, None] = None,
+            oldest: Union[float, None] = None,
+            latest: Union[float, None] = None):
+        """
+        Boolean array selecting the messages matching every given filter, None when there is no filter
+        """
+        selected = None
+
+        def both(current, condition):
+            return condition if current is None else current & condition
+
+        if channel is not None:
+            index = self.channels.index(channel) if channel in self.channels else -2
+            selected = both(selected, self.channel == index)
+        if user is not None:
+            index = self.users.index(user) if user in self.users else -2
+            selected = both(selected, self.user == index)
+        if oldest is not None:
+            selected = both(selected, self.ts > oldest)
+        if latest is not None:
+            selected = both(selected, self.ts <= latest)
+        return selected
+
+    def _select(self, column, selected):
+        return column if selected is None else column[selected]
+
+    def messages_per_hour(self, **filters) -> Tuple[object, object]:
+        """
+        Message count per hour bucket
+
+        Args:
+            **filters : channel, user, oldest, latest, as for mask()
+
+        Returns:
+            tuple: (hour start timestamps, counts), hours without messages omitted
+        """
+        np = self.np
+        hours = (self._select(self.ts, self.mask(**filters)) // 3600).astype(np.int64)
+        if not len(hours):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first = hours.min()
+        counts = np.bincount(hours - first)
+        buckets = np.flatnonzero(counts)
+        return (buckets + first) * 3600, counts[buckets]
+
+    def hour_of_day(self, utc_offset: float = 0, **filters):
+        """
+        Message count per hour of the day (24 buckets)
+
+        Args:
+            utc_offset (float) : Hours added to UTC before bucketing
+            **filters : channel, user, oldest, latest, as for mask()
+        """
+        np = self.np
+        ts = self._select(self.ts, self.mask(**filters))
+        hours = ((ts + utc_offset * 3600) // 3600).astype(np.int64) % 24
+        return np.bincount(hours, minlength=24)
+
+    def per_channel(self, **filters) -> Dict[str, int]:
+        """
+        Message count per channel id
+        """
+        np = self.np
+        counts = np.bincount(self._select(self.channel, self.mask(**filters)), minlength=len(self.channels))
+        return {self.channels[index]: int(counts[index]) for index in np.flatnonzero(counts)}
+
+    def replies_per_channel(self, **filters) -> Dict[str, int]:
+        """
+        Sum of reply_count per channel id
+        """
+        np = self.np
+        selected = self.mask(**filters)
+        sums = np.bincount(
+            self._select(self.channel, selected),
+            weights=self._select(self.reply_count, selected),
+            minlength=len(self.channels))
+        return {self.channels[index]: int(sums[index]) for index in np.flatnonzero(sums)}
+
+    def top_posters(self, limit: int = 10, **filters) -> List[Tuple[str, int]]:
+        """
+        Users with the most messages
+
+        Args:
+            limit (int) : Number of users returned
+            **filters : channel, user, oldest, latest, as for mask()
+
+        Returns:
+            list: (user id, message count), most active first
+        """
+        np = self.np
+        users = self._select(self.user, self.mask(**filters))
+        counts = np.bincount(users[users >= 0], minlength=len(self.users))
+        if not len(counts):
+            return []
+        limit = min(limit, len(counts))
+        top = np.argpartition(-counts, limit - 1)[:limit]
+        top = top[np.argsort(-counts[top], kind='stable')]
+        return [(self.users[index], int(counts[index])) for index in top if counts[index]]
+
+    def first_reply_latency(self, **filters):
+        """
+        Seconds from each thread's parent message to its first reply
+
+        Args:
+            **filters : channel, user, oldest, latest, applied to the replies
+
+        Returns:
+            numpy.ndarray: one latency per thread with replies
+        """
+        np = self.np
+        selected = self.mask(**filters)
+        ts = self._select(self.ts, selected)
+        thread_ts = self._select(self.thread_ts, selected)
+        channel = self._select(self.channel, selected)
+
+        replies = ~np.isnan(thread_ts) & (ts > thread_ts)
+        ts, thread_ts, channel = ts[replies], thread_ts[replies], channel[replies]
+        if not len(ts):
+            return np.empty(0, dtype=np.float64)
+
+        # group replies by (channel, thread) and take the earliest reply of each group
+        order = np.lexsort((ts, thread_ts, channel))
+        thread_ts, channel, ts = thread_ts[order], channel[order], ts[order]
+        starts = np.flatnonzero(np.r_[True, (thread_ts[1:] != thread_ts[:-1]) | (channel[1:] != channel[:-1])])
+        return ts[starts] - thread_ts[starts]
+
+    def reply_latency_stats(self, **filters) -> Dict[str, float]:
+        """
+        Thread count and median, p90 and mean first reply latency in seconds
+        """
+        np = self.np
+        latencies = self.first_reply_latency(**filters)
+        if not len(latencies):
+            return {'threads': 0, 'median': 0.0, 'p90': 0.0, 'mean': 0.0}
+        median, p90 = np.percentile(latencies, [50, 90])
+        return {'threads': len(latencies), 'median': float(median), 'p90': float(p90), 'mean': float(latencies.mean())}
@@ -0,0 +1,150 @@
+"""
+Adaptive per-method concurrency limits driven by 429 and latency feedback
+"""
+import threading
+import time
+from typing import Dict, Union
+
+
+class _MethodState:
+    __slots__ = ('limit', 'inflight', 'latency', 'baseline', 'last_decrease')
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.inflight = 0
+        self.latency = None  # type: Union[float, None]
+        self.baseline = None  # type: Union[float, None]
+        self.last_decrease = 0.0
+
+
+class AdaptiveLimiter:
+    def __init__(
+            self,
+            initial: int = 4,
+            minimum: int = 1,
+            maximum: int = 64,
+            decrease: float = 0.5,
+            latency_tolerance: float = 2.0,
+            smoothing: float = 0.2,
+            baseline_decay: float = 0.01):
+        """
+        AIMD concurrency limit per API method
+
+        Every healthy response raises a method's limit by 1/limit, i.e. by one
+        per limit's worth of successes. A 429, a 5xx, a transport error or a
+        smoothed latency above latency_tolerance times the baseline latency
+        multiplies the limit by decrease, at most once per round trip.
+
+        The baseline drops to any faster sample at once and follows slower
+        ones by baseline_decay per response, so neither a lucky early sample
+        nor a slow warm-up fixes it for the lifetime of the limiter; latency
+        that stays high for a few hundred responses becomes the new normal.
+
+        Args:
+            initial (int) : Starting limit of every method
+            minimum (int) : Lowest limit
+            maximum (int) : Highest limit
+            decrease (float) : Factor applied to the limit on congestion
+            latency_tolerance (float) : Allowed ratio of smoothed to best latency
+            smoothing (float) : Weight of the newest sample in the latency average
+            baseline_decay (float) : Weight of a slower sample in the baseline, 0 keeps the best latency seen
+        """
+        if not 0 < decrease < 1:
+            raise ValueError('decrease must be between 0 and 1.')
+        if not 0 <= baseline_decay < 1:
+            raise ValueError('baseline_decay must be between 0 and 1.')
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError('limits must satisfy 1 <= minimum <= initial <= maximum.')
+
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.baseline_decay = baseline_decay
+
+        self._methods = {}  # type: Dict[str, _MethodState]
+        self._condition = threading.Condition()
+
+    def _state(self, method: str) -> _MethodState:
+        state = self._methods.get(method)
+        if state is None:
+            state = self._methods[method] = _MethodState(float(self.initial))
+        return state
+
+    def acquire(self, method: str) -> float:
+        """
+        Block until the method has a free slot
+
+        Args:
+            method (str) : Api method, e.g. 'channels.history'
+
+        Returns:
+            float: start time to hand back to release()
+        """
+        with self._condition:
+            state = self._state(method)
+            while state.inflight >= int(state.limit):
+                self._condition.wait()
+            state.inflight += 1
+        return time.monotonic()
+
+    def release(self, method: str, start: float, status: Union[int, None]):
+        """
+
+        Args:
+            method (str) : Api method passed to acquire()
+            start (float) : Value returned by acquire()
+            status (int or None) : HTTP status, None when the request failed without one
+        """
+        now = time.monotonic()
+        latency = now - start
+
+        with self._condition:
+            state = self._state(method)
+            state.inflight -= 1
+
+            congested = status is None or status == 429 or status >= 500
+            if not congested:
+                state.latency = latency if state.latency is None else (
+                    self.smoothing * latency + (1 - self.smoothing) * state.latency)
+                if state.baseline is None or latency < state.baseline:
+                    state.baseline = latency
+                else:
+                    state.baseline += self.baseline_decay * (latency - state.baseline)
+                congested = state.latency > state.baseline * self.latency_tolerance
+
+            if congested:
+                # one decrease per round trip, not one per response of the same burst
+                if now - state.last_decrease >= (state.latency or latency):
+                    state.limit = max(self.minimum, state.limit * self.decrease)
+                    state.last_decrease = now
+                    # let the latency average recover from the congested samples
+                    state.latency = state.baseline
+            else:
+                state.limit = min(self.maximum, state.limit + 1 / state.limit)
+
+            self._condition.notify_all()
+
+    def limits(self) -> Dict[str, int]:
+        """
+        Current concurrency limit per method
+        """
+        with self._condition:
+            return {method: int(state.limit) for method, state in self._methods.items()}
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Limit, requests in flight and latencies per method
+        """
+        with self._condition:
+            return {
+                method: {
+                    'limit': int(state.limit),
+                    'inflight': state.inflight,
+                    'latency': state.latency,
+                    'baseline': state.baseline
+                }
+                for method, state in self._methods.items()
+            }
@@ -0,0 +1,225 @@
+"""
+Debounced coalescing of superseded updates (channels.mark, setTopic, setPurpose)
+"""
+import atexit
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Union
+
+from .transport import SlackApiError
+from .utils import Functions
+
+# errors that another attempt cannot fix
+NON_RETRYABLE = frozenset({
+    'account_inactive',
+    'channel_not_found',
+    'invalid_auth',
+    'is_archived',
+    'missing_scope',
+    'not_authed',
+    'not_in_channel',
+    'restricted_action',
+    'token_revoked',
+})
+
+
+def latest_ts(current: str, new: str) -> str:
+    """
+    Merge function keeping the highest Slack timestamp
+    """
+    return new if float(new) > float(current) else current
+
+
+def last_write(current: Any, new: Any) -> Any:
+    """
+    Merge function keeping the most recent value
+    """
+    return new
+
+
+class Debouncer:
+    def __init__(
+            self,
+            func: Callable[[Hashable, Any], Any],
+            interval: float = 1.0,
+            merge: Callable[[Any, Any], Any] = last_write,
+            max_attempts: int = 5):
+        """
+        Keep only the latest pending value per key and flush it periodically
+
+        A failed value stays pending and is retried after interval, doubling
+        the delay on every further failure. It is dropped (and logged) after
+        max_attempts failures, or at once when func raises a SlackApiError
+        listed in NON_RETRYABLE.
+
+        Args:
+            func (callable) :
+                Called as func(key, value) for every pending key on flush,
+                e.g. SlackApiManager.Channel.mark. Raising or returning False
+                counts as a failure.
+            interval (float) :
+                Seconds between background flushes.
+            merge (callable) :
+                Combines a pending value with a newly submitted one.
+            max_attempts (int) :
+                Failures after which a value is dropped.
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive.')
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be positive.')
+
+        self.logger = Functions.PrintFunc()
+        self.func = func
+        self.interval = interval
+        self.merge = merge
+        self.max_attempts = max_attempts
+        self.dropped = 0
+
+        self._pending = {}  # type: Dict[Hashable, Any]
+        self._sent = {}  # type: Dict[Hashable, Any]
+        self._attempts = {}  # type: Dict[Hashable, int]
+        self._retry_at = {}  # type: Dict[Hashable, float]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def submit(self, key: Hashable, value: Any):
+        """
+
+        Args:
+            key (hashable) : Target of the update, e.g. a channel id
+            value : New value, merged with any pending value for the key
+        """
+        with self._lock:
+            # drop values that would not change what was already sent (e.g. an older ts)
+            if key not in self._pending and key in self._sent:
+                sent = self._sent[key]
+                if value == sent or self.merge(sent, value) is sent:
+                    return
+            if key in self._pending:
+                value = self.merge(self._pending[key], value)
+            self._pending[key] = value
+
+    def pending(self) -> Dict[Hashable, Any]:
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Send every pending value that is not waiting for a retry
+
+        Args:
+            force (bool) : Also send the values waiting for a retry
+
+        Returns:
+            int: number of calls made
+        """
+        # serialise flushes so a slow call is never overtaken by an older value
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                if force:
+                    pending, self._pending = self._pending, {}
+                else:
+                    due = [key for key in self._pending if self._retry_at.get(key, 0.0) <= now]
+                    pending = {key: self._pending.pop(key) for key in due}
+
+            for key, value in pending.items():
+                reason = None
+                try:
+                    # the Channel methods report api and http errors by returning False
+                    failed = self.func(key, value) is False
+                    if failed:
+                        reason = 'call returned False'
+                except Exception as e:
+                    failed = True
+                    reason = e
+
+                with self._lock:
+                    if not failed:
+                        self._sent[key] = value
+                        self._attempts.pop(key, None)
+                        self._retry_at.pop(key, None)
+                        continue
+
+                    attempts = self._attempts.get(key, 0) + 1
+                    drop = attempts >= self.max_attempts or \
+                        (isinstance(reason, SlackApiError) and reason.error in NON_RETRYABLE)
+                    if drop:
+                        # a newer value submitted meanwhile gets attempts of its own
+                        self._attempts.pop(key, None)
+                        self._retry_at.pop(key, None)
+                        self.dropped += 1
+                    else:
+                        self._attempts[key] = attempts
+                        self._retry_at[key] = time.monotonic() + self.interval * 2 ** (attempts - 1)
+                        # retry later unless a newer value arrived meanwhile
+                        if key in self._pending:
+                            value = self.merge(value, self._pending[key])
+                        self._pending[key] = value
+
+                if drop:
+                    self.logger.danger(f'dropping {key} after {attempts} attempts: {reason}')
+                else:
+                    self.logger.warning(f'flushing {key} failed: {reason}')
+
+            return len(pending)
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+    def start(self) -> 'Debouncer':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='slack-debounce', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self, timeout: Union[float, None] = None):
+        """
+        Stop the background flush and send whatever is still pending
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+            atexit.unregister(self.close)
+        self.flush(force=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_cursor_coalescer(channel, interval: float = 1.0) -> Debouncer:
+    """
+    Coalesce channels.mark calls, keeping the highest ts per channel
+
+    Args:
+        channel (SlackApiManager.Channel) : Channel api manager
+        interval (float) : Seconds between flushes
+
+    Returns:
+        Debouncer: submit(channel_id, ts) instead of calling channel.mark
+    """
+    return Debouncer(functools.partial(channel.mark, strict=True), interval, latest_ts)
+
+
+def topic_coalescer(channel, interval: float = 1.0) -> Debouncer:
+    """
+    Coalesce channels.setTopic calls, keeping the last topic per channel
+    """
+    return Debouncer(functools.partial(channel.setTopic, strict=True), interval, last_write)
+
+
+def purpose_coalescer(channel, interval: float = 1.0) -> Debouncer:
+    """
+    Coalesce channels.setPurpose calls, keeping the last purpose per channel
+    """
+    return Debouncer(functools.partial(channel.setPurpose, strict=True), interval, last_write)
@@ -0,0 +1,439 @@
+"""
+Slack User and Channel Directories
+"""
+import threading
+from typing import Dict, Iterable, List, Set, Union
+
+from .utils import Functions
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class PrefixTrie:
+    def __init__(self):
+        """
+        Prefix trie mapping lowercased names to user ids
+        """
+        self.root = _TrieNode()
+
+    def add(self, key: str, user_id: str):
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.ids.add(user_id)
+
+    def remove(self, key: str, user_id: str):
+        path = [self.root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+
+        path[-1].ids.discard(user_id)
+
+        # prune branches that no longer lead to any id
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.ids or node.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    def search(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+
+        Args:
+            prefix (str) :
+                Lowercased prefix to complete.
+            limit (int) :
+                The maximum number of ids to return.
+
+        Returns:
+            list
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        found = []
+        seen = set()
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            for user_id in node.ids:
+                if user_id not in seen:
+                    seen.add(user_id)
+                    found.append(user_id)
+            stack.extend(node.children[char] for char in sorted(node.children, reverse=True))
+
+        return found[:limit]
+
+
+class UserDirectory:
+    def __init__(self, user=None):
+        """
+        In-memory index of workspace members
+
+        Lookups are safe while refresh() applies a crawl on another thread.
+
+        Args:
+            user (SlackApiManager.User or None) :
+                User api manager used to crawl users.list on refresh.
+        """
+        self.logger = Functions.PrintFunc()
+        self.user = user
+
+        self._by_id = {}  # type: Dict[str, dict]
+        self._by_email = {}  # type: Dict[str, str]
+        self._by_name = {}  # type: Dict[str, Set[str]]
+        # built on the first complete() call so bulk loads stay cheap
+        self._trie = None  # type: Union[PrefixTrie, None]
+        # readers may run while refresh() applies a crawl on another thread
+        self._lock = threading.RLock()
+        # completed refresh() crawls, so caches of unknown ids know when to retry
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._by_id
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_id.values()))
+
+    @staticmethod
+    def _names(member: dict) -> Set[str]:
+        if member.get('deleted'):
+            return set()
+
+        profile = member.get('profile', {})
+        names = {
+            member.get('name', ''),
+            profile.get('display_name', ''),
+            profile.get('real_name', '')
+        }
+        return {name.lower() for name in names if name}
+
+    @staticmethod
+    def _email(member: dict) -> str:
+        if member.get('deleted'):
+            return ''
+        return member.get('profile', {}).get('email', '').lower()
+
+    def _index(self, member: dict):
+        user_id = member['id']
+        self._by_id[user_id] = member
+
+        email = self._email(member)
+        if email:
+            self._by_email[email] = user_id
+
+        for name in self._names(member):
+            self._by_name.setdefault(name, set()).add(user_id)
+            if self._trie is not None:
+                self._trie.add(name, user_id)
+
+    def _unindex(self, member: dict):
+        user_id = member['id']
+        self._by_id.pop(user_id, None)
+
+        email = self._email(member)
+        if email and self._by_email.get(email) == user_id:
+            del self._by_email[email]
+
+        for name in self._names(member):
+            ids = self._by_name.get(name)
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del self._by_name[name]
+            if self._trie is not None:
+                self._trie.remove(name, user_id)
+
+    def update(self, members: Iterable[dict]) -> int:
+        """
+        Insert or replace members, touching only entries that changed
+
+        Args:
+            members (iterable of dict) :
+                Member objects as returned by users.list or users.info.
+
+        Returns:
+            int: number of entries that were added or replaced
+        """
+        touched = 0
+        with self._lock:
+            for member in members:
+                current = self._by_id.get(member['id'])
+                if current == member:
+                    continue
+                if current is not None:
+                    self._unindex(current)
+                self._index(member)
+                touched += 1
+
+        return touched
+
+    def remove(self, user_id: str) -> bool:
+        """
+
+        Args:
+            user_id (str) : User to drop from the directory
+
+        Returns:
+            bool
+        """
+        with self._lock:
+            member = self._by_id.get(user_id)
+            if member is None:
+                return False
+
+            self._unindex(member)
+            return True
+
+    def refresh(self, limit: int = 200) -> int:
+        """
+        Re-crawl users.list and apply only the entries that changed
+
+        Members missing from the crawl are removed only when every page was
+        fetched; a failed page raises SlackApiError and leaves them in place.
+
+        Args:
+            limit (int) :
+                Page size for users.list.
+
+        Returns:
+            int: number of entries that were added, replaced or removed
+        """
+        if self.user is None:
+            raise ValueError('user api manager is empty.')
+
+        seen = set()
+        touched = 0
+        # a failed page raises SlackApiError here, before anything is dropped
+        for members in self.user.pages(limit=limit):
+            touched += self.update(members)
+            seen.update(member['id'] for member in members)
+
+        # only drop stale members after a crawl that returned data
+        if seen:
+            with self._lock:
+                for user_id in [user_id for user_id in self._by_id if user_id not in seen]:
+                    self.remove(user_id)
+                    touched += 1
+
+        self.refreshes += 1
+        return touched
+
+    def get(self, user_id: str) -> Union[dict, None]:
+        return self._by_id.get(user_id)
+
+    def by_email(self, email: str) -> Union[dict, None]:
+        with self._lock:
+            user_id = self._by_email.get(email.lower())
+            if user_id is None:
+                return None
+            return self._by_id[user_id]
+
+    def by_name(self, name: str) -> List[dict]:
+        """
+
+        Args:
+            name (str) :
+                User name, display name or real name. A leading '@' is ignored.
+
+        Returns:
+            list
+        """
+        with self._lock:
+            ids = self._by_name.get(name.lstrip('@').lower(), ())
+            return [self._by_id[user_id] for user_id in sorted(ids)]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[dict]:
+        """
+        Autocomplete members by name prefix
+
+        Args:
+            prefix (str) :
+                Prefix of a user name, display name or real name.
+            limit (int) :
+                The maximum number of members to return.
+
+        Returns:
+            list
+        """
+        with self._lock:
+            if self._trie is None:
+                trie = PrefixTrie()
+                for name, ids in self._by_name.items():
+                    for user_id in ids:
+                        trie.add(name, user_id)
+                self._trie = trie
+
+            ids = self._trie.search(prefix.lstrip('@').lower(), limit)
+            return [self._by_id[user_id] for user_id in ids]
+
+    def resolve(self, query: str) -> Union[str, None]:
+        """
+        Resolve a user id, '@name' or email address to a user id
+
+        Args:
+            query (str) : Value to resolve
+
+        Returns:
+            str or None
+        """
+        if not query:
+            raise ValueError('query is empty.')
+
+        if query in self._by_id:
+            return query
+
+        if '@' in query[1:]:
+            member = self.by_email(query)
+            return member['id'] if member else None
+
+        members = self.by_name(query)
+        if len(members) > 1:
+            self.logger.warning(f'\'{query}\' matches {len(members)} users')
+        return members[0]['id'] if members else None
+
+
+class ChannelDirectory:
+    def __init__(self, channel=None):
+        """
+        In-memory index of workspace channels
+
+        Lookups are safe while refresh() applies a crawl on another thread.
+
+        Args:
+            channel (SlackApiManager.Channel or None) :
+                Channel api manager used to crawl channels.list on refresh.
+        """
+        self.logger = Functions.PrintFunc()
+        self.channel = channel
+
+        self._by_id = {}  # type: Dict[str, dict]
+        self._by_name = {}  # type: Dict[str, str]
+        self._lock = threading.RLock()
+        # completed refresh() crawls, so caches of unknown ids know when to retry
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, channel_id: str) -> bool:
+        return channel_id in self._by_id
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_id.values()))
+
+    def update(self, channels: Iterable[dict]) -> int:
+        """
+        Insert or replace channels, touching only entries that changed
+
+        Args:
+            channels (iterable of dict) :
+                Channel objects as returned by channels.list or channels.info.
+
+        Returns:
+            int: number of entries that were added or replaced
+        """
+        touched = 0
+        with self._lock:
+            for channel in channels:
+                current = self._by_id.get(channel['id'])
+                if current == channel:
+                    continue
+                if current is not None:
+                    self.remove(current['id'])
+                self._by_id[channel['id']] = channel
+                self._by_name[channel['name']] = channel['id']
+                touched += 1
+
+        return touched
+
+    def remove(self, channel_id: str) -> bool:
+        with self._lock:
+            channel = self._by_id.pop(channel_id, None)
+            if channel is None:
+                return False
+
+            if self._by_name.get(channel['name']) == channel_id:
+                del self._by_name[channel['name']]
+            return True
+
+    def refresh(self, limit: int = 200) -> int:
+        """
+        Re-crawl channels.list and apply only the entries that changed
+
+        Channels missing from the crawl are removed only when every page was
+        fetched; a failed page raises SlackApiError and leaves them in place.
+
+        Args:
+            limit (int) :
+                Page size for channels.list.
+
+        Returns:
+            int: number of entries that were added, replaced or removed
+        """
+        if self.channel is None:
+            raise ValueError('channel api manager is empty.')
+
+        seen = set()
+        touched = 0
+        for channels in self.channel.pages(limit=limit):
+            touched += self.update(channels)
+            seen.update(channel['id'] for channel in channels)
+
+        if seen:
+            with self._lock:
+                for channel_id in [channel_id for channel_id in self._by_id if channel_id not in seen]:
+                    self.remove(channel_id)
+                    touched += 1
+
+        self.refreshes += 1
+        return touched
+
+    def get(self, channel_id: str) -> Union[dict, None]:
+        return self._by_id.get(channel_id)
+
+    def by_name(self, name: str) -> Union[dict, None]:
+        with self._lock:
+            channel_id = self._by_name.get(name.lstrip('#'))
+            if channel_id is None:
+                return None
+            return self._by_id[channel_id]
+
+    def resolve(self, query: str) -> Union[str, None]:
+        """
+        Resolve a channel id or '#name' to a channel id
+
+        Args:
+            query (str) : Value to resolve
+
+        Returns:
+            str or None
+        """
+        if not query:
+            raise ValueError('query is empty.')
+
+        if query in self._by_id:
+            return query
+
+        channel = self.by_name(query)
+        return channel['id'] if channel else None
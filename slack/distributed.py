@@ -0,0 +1,455 @@
+"""
+Distributed history export over a lease-based SQLite work queue
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Union
+
+from .export import ExportWriter
+from .tracing import span
+from .transport import SlackApiError
+from .utils import Functions
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    oldest REAL NOT NULL,
+    latest REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    checkpoint TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (channel, oldest, latest)
+);
+CREATE INDEX IF NOT EXISTS units_state ON units (state, lease_expires);
+'''
+
+
+class WorkUnit:
+    __slots__ = ('id', 'channel', 'oldest', 'latest', 'attempts', 'checkpoint')
+
+    def __init__(self, id: int, channel: str, oldest: float, latest: float, attempts: int, checkpoint: dict):
+        """
+        History of one channel between two timestamps
+
+        Args:
+            id (int) : Unit id in the queue
+            channel (str) : Channel id
+            oldest (float) : Exclusive start of the range
+            latest (float) : Inclusive end of the range, the next unit's oldest
+            attempts (int) : Leases granted so far, including this one; leases given back on shutdown do not count
+            checkpoint (dict) : Progress of earlier leases: files written, messages and resume ts
+        """
+        self.id = id
+        self.channel = channel
+        self.oldest = oldest
+        self.latest = latest
+        self.attempts = attempts
+        self.checkpoint = checkpoint
+
+    def __repr__(self) -> str:
+        return f'WorkUnit({self.id}, {self.channel!r}, {self.oldest}, {self.latest})'
+
+
+class WorkQueue:
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        """
+        Shared queue of export units with time-limited leases
+
+        Every node opens the same SQLite file (a local file for tests, a
+        shared filesystem with working locks across machines). A leased unit
+        whose lease was not renewed in time is handed to the next worker that
+        asks, which then resumes from the unit's last checkpoint.
+
+        Args:
+            path (str) : Queue database file
+            lease_seconds (float) : How long a lease lasts without a heartbeat
+        """
+        if not path:
+            raise ValueError('path is empty.')
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+
+    def add(self, channel: str, oldest: float, latest: float) -> bool:
+        """
+        Queue a unit unless the same range is already queued
+
+        Returns:
+            bool: True when the unit was added
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                'INSERT OR IGNORE INTO units (channel, oldest, latest) VALUES (?, ?, ?)', (channel, oldest, latest))
+            return cursor.rowcount == 1
+
+    def lease(self, worker: str) -> Union[WorkUnit, None]:
+        """
+        Take a pending unit, or one whose lease expired
+
+        Args:
+            worker (str) : Id of the leasing worker
+
+        Returns:
+            WorkUnit or None: None when no unit is available
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._db.execute(
+                    'SELECT id, channel, oldest, latest, attempts, checkpoint FROM units '
+                    'WHERE (state = ? AND lease_expires <= ?) OR (state = ? AND lease_expires < ?) '
+                    'ORDER BY id LIMIT 1',
+                    (PENDING, now, LEASED, now)).fetchone()
+                if row is None:
+                    self._db.execute('COMMIT')
+                    return None
+                self._db.execute(
+                    'UPDATE units SET state = ?, owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?',
+                    (LEASED, worker, now + self.lease_seconds, row[0]))
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+        unit_id, channel, oldest, latest, attempts, checkpoint = row
+        return WorkUnit(unit_id, channel, oldest, latest, attempts + 1, json.loads(checkpoint))
+
+    def _update(self, sql: str, params: tuple) -> bool:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount == 1
+
+    def heartbeat(self, unit: WorkUnit, worker: str) -> bool:
+        """
+        Renew a lease
+
+        Returns:
+            bool: False when the lease was lost to another worker
+        """
+        return self._update(
+            'UPDATE units SET lease_expires = ? WHERE id = ? AND owner = ? AND state = ?',
+            (time.time() + self.lease_seconds, unit.id, worker, LEASED))
+
+    def checkpoint(self, unit: WorkUnit, worker: str, checkpoint: dict) -> bool:
+        """
+        Record durable progress of a leased unit and renew its lease
+        """
+        unit.checkpoint = checkpoint
+        return self._update(
+            'UPDATE units SET checkpoint = ?, lease_expires = ? WHERE id = ? AND owner = ? AND state = ?',
+            (json.dumps(checkpoint), time.time() + self.lease_seconds, unit.id, worker, LEASED))
+
+    def complete(self, unit: WorkUnit, worker: str, checkpoint: dict) -> bool:
+        unit.checkpoint = checkpoint
+        return self._update(
+            'UPDATE units SET state = ?, checkpoint = ?, lease_expires = 0 WHERE id = ? AND owner = ? AND state = ?',
+            (DONE, json.dumps(checkpoint), unit.id, worker, LEASED))
+
+    def release(self, unit: WorkUnit, worker: str, delay: float = 0, attempt: bool = True) -> bool:
+        """
+        Give a unit back, e.g. after an error, keeping its checkpoint
+
+        Args:
+            unit (WorkUnit) : Leased unit
+            worker (str) : Id of the leasing worker
+            delay (float) : Seconds before the unit can be leased again
+            attempt (bool) : Count the lease as an attempt; False when the worker is shutting down
+        """
+        return self._update(
+            'UPDATE units SET state = ?, owner = NULL, lease_expires = ?, attempts = attempts - ? '
+            'WHERE id = ? AND owner = ? AND state = ?',
+            (PENDING, time.time() + delay if delay else 0, 0 if attempt else 1, unit.id, worker, LEASED))
+
+    def fail(self, unit: WorkUnit, worker: str, error: str) -> bool:
+        """
+        Give up on a unit; it is never leased again and stays in the merged manifest as incomplete
+
+        Args:
+            unit (WorkUnit) : Leased unit
+            worker (str) : Id of the leasing worker
+            error (str) : Last error, kept in the unit's checkpoint
+        """
+        unit.checkpoint = dict(unit.checkpoint, error=error)
+        return self._update(
+            'UPDATE units SET state = ?, checkpoint = ?, lease_expires = 0 WHERE id = ? AND owner = ? AND state = ?',
+            (FAILED, json.dumps(unit.checkpoint), unit.id, worker, LEASED))
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Number of units per state; expired leases count as pending
+        """
+        now = time.time()
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        with self._lock:
+            rows = self._db.execute('SELECT state, lease_expires < ? AND state = ?, COUNT(*) FROM units '
+                                    'GROUP BY 1, 2', (now, LEASED)).fetchall()
+        for state, expired, count in rows:
+            counts[PENDING if expired else state] += count
+        return counts
+
+    def units(self) -> List[dict]:
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, channel, oldest, latest, state, checkpoint FROM units ORDER BY channel, oldest').fetchall()
+        return [
+            {'id': row[0], 'channel': row[1], 'oldest': row[2], 'latest': row[3], 'state': row[4],
+             'checkpoint': json.loads(row[5])}
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ExportCoordinator:
+    def __init__(self, manager, queue: WorkQueue):
+        """
+        Splits a workspace export into (channel, time range) units and merges the results
+
+        Args:
+            manager (SlackApiManager) : Api manager used to list channels
+            queue (WorkQueue) : Queue the units are added to
+        """
+        self.logger = Functions.PrintFunc()
+        self.manager = manager
+        self.queue = queue
+
+    def plan(
+            self,
+            oldest: float = 0,
+            latest: Union[float, None] = None,
+            period: float = 30 * 86400,
+            exclude_archived: bool = False) -> int:
+        """
+        Queue one unit per channel and period of time
+
+        Ranges start at the later of oldest and the channel's creation and are
+        aligned to multiples of period, so planning again adds no duplicates.
+        Without latest only periods that have fully elapsed are queued; the
+        current period is left to a later run, which queues it once it is over.
+
+        Args:
+            oldest (float) : Start of the export
+            latest (float or None) : End of the export, the start of the current period when None
+            period (float) : Seconds of history per unit
+            exclude_archived (bool) : Skip archived channels
+
+        Returns:
+            int: units added
+        """
+        if period <= 0:
+            raise ValueError('period must be positive.')
+
+        if latest is None:
+            # an end at "now" would differ on every run and overlap the previous plan
+            latest = (time.time() // period) * period
+        added = 0
+        for page in self.manager.channel.pages(exclude_archived=exclude_archived, exclude_member=True):
+            for channel in page:
+                start = max(oldest, float(channel.get('created', 0)))
+                bucket = (start // period) * period
+                while bucket < latest:
+                    end = min(bucket + period, latest)
+                    added += self.queue.add(channel['id'], max(bucket, start), end)
+                    bucket += period
+        self.logger.info(f'Planned {added} export units')
+        return added
+
+    def merge(self, path: str) -> dict:
+        """
+        Write a manifest of the exported files per channel, grouped by time range
+
+        Args:
+            path (str) : Manifest file
+
+        Returns:
+            dict: per channel the files, message count and whether every unit is done
+        """
+        manifest = {}
+        for unit in self.queue.units():
+            entry = manifest.setdefault(unit['channel'], {'files': [], 'messages': 0, 'complete': True})
+            entry['files'].extend(unit['checkpoint'].get('files', []))
+            entry['messages'] += unit['checkpoint'].get('messages', 0)
+            entry['complete'] = entry['complete'] and unit['state'] == DONE
+
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+        return manifest
+
+
+class ExportWorker:
+    def __init__(
+            self,
+            manager,
+            queue: WorkQueue,
+            directory: str,
+            worker_id: Union[str, None] = None,
+            checkpoint_pages: int = 10,
+            count: int = 1000,
+            retry_delay: float = 60.0,
+            max_attempts: int = 5):
+        """
+        Leases units from the queue and exports them with ExportWriter
+
+        A heartbeat thread renews the lease every third of lease_seconds.
+        Every checkpoint_pages pages the current segment is closed and its
+        files and resume ts are checkpointed, so a worker taking over a dead
+        worker's unit only fetches what was not durably written. A history
+        page that fails (http error or ok: false) checkpoints what was
+        written and releases the unit for retry_delay seconds, until the
+        unit's max_attempts-th lease fails and it is marked failed; a unit is
+        only completed after its last page arrived. stop() checkpoints the
+        current unit and gives it back at once.
+
+        Args:
+            manager (SlackApiManager) : Api manager used to fetch history
+            queue (WorkQueue) : Shared work queue
+            directory (str) : Output directory, shared or merged afterwards
+            worker_id (str or None) : Worker id, host name plus a random suffix when None
+            checkpoint_pages (int) : History pages per checkpoint
+            count (int) : Messages per history page
+            retry_delay (float) : Seconds a failed unit waits before it is leased again
+            max_attempts (int) : Leases of a unit after which a failure is final
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be positive.')
+
+        self.logger = Functions.PrintFunc()
+        self.manager = manager
+        self.queue = queue
+        self.directory = directory
+        self.worker_id = worker_id or f'{socket.gethostname()}-{uuid.uuid4().hex[:8]}'
+        self.checkpoint_pages = checkpoint_pages
+        self.count = count
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self, unit: WorkUnit, lost: threading.Event, done: threading.Event):
+        interval = self.queue.lease_seconds / 3
+        while not done.wait(interval):
+            if not self.queue.heartbeat(unit, self.worker_id):
+                self.logger.warning(f'Lease of unit {unit.id} lost')
+                lost.set()
+                return
+
+    def _export(self, unit: WorkUnit, lost: threading.Event) -> bool:
+        checkpoint = dict(unit.checkpoint)
+        files = list(checkpoint.get('files', []))
+        messages = checkpoint.get('messages', 0)
+        # history is exclusive at both ends; nudge latest so a message at exactly unit.latest is kept
+        latest = checkpoint.get('resume', unit.latest + 0.000001)
+        segment = len(files)
+
+        while True:
+            writer = ExportWriter(
+                self.directory, prefix=f'unit{unit.id:06d}-{unit.attempts}-{segment:04d}-{self.worker_id}')
+            written = 0
+            finished = False
+            interrupted = False
+            error = None
+            try:
+                for _ in range(self.checkpoint_pages):
+                    if lost.is_set() or self._stop.is_set():
+                        interrupted = True
+                        break
+                    page = 0
+                    # strict: an empty page from a failed call must not look like the end of the unit
+                    for message in self.manager.channel.history(
+                            unit.channel, count=self.count, latest=latest, oldest=unit.oldest, stream=True,
+                            strict=True):
+                        message['channel'] = unit.channel
+                        writer.write(message)
+                        latest = message['ts']
+                        written += 1
+                        page += 1
+                    if page < self.count:
+                        finished = True
+                        break
+            except SlackApiError as e:
+                error = e
+            finally:
+                writer.close()
+
+            files.extend(writer.files)
+            messages += written
+            checkpoint = {'files': files, 'messages': messages, 'resume': latest}
+            segment += 1
+            if error is not None:
+                # keep what was written for the next lease, then let run() release the unit
+                self.queue.checkpoint(unit, self.worker_id, checkpoint)
+                raise error
+            if finished:
+                return self.queue.complete(unit, self.worker_id, checkpoint)
+            if not self.queue.checkpoint(unit, self.worker_id, checkpoint) or interrupted:
+                return False
+
+    def run(self, max_units: Union[int, None] = None, idle_timeout: float = 0) -> int:
+        """
+        Export units until the queue is empty, max_units are done or stop() is called
+
+        Args:
+            max_units (int or None) : Units to export at most
+            idle_timeout (float) : Seconds to keep polling an empty queue for reclaimable leases
+
+        Returns:
+            int: units completed by this worker
+        """
+        completed = 0
+        idle_since = None
+        while not self._stop.is_set() and (max_units is None or completed < max_units):
+            unit = self.queue.lease(self.worker_id)
+            if unit is None:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= idle_timeout:
+                    break
+                self._stop.wait(min(1.0, self.queue.lease_seconds / 3))
+                continue
+            idle_since = None
+
+            lost = threading.Event()
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(unit, lost, done), daemon=True)
+            heartbeat.start()
+            try:
+                with span('export unit', unit=unit.id, channel=unit.channel, attempt=unit.attempts):
+                    if self._export(unit, lost):
+                        completed += 1
+                    elif self._stop.is_set() and not lost.is_set():
+                        # hand the unit back now instead of when its lease expires
+                        self.queue.release(unit, self.worker_id, attempt=False)
+            except Exception as e:
+                if unit.attempts >= self.max_attempts:
+                    self.logger.danger(f'Unit {unit.id} failed {unit.attempts} times, giving up: {e!r}')
+                    self.queue.fail(unit, self.worker_id, repr(e))
+                else:
+                    self.logger.danger(f'Unit {unit.id} failed, retrying in {self.retry_delay:.0f}s: {e!r}')
+                    self.queue.release(unit, self.worker_id, self.retry_delay)
+            finally:
+                done.set()
+                heartbeat.join()
+        return completed
@@ -0,0 +1,106 @@
+"""
+Declarative registry of Slack Web API endpoints
+"""
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Union
+from urllib.parse import quote_plus, urljoin
+
+_SAFE = re.compile(r'[A-Za-z0-9_.\-~]*\Z').match
+
+
+class Endpoint:
+    __slots__ = ('name', 'verb', 'key', 'empty')
+
+    def __init__(self, name: str, verb: str, key: Union[str, None], empty: Callable):
+        """
+        How one API method is called and how its response is unpacked
+
+        Args:
+            name (str) : Api method, e.g. 'channels.info'
+            verb (str) : HTTP method used for the call
+            key (str or None) : Response field returned to the caller; None returns the whole body
+            empty (callable) : Builds the value returned when the call fails
+        """
+        self.name = name
+        self.verb = verb
+        self.key = key
+        self.empty = empty
+
+    def __repr__(self) -> str:
+        return f'Endpoint({self.name!r}, {self.verb!r}, key={self.key!r})'
+
+
+ENDPOINTS = MappingProxyType({endpoint.name: endpoint for endpoint in (
+    Endpoint('api.test', 'POST', 'ok', bool),
+    Endpoint('auth.test', 'POST', 'ok', bool),
+    Endpoint('rtm.connect', 'POST', None, dict),
+    Endpoint('channels.archive', 'POST', 'ok', bool),
+    Endpoint('channels.create', 'POST', 'channel', dict),
+    Endpoint('channels.history', 'POST', 'messages', list),
+    Endpoint('channels.info', 'GET', 'channel', dict),
+    Endpoint('channels.invite', 'GET', 'channel', dict),
+    Endpoint('channels.join', 'GET', 'channel', dict),
+    Endpoint('channels.kick', 'GET', 'ok', bool),
+    Endpoint('channels.leave', 'GET', 'ok', bool),
+    Endpoint('channels.list', 'GET', 'channels', dict),
+    Endpoint('channels.mark', 'GET', 'ok', bool),
+    Endpoint('channels.rename', 'GET', 'channel', dict),
+    Endpoint('channels.replies', 'POST', 'messages', list),
+    Endpoint('channels.setPurpose', 'GET', 'ok', bool),
+    Endpoint('channels.setTopic', 'GET', 'ok', bool),
+    Endpoint('channels.unarchive', 'GET', 'ok', bool),
+    Endpoint('chat.postMessage', 'POST', None, dict),
+    Endpoint('users.info', 'GET', 'user', dict),
+    Endpoint('users.list', 'POST', 'members', list),
+    Endpoint('usergroups.list', 'GET', 'usergroups', list),
+)})
+
+
+@lru_cache(maxsize=None)
+def endpoint_urls(base_url: str) -> Dict[str, str]:
+    """
+    Absolute url of every registered endpoint, computed once per base url
+    """
+    return MappingProxyType({name: urljoin(base_url, f'./{name}') for name in ENDPOINTS})
+
+
+def auth_headers(headers, token: str):
+    """
+    Request headers carrying the token as a bearer credential
+    """
+    return MappingProxyType(dict(headers, Authorization=f'Bearer {token}'))
+
+
+def _encode_value(value) -> str:
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if type(value) is int:
+        return str(value)
+
+    value = value if type(value) is str else str(value)
+    return value if _SAFE(value) else quote_plus(value)
+
+
+def encode_params(data: dict) -> str:
+    """
+    Form-encode flat API parameters
+
+    Faster than urllib.parse.urlencode for the small, mostly ASCII payloads of
+    API calls: ints and already-safe strings skip quoting, None is omitted
+    and booleans are sent as true/false.
+
+    Args:
+        data (dict) : Parameter names to values
+
+    Returns:
+        str
+    """
+    return '&'.join([
+        f'{key}={_encode_value(value)}'
+        for key, value in data.items()
+        if value is not None
+    ])
@@ -0,0 +1,243 @@
+"""
+Real-time event ingestion over websocket (RTM / Socket Mode)
+"""
+import json
+import queue
+import random
+import threading
+from typing import Callable, Dict, List, Union
+
+from .transport import SlackApiError
+from .utils import Functions
+
+
+def _websocket_connect(url: str):
+    try:
+        import websocket
+    except ImportError:
+        raise ImportError('websocket-client is required for EventClient (pip install websocket-client)')
+    return websocket.create_connection(url)
+
+
+class EventClient:
+    def __init__(
+            self,
+            manager,
+            url_provider: Union[Callable[[], str], None] = None,
+            connect: Union[Callable, None] = None,
+            queue_size: int = 1000,
+            workers: int = 1,
+            backoff: float = 1.0,
+            max_backoff: float = 60.0,
+            backfill: bool = True):
+        """
+        Websocket event client dispatching events to handlers
+
+        Events are read on one thread and handed to worker threads through a
+        bounded queue, so slow handlers apply backpressure to the socket instead
+        of growing memory. After a reconnect, messages missed while disconnected
+        are fetched through channels.history and dispatched before live events.
+
+        Args:
+            manager (SlackApiManager) :
+                Api manager used for rtm.connect and history backfill.
+            url_provider (callable or None) :
+                Returns the websocket url to connect to. Defaults to rtm.connect;
+                pass a function calling apps.connections.open for Socket Mode.
+            connect (callable or None) :
+                Opens a connection for a url; the result needs recv(), send() and close().
+                Defaults to websocket-client; replace it to test against a local stand-in.
+            queue_size (int) :
+                The maximum number of events waiting for a handler.
+            workers (int) :
+                Number of handler threads.
+            backoff (float) :
+                Initial reconnect delay in seconds, doubled on every failed attempt.
+            max_backoff (float) :
+                Upper bound of the reconnect delay in seconds.
+            backfill (bool) :
+                Fetch messages missed while disconnected through channels.history.
+        """
+        self.logger = Functions.PrintFunc()
+        self.manager = manager
+        self.url_provider = url_provider or (lambda: self.manager.rtm_connect().get('url'))
+        self.connect = connect or _websocket_connect
+        self.workers = workers
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.backfill = backfill
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handlers = {}  # type: Dict[str, List[Callable]]
+
+        # latest message ts seen per channel, owned by the reader thread
+        self.latest = {}  # type: Dict[str, str]
+
+        self._running = threading.Event()
+        # set by stop() to cut a reconnect backoff short
+        self._stopping = threading.Event()
+        self._connection = None
+        self._threads = []  # type: List[threading.Thread]
+
+    def on(self, event_type: str, handler: Callable[[dict], None]):
+        """
+
+        Args:
+            event_type (str) :
+                Event type such as 'message', or '*' for every event.
+            handler (callable) :
+                Called with the event dict on a worker thread.
+        """
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def start(self):
+        if self._running.is_set():
+            return
+
+        self._stopping.clear()
+        self._running.set()
+        self._threads = [threading.Thread(target=self._read, name='slack-events-reader', daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._dispatch, name=f'slack-events-worker-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Union[float, None] = None):
+        self._running.clear()
+        self._stopping.set()
+
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+        for _ in range(self.workers):
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _put(self, event: dict):
+        if event.get('type') == 'message' and 'channel' in event and 'ts' in event:
+            channel = event['channel']
+            if float(event['ts']) > float(self.latest.get(channel, 0)):
+                self.latest[channel] = event['ts']
+        self.queue.put(event)
+
+    def _read(self):
+        attempt = 0
+        reconnect = False
+
+        while self._running.is_set():
+            try:
+                url = self.url_provider()
+                if not url:
+                    raise ConnectionError('websocket url is empty.')
+                self._connection = self.connect(url)
+
+                backfilled = self._backfill() if reconnect and self.backfill else set()
+                reconnect = True
+
+                for event in self._events(self._connection):
+                    attempt = 0
+                    key = (event.get('channel'), event.get('ts'))
+                    if event.get('type') == 'message' and key in backfilled:
+                        continue
+                    self._put(event)
+            except Exception as e:
+                if not self._running.is_set():
+                    break
+                self.logger.warning(f'websocket error: {e}')
+            finally:
+                if self._connection is not None:
+                    try:
+                        self._connection.close()
+                    except Exception:
+                        pass
+                    self._connection = None
+
+            if not self._running.is_set():
+                break
+
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            self.logger.info(f'reconnecting in {delay:.1f}s')
+            self._stopping.wait(delay)
+
+    def _events(self, connection):
+        while self._running.is_set():
+            raw = connection.recv()
+            if not raw:
+                return
+
+            payload = json.loads(raw)
+
+            # socket mode wraps events in an envelope that has to be acknowledged
+            if 'envelope_id' in payload:
+                connection.send(json.dumps({'envelope_id': payload['envelope_id']}))
+                payload = payload.get('payload', {}).get('event', payload)
+
+            event_type = payload.get('type')
+            if event_type == 'hello':
+                continue
+            if event_type in ('goodbye', 'disconnect'):
+                return
+
+            yield payload
+
+    def _backfill(self) -> set:
+        """
+        Dispatch messages posted since the last seen ts of every known channel
+
+        A channel whose history fails keeps its last seen ts, and the backfill
+        then raises so that the connection is retried before any live event
+        moves that ts past the gap.
+
+        Returns:
+            set: (channel, ts) of the dispatched messages
+        """
+        dispatched = set()
+        failed = []
+
+        for channel, oldest in list(self.latest.items()):
+            try:
+                messages = self.manager.channel.history_since(channel, oldest)
+            except Exception as e:
+                self.logger.warning(f'backfilling {channel} failed: {e}')
+                failed.append(channel)
+                continue
+
+            for message in messages:
+                event = dict(message, type='message', channel=channel)
+                dispatched.add((channel, event['ts']))
+                self._put(event)
+
+        if dispatched:
+            self.logger.info(f'backfilled {len(dispatched)} messages')
+        if failed:
+            raise SlackApiError('channels.history', f'backfill incomplete: {", ".join(sorted(failed))}')
+        return dispatched
+
+    def _dispatch(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+
+            handlers = self.handlers.get(event.get('type'), []) + self.handlers.get('*', [])
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    self.logger.danger(f'event handler failed: {e}')
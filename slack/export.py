@@ -0,0 +1,245 @@
+"""
+Streaming, compressed NDJSON export of channel history
+"""
+import json
+import os
+import queue
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Union
+
+from .tracing import propagate, span
+from .transport import SlackApiError
+from .utils import Functions
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+class ExportWriter:
+    def __init__(
+            self,
+            directory: str,
+            prefix: str = 'messages',
+            rotate_bytes: int = 256 * 2 ** 20,
+            chunk_bytes: int = 2 ** 20,
+            max_chunks: int = 8,
+            level: int = 6):
+        """
+        NDJSON sink compressing to rotating gzip files on a background thread
+
+        Messages are serialized into an in-memory chunk; full chunks go to a
+        bounded queue drained by the compression thread. When the queue is
+        full, write() blocks, which holds the fetchers back to the speed of
+        compression and disk, so memory stays below about
+        (max_chunks + 2) * chunk_bytes. zlib releases the GIL while it
+        compresses, so fetching and compression overlap. A file is closed and
+        the next one started once it reaches rotate_bytes; files always end on
+        a complete line.
+
+        Args:
+            directory (str) : Output directory, created when missing
+            prefix (str) : File names are <prefix>-00000.ndjson.gz, <prefix>-00001.ndjson.gz, ...
+            rotate_bytes (int) : Compressed size at which a new file is started
+            chunk_bytes (int) : Uncompressed size of the chunks handed to the compression thread
+            max_chunks (int) : Chunks allowed to wait for compression
+            level (int) : zlib compression level
+        """
+        if not directory:
+            raise ValueError('directory is empty.')
+
+        self.logger = Functions.PrintFunc()
+        self.directory = directory
+        self.prefix = prefix
+        self.rotate_bytes = rotate_bytes
+        self.chunk_bytes = chunk_bytes
+        self.level = level
+
+        self.files = []  # type: List[str]
+        self.messages = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self._chunk = []  # type: List[str]
+        self._chunk_size = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._error = None  # type: Union[BaseException, None]
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._compressor = None
+        self._file_bytes = 0
+
+        self._thread = threading.Thread(target=self._run, name='export-writer', daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        path = os.path.join(self.directory, f'{self.prefix}-{len(self.files):05d}.ndjson.gz')
+        self.files.append(path)
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        self._file_bytes = 0
+
+    def _finish(self):
+        tail = self._compressor.flush()
+        self._file.write(tail)
+        self.bytes_out += len(tail)
+        self._file.close()
+        self._file = None
+
+    def _run(self):
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    break
+                if self._file is None:
+                    self._open()
+
+                compressed = self._compressor.compress(chunk)
+                self._file.write(compressed)
+                self._file_bytes += len(compressed)
+                self.bytes_out += len(compressed)
+
+                if self._file_bytes >= self.rotate_bytes:
+                    self._finish()
+        except BaseException as e:
+            self._error = e
+            # keep draining so writers blocked on the queue fail instead of hanging
+            while self._queue.get() is not None:
+                pass
+        finally:
+            if self._file is not None:
+                self._finish()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f'export writer failed: {self._error!r}') from self._error
+        if self._closed:
+            raise ValueError('export writer is closed.')
+
+    def write(self, message: dict):
+        """
+        Append one message, blocking while the compression queue is full
+        """
+        line = _dumps(message) + '\n'
+        full = None
+        with self._lock:
+            self._check()
+            self._chunk.append(line)
+            self._chunk_size += len(line)
+            self.messages += 1
+            if self._chunk_size >= self.chunk_bytes:
+                full = self._take()
+
+        if full is not None:
+            self._queue.put(full)
+
+    def write_many(self, messages: Iterable[dict]) -> int:
+        count = 0
+        for message in messages:
+            self.write(message)
+            count += 1
+        return count
+
+    def _take(self) -> bytes:
+        data = ''.join(self._chunk).encode('utf-8')
+        self.bytes_in += len(data)
+        self._chunk = []
+        self._chunk_size = 0
+        return data
+
+    def close(self):
+        """
+        Compress the remaining messages and close the current file
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            rest = self._take() if self._chunk else None
+
+        if rest is not None:
+            self._queue.put(rest)
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f'export writer failed: {self._error!r}') from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_history(
+        channel_api,
+        channels: Iterable[str],
+        writer: ExportWriter,
+        oldest: Union[float, str] = 0,
+        count: int = 1000,
+        workers: int = 4,
+        failed: Union[Dict[str, str], None] = None) -> int:
+    """
+    Stream the history of every channel into an ExportWriter
+
+    Each page is decoded incrementally (history(stream=True)) and written
+    message by message, tagged with its channel, so no page or channel is
+    held in memory and a full writer queue slows the fetchers down.
+
+    A page that fails ends only its channel. The other channels are still
+    exported, then SlackApiError is raised naming the incomplete channels;
+    failed maps each of them to its error. Messages written before the
+    failure stay in the writer.
+
+    Args:
+        channel_api (SlackApiManager.Channel) : Channel api manager
+        channels (iterable of str) : Channel ids to export
+        writer (ExportWriter) : Sink receiving the messages
+        oldest (float or str) : Only export messages after this timestamp
+        count (int) : Messages per page, between 1 and 1000
+        workers (int) : Channels fetched concurrently
+        failed (dict or None) : Receives the error of every incomplete channel
+
+    Returns:
+        int: messages written
+    """
+    logger = Functions.PrintFunc()
+    if failed is None:
+        failed = {}
+
+    def export(channel: str) -> int:
+        written = 0
+        latest = None
+        with span('export channel', channel=channel) as current:
+            try:
+                while True:
+                    page = 0
+                    for message in channel_api.history(
+                            channel, count=count, latest=latest, oldest=oldest, stream=True, strict=True):
+                        message['channel'] = channel
+                        writer.write(message)
+                        latest = message['ts']
+                        page += 1
+                    written += page
+                    if page < count:
+                        return written
+            except SlackApiError as e:
+                logger.warning(f'Exporting {channel} stopped after {written} messages: {e.error}')
+                current.set('error', e.error)
+                failed[channel] = e.error
+                return written
+            finally:
+                current.set('messages', written)
+
+    with span('export_history') as current:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            written = sum(executor.map(propagate(export), channels))
+        current.set('messages', written)
+
+    if failed:
+        raise SlackApiError('channels.history', f'{len(failed)} channels incomplete: {", ".join(sorted(failed))}')
+    return written
@@ -0,0 +1,181 @@
+"""
+Rendering of Slack message markup to readable text
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
+
+from .directory import ChannelDirectory, UserDirectory
+from .utils import Functions
+
+# <@U123>, <#C123|general>, <!subteam^S123|@team>, <!here>, <https://example.com|label>
+_TOKEN = re.compile(r'<([@#!]?)([^>|]*)(?:\|([^>]*))?>')
+_ENTITY = re.compile(r'&(lt|gt|amp);')
+_ENTITIES = {'lt': '<', 'gt': '>', 'amp': '&'}
+_SPECIAL = {'here': '@here', 'channel': '@channel', 'everyone': '@everyone'}
+
+
+class MarkupRenderer:
+    def __init__(
+            self,
+            users: UserDirectory,
+            channels: ChannelDirectory,
+            subteams: Union[Dict[str, str], None] = None,
+            usergroups: Union[Callable[[], List[dict]], None] = None):
+        """
+        Batch renderer for mentions, channel links and special tokens
+
+        Referenced ids are collected for a whole batch of messages first and
+        resolved from the shared directories; unknown ids trigger at most one
+        users.list / channels.list / usergroups.list call per batch instead of
+        one users.info / channels.info call per token. Ids still unknown
+        afterwards are not looked up again until the directory is refreshed.
+
+        Args:
+            users (UserDirectory) :
+                Shared user cache. Refreshed when a batch references unknown users.
+            channels (ChannelDirectory) :
+                Shared channel cache. Refreshed when a batch references unknown channels.
+            subteams (dict or None) :
+                Optional user group id to handle mapping.
+            usergroups (callable or None) :
+                Returns the user groups of the team, e.g. SlackApiManager.usergroups.
+                Called when a batch references user groups missing from subteams.
+        """
+        self.logger = Functions.PrintFunc()
+        self.users = users
+        self.channels = channels
+        self.subteams = dict(subteams or {})
+        self.usergroups = usergroups
+
+        # ids that were still unknown after a refresh, so they are not retried every batch;
+        # user and channel ids are retried once their directory was refreshed again
+        self._unresolved_users = set()  # type: Set[str]
+        self._unresolved_channels = set()  # type: Set[str]
+        self._unresolved_subteams = set()  # type: Set[str]
+        self._user_refreshes = users.refreshes
+        self._channel_refreshes = channels.refreshes
+
+    @staticmethod
+    def collect(messages: Iterable[dict]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """
+
+        Args:
+            messages (iterable of dict) : Messages to scan
+
+        Returns:
+            tuple: (user ids, channel ids, user group ids) referenced by the messages
+        """
+        users = set()
+        channels = set()
+        subteams = set()
+        for message in messages:
+            if 'user' in message:
+                users.add(message['user'])
+            for sigil, target, _ in _TOKEN.findall(message.get('text', '')):
+                if sigil == '@':
+                    users.add(target)
+                elif sigil == '#':
+                    channels.add(target)
+                elif sigil == '!' and target.startswith('subteam^'):
+                    subteams.add(target[8:])
+        return users, channels, subteams
+
+    def prepare(self, messages: Iterable[dict]):
+        """
+        Make sure every id referenced by the messages is cached
+
+        Args:
+            messages (iterable of dict) : Messages to scan
+        """
+        users, channels, subteams = self.collect(messages)
+
+        # a refresh made elsewhere may have added ids given up on earlier
+        if self.users.refreshes != self._user_refreshes:
+            self._unresolved_users.clear()
+        if self.channels.refreshes != self._channel_refreshes:
+            self._unresolved_channels.clear()
+
+        missing_users = {user for user in users if user not in self.users} - self._unresolved_users
+        if missing_users and self.users.user is not None:
+            self.users.refresh()
+            missing_users = {user for user in missing_users if user not in self.users}
+
+        missing_channels = {channel for channel in channels if channel not in self.channels} - \
+            self._unresolved_channels
+        if missing_channels and self.channels.channel is not None:
+            self.channels.refresh()
+            missing_channels = {channel for channel in missing_channels if channel not in self.channels}
+
+        missing_subteams = {subteam for subteam in subteams if subteam not in self.subteams} - \
+            self._unresolved_subteams
+        if missing_subteams and self.usergroups is not None:
+            self.subteams.update((group['id'], group['handle']) for group in self.usergroups())
+            missing_subteams = {subteam for subteam in missing_subteams if subteam not in self.subteams}
+
+        self._unresolved_users.update(missing_users)
+        self._unresolved_channels.update(missing_channels)
+        self._unresolved_subteams.update(missing_subteams)
+        self._user_refreshes = self.users.refreshes
+        self._channel_refreshes = self.channels.refreshes
+
+    def _user_name(self, user_id: str) -> Union[str, None]:
+        member = self.users.get(user_id)
+        if member is None:
+            return None
+        profile = member.get('profile', {})
+        return profile.get('display_name') or profile.get('real_name') or member.get('name')
+
+    def _replace(self, match) -> str:
+        sigil, target, label = match.groups()
+
+        if sigil == '@':
+            name = self._user_name(target)
+            return f'@{name or label or target}'
+
+        if sigil == '#':
+            channel = self.channels.get(target)
+            return f'#{channel["name"] if channel else label or target}'
+
+        if sigil == '!':
+            if target in _SPECIAL:
+                return _SPECIAL[target]
+            if target.startswith('subteam^'):
+                handle = self.subteams.get(target[8:])
+                return f'@{handle}' if handle else label or target
+            return label or target
+
+        if label:
+            return label
+        return target[7:] if target.startswith('mailto:') else target
+
+    def render(self, text: str) -> str:
+        """
+
+        Args:
+            text (str) : Message text in Slack markup
+
+        Returns:
+            str
+        """
+        text = _TOKEN.sub(self._replace, text)
+        return _ENTITY.sub(lambda match: _ENTITIES[match.group(1)], text)
+
+    def render_messages(self, messages: List[dict]) -> List[dict]:
+        """
+        Resolve every id used by the batch once, then render each message
+
+        Args:
+            messages (list of dict) : Messages as returned by channels.history
+
+        Returns:
+            list: copies of the messages with rendered 'text' and a 'user_name' field
+        """
+        self.prepare(messages)
+
+        rendered = []
+        for message in messages:
+            message = dict(message, text=self.render(message.get('text', '')))
+            if 'user' in message:
+                message['user_name'] = self._user_name(message['user']) or message['user']
+            rendered.append(message)
+        return rendered
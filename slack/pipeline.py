@@ -0,0 +1,148 @@
+"""
+Multi-process transformation stage for exported history
+"""
+import collections
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Union
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def _encode(messages: Iterable[dict]) -> bytes:
+    return '\n'.join(_ENCODER.encode(message) for message in messages).encode('utf-8')
+
+
+def _decode(payload: bytes) -> List[dict]:
+    return [json.loads(line) for line in payload.split(b'\n') if line]
+
+
+def _apply(transform: Callable[[dict], Union[dict, None]], payload: bytes) -> bytes:
+    # runs in a worker process; messages dropped by the transform return None
+    transformed = (transform(message) for message in _decode(payload))
+    return _encode(message for message in transformed if message is not None)
+
+
+def flatten_attachments(message: dict) -> dict:
+    """
+    Fold attachment fallback/text/fields into a plain 'attachments_text' field
+
+    Args:
+        message (dict) : Message as returned by channels.history
+
+    Returns:
+        dict
+    """
+    parts = []
+    for attachment in message.get('attachments', []):
+        texts = [attachment[key] for key in ('pretext', 'title', 'text') if attachment.get(key)]
+        # fallback only stands in for an attachment without text of its own
+        if not texts and attachment.get('fallback'):
+            texts.append(attachment['fallback'])
+        parts.extend(texts)
+        for field in attachment.get('fields', []):
+            parts.append(f'{field.get("title", "")}: {field.get("value", "")}')
+
+    if parts:
+        message = dict(message, attachments_text='\n'.join(parts))
+    return message
+
+
+class ParallelStage:
+    def __init__(
+            self,
+            transform: Callable[[dict], Union[dict, None]],
+            workers: Union[int, None] = None,
+            batch_size: int = 1000,
+            max_pending: Union[int, None] = None,
+            initializer: Union[Callable, None] = None,
+            initargs: tuple = ()):
+        """
+        Apply a per-message transform on a process pool, preserving order
+
+        Batches travel to the workers as one NDJSON bytes object, which is
+        pickled as a single buffer instead of walking every dict. run_lines()
+        accepts raw NDJSON lines, so messages read from an export are never
+        decoded in the parent process.
+
+        Args:
+            transform (callable) :
+                Module-level function taking a message and returning the transformed
+                message, or None to drop it.
+            workers (int or None) :
+                Number of worker processes. Defaults to the number of CPUs.
+            batch_size (int) :
+                Number of messages per batch sent to a worker.
+            max_pending (int or None) :
+                The maximum number of batches in flight. Defaults to twice the workers.
+            initializer (callable or None) :
+                Called once in every worker, e.g. to load directories for rendering.
+            initargs (tuple) :
+                Arguments for initializer.
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive.')
+
+        workers = workers or os.cpu_count() or 1
+
+        self.transform = transform
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def _run(self, payloads: Iterable[bytes]) -> Iterator[bytes]:
+        pending = collections.deque()
+        for payload in payloads:
+            pending.append(self.executor.submit(_apply, self.transform, payload))
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    def _batches(self, items: Iterable, encode: Callable) -> Iterator[bytes]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield encode(batch)
+                batch = []
+        if batch:
+            yield encode(batch)
+
+    def run(self, messages: Iterable[dict]) -> Iterator[dict]:
+        """
+
+        Args:
+            messages (iterable of dict) : Messages to transform
+
+        Yields:
+            transformed messages, in input order
+        """
+        for payload in self._run(self._batches(messages, _encode)):
+            yield from _decode(payload)
+
+    def run_lines(self, lines: Iterable[bytes]) -> Iterator[bytes]:
+        """
+
+        Args:
+            lines (iterable of bytes) : NDJSON encoded messages, e.g. lines of an export file
+
+        Yields:
+            NDJSON encoded transformed messages without trailing newline, in input order
+        """
+        def join(batch):
+            return b'\n'.join(line.rstrip(b'\n') for line in batch)
+
+        for payload in self._run(self._batches(lines, join)):
+            yield from (line for line in payload.split(b'\n') if line)
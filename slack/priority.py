@@ -0,0 +1,176 @@
+"""
+Priority traffic classes sharing one per-token rate budget
+"""
+import contextlib
+import contextvars
+import threading
+import time
+from collections import deque
+from typing import Dict, Union
+
+INTERACTIVE = 'interactive'
+NORMAL = 'normal'
+BULK = 'bulk'
+CLASSES = (INTERACTIVE, NORMAL, BULK)
+
+_traffic_class = contextvars.ContextVar('slack_traffic_class', default=NORMAL)
+
+
+@contextlib.contextmanager
+def traffic_class(name: str):
+    """
+    Send the calls made inside the block with the given priority class
+
+    The class is kept in a context variable, so it follows the calling
+    thread or task. broadcast(), BatchDispatcher and export_history carry it
+    to their worker threads; other worker threads started inside the block
+    need their own traffic_class block (or contextvars.copy_context()).
+
+    Args:
+        name (str) : 'interactive', 'normal' or 'bulk'
+    """
+    if name not in CLASSES:
+        raise ValueError(f'unknown traffic class \'{name}\'.')
+    token = _traffic_class.set(name)
+    try:
+        yield
+    finally:
+        _traffic_class.reset(token)
+
+
+class _Bucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self) -> float:
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class PriorityRateLimiter:
+    def __init__(self, rate: float, burst: int = 1, shares: Union[Dict[str, float], None] = None):
+        """
+        Token bucket handing each token to the highest-priority waiting class
+
+        Drop-in replacement for RateLimiter as Transport(rate_limiter=...).
+        Interactive calls go before queued normal calls, which go before
+        queued bulk calls. A class with a share below 1 may use at most that
+        fraction of the rate, which keeps the rest in reserve for the classes
+        above it even when they are momentarily idle.
+
+        Args:
+            rate (float) : Requests allowed per second, for all classes together
+            burst (int) : Requests allowed back to back after idling
+            shares (dict or None) : Highest fraction of rate per class, default {'bulk': 0.8}
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+
+        shares = {BULK: 0.8} if shares is None else shares
+        for name, share in shares.items():
+            if name not in CLASSES:
+                raise ValueError(f'unknown traffic class \'{name}\'.')
+            if not 0 < share <= 1:
+                raise ValueError('shares must be between 0 and 1.')
+
+        now = time.monotonic()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.shares = shares
+
+        self._bucket = _Bucket(rate, self.burst, now)
+        self._caps = {
+            name: _Bucket(rate * share, max(1.0, self.burst * share), now)
+            for name, share in shares.items() if share < 1
+        }
+        self._queues = {name: deque() for name in CLASSES}
+        self._condition = threading.Condition()
+
+        self._granted = dict.fromkeys(CLASSES, 0)
+        self._waited = dict.fromkeys(CLASSES, 0.0)
+        self._max_wait = dict.fromkeys(CLASSES, 0.0)
+
+    def _delay(self, name: str, ticket: object) -> float:
+        """
+        Seconds until the ticket may take a token, 0 when it may take one now
+        """
+        queue = self._queues[name]
+        if queue[0] is not ticket:
+            return -1.0
+
+        cap = self._caps.get(name)
+        delay = max(self._bucket.wait(), cap.wait() if cap is not None else 0.0)
+
+        for higher in CLASSES[:CLASSES.index(name)]:
+            if self._queues[higher]:
+                higher_cap = self._caps.get(higher)
+                if higher_cap is None or higher_cap.wait() <= delay:
+                    # a higher class is queued and can use the next token
+                    return -1.0
+        return delay
+
+    def acquire(self, name: Union[str, None] = None) -> float:
+        """
+        Block until a request of the class may be sent
+
+        Args:
+            name (str or None) : Traffic class, the one set by traffic_class() when None
+
+        Returns:
+            float: seconds waited
+        """
+        name = name or _traffic_class.get()
+        ticket = object()
+        start = time.monotonic()
+
+        with self._condition:
+            queue = self._queues[name]
+            queue.append(ticket)
+            while True:
+                now = time.monotonic()
+                self._bucket.refill(now)
+                for cap in self._caps.values():
+                    cap.refill(now)
+
+                delay = self._delay(name, ticket)
+                if delay == 0.0:
+                    break
+                # -1: not our turn yet, wait to be woken by the next grant
+                self._condition.wait(delay if delay > 0 else self._bucket.wait() or None)
+
+            queue.popleft()
+            self._bucket.tokens -= 1
+            cap = self._caps.get(name)
+            if cap is not None:
+                cap.tokens -= 1
+
+            waited = time.monotonic() - start
+            self._granted[name] += 1
+            self._waited[name] += waited
+            self._max_wait[name] = max(self._max_wait[name], waited)
+            self._condition.notify_all()
+
+        return waited
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Queue wait per class: granted requests, mean and max wait in seconds, requests queued now
+        """
+        with self._condition:
+            return {
+                name: {
+                    'granted': self._granted[name],
+                    'mean_wait': self._waited[name] / self._granted[name] if self._granted[name] else 0.0,
+                    'max_wait': self._max_wait[name],
+                    'queued': len(self._queues[name])
+                }
+                for name in CLASSES
+            }
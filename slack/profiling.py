@@ -0,0 +1,307 @@
+"""
+On-demand per-stage profiling of SlackApiManager calls
+"""
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import List, Union
+
+from .endpoints import encode_params
+
+STAGES = ('encode', 'wait', 'send', 'decode', 'post_process', 'log')
+
+
+class _TimedLogger:
+    def __init__(self, profiler: 'Profiler', logger):
+        self._profiler = profiler
+        self._logger = logger
+
+    def __getattr__(self, name: str):
+        method = getattr(self._logger, name)
+        if not callable(method):
+            return method
+        profiler = self._profiler
+
+        def timed(*args, **kwargs):
+            return profiler._measure('log', method, args, kwargs)
+        return timed
+
+
+class Profiler:
+    def __init__(
+            self,
+            manager,
+            cpu: bool = False,
+            memory: bool = False,
+            interval: float = 0.005,
+            duration: Union[float, None] = None,
+            calls: Union[int, None] = None):
+        """
+        Per-stage time breakdown of the calls made through a SlackApiManager
+
+        While running, the manager, its inner apis and its transport get
+        instance-level wrappers that time each stage exclusively (a stage's
+        time excludes the stages nested in it):
+
+            encode        building the request body
+            wait          rate limiter and adaptive concurrency waits
+            send          the HTTP exchange up to the response headers, and retries
+            decode        JSON decoding of the response body
+            post_process  response checks and unpacking
+            log           Functions.PrintFunc output
+
+        Stopping removes the wrappers, so a manager that is not being
+        profiled runs exactly the code it runs without this module. Streamed
+        calls decode while the caller iterates, outside of the profile.
+
+        Args:
+            manager (SlackApiManager) : Manager to profile
+            cpu (bool) : Sample the stacks of threads inside a profiled call every interval
+            memory (bool) : Track allocations with tracemalloc
+            interval (float) : Seconds between stack samples
+            duration (float or None) : Stop automatically after this many seconds
+            calls (int or None) : Stop automatically after this many HTTP calls
+        """
+        self.manager = manager
+        self.cpu = cpu
+        self.memory = memory
+        self.interval = interval
+        self.duration = duration
+        self.calls = calls
+
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.counts = dict.fromkeys(STAGES, 0)
+        self.requests = 0
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self.allocations = []  # type: List[tracemalloc.StatisticDiff]
+        self.peak_memory = None  # type: Union[int, None]
+        self.elapsed = 0.0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = set()
+        self._patched = []
+        self._running = False
+        self._stopped = threading.Event()
+        self._started_tracemalloc = False
+        self._snapshot = None
+        self._sampler = None  # type: Union[threading.Thread, None]
+        self._timer = None  # type: Union[threading.Timer, None]
+        self._start = 0.0
+
+    def _measure(self, stage: str, func, args: tuple, kwargs: dict):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if not stack:
+            self._active.add(threading.get_ident())
+        frame = [0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            else:
+                self._active.discard(threading.get_ident())
+            with self._lock:
+                self.totals[stage] += elapsed - frame[0]
+                self.counts[stage] += 1
+
+    def _patch(self, target, name: str, replacement):
+        had = name in vars(target)
+        self._patched.append((target, name, had, vars(target).get(name)))
+        setattr(target, name, replacement)
+
+    def _instrument_api(self, api):
+        original_send = api._send
+        original_unpack = api._unpack
+        measure = self._measure
+
+        def _request(name, data, stream=False):
+            body = measure('encode', encode_params, (data,), {})
+            return api._send(name, body, stream)
+
+        def _send(name, body, stream=False):
+            res = measure('send', original_send, (name, body, stream), {})
+            self._count_request()
+            if res is not None and not stream:
+                # _unpack, _pages and broadcast all decode through res.json()
+                json = res.json
+                res.json = lambda **kwargs: measure('decode', json, (), kwargs)
+            return res
+
+        def _unpack(name, res, stream=False, strict=False):
+            return measure('post_process', original_unpack, (name, res, stream, strict), {})
+
+        self._patch(api, '_request', _request)
+        self._patch(api, '_send', _send)
+        self._patch(api, '_unpack', _unpack)
+        self._patch(api, 'logger', _TimedLogger(self, api.logger))
+
+    def _instrument_transport(self, transport):
+        measure = self._measure
+        for limiter in (getattr(transport, 'rate_limiter', None), getattr(transport, 'concurrency', None)):
+            if limiter is not None:
+                acquire = limiter.acquire
+                self._patch(limiter, 'acquire', lambda *args, _acquire=acquire: measure('wait', _acquire, args, {}))
+        if hasattr(transport, 'logger'):
+            self._patch(transport, 'logger', _TimedLogger(self, transport.logger))
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+            done = self.calls is not None and self.requests >= self.calls
+        if done:
+            threading.Thread(target=self.stop, name='profiler-stop', daemon=True).start()
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self._active):
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                code = frame.f_code
+                location = f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+                with self._lock:
+                    self.samples[location] += 1
+                    self.sample_count += 1
+
+    def start(self) -> 'Profiler':
+        """
+        Install the wrappers and start the sampler, tracemalloc and the duration timer
+        """
+        if self._running:
+            raise ValueError('profiler is already running.')
+        if getattr(self.manager, '_profiler', None) is not None:
+            raise ValueError('manager is already being profiled.')
+
+        self._running = True
+        self._patch(self.manager, '_profiler', self)
+        for api in (self.manager, self.manager.channel, self.manager.user, self.manager.chat):
+            self._instrument_api(api)
+        self._instrument_transport(self.manager.transport)
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.cpu:
+            self._sampler = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+            self._sampler.start()
+        if self.duration is not None:
+            self._timer = threading.Timer(self.duration, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self) -> 'Profiler':
+        """
+        Remove the wrappers and collect the allocation statistics; safe to call twice
+        """
+        with self._lock:
+            if not self._running:
+                return self
+            self._running = False
+
+        self.elapsed = time.perf_counter() - self._start
+        for target, name, had, value in reversed(self._patched):
+            if had:
+                setattr(target, name, value)
+            else:
+                delattr(target, name)
+        self._patched = []
+
+        self._stopped.set()
+        if self._sampler is not None and self._sampler is not threading.current_thread():
+            self._sampler.join()
+        if self._timer is not None:
+            self._timer.cancel()
+
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            self.allocations = snapshot.compare_to(self._snapshot, 'lineno')[:20]
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            self._snapshot = None
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return self
+
+    def wait(self, timeout: Union[float, None] = None) -> bool:
+        """
+        Block until the profiler stops on its own (duration or calls)
+        """
+        return self._stopped.wait(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def report(self, top: int = 10) -> dict:
+        """
+        Time per stage and, when enabled, CPU samples and allocations
+
+        Args:
+            top (int) : Entries of the sample and allocation lists
+
+        Returns:
+            dict: stages (seconds, share and count per stage), requests, elapsed,
+                and when enabled the hottest sampled lines and the largest allocation growths
+        """
+        with self._lock:
+            totals = dict(self.totals)
+            counts = dict(self.counts)
+            samples = self.samples.most_common(top)
+            sample_count = self.sample_count
+
+        measured = sum(totals.values()) or 1.0
+        report = {
+            'elapsed': self.elapsed,
+            'requests': self.requests,
+            'stages': {
+                stage: {'seconds': totals[stage], 'share': totals[stage] / measured, 'count': counts[stage]}
+                for stage in STAGES
+            }
+        }
+        if self.cpu:
+            report['samples'] = [
+                {'location': location, 'samples': count, 'share': count / sample_count}
+                for location, count in samples
+            ]
+        if self.memory:
+            report['peak_memory'] = self.peak_memory
+            report['allocations'] = [
+                {'location': str(stat.traceback), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in self.allocations[:top]
+            ]
+        return report
+
+    def __str__(self) -> str:
+        report = self.report()
+        lines = [f'{report["requests"]} requests in {report["elapsed"]:.2f}s']
+        for stage, values in report['stages'].items():
+            lines.append(f'  {stage:<13} {values["seconds"] * 1e3:10.1f}ms {values["share"] * 100:6.1f}%'
+                         f'  {values["count"]} calls')
+        for entry in report.get('samples', []):
+            lines.append(f'  {entry["share"] * 100:5.1f}%  {entry["location"]}')
+        if self.memory:
+            lines.append(f'  peak traced memory {report["peak_memory"] / 2 ** 20:.1f} MiB')
+            for entry in report['allocations'][:5]:
+                lines.append(f'  {entry["size_diff"] / 1024:+10.1f} KiB  {entry["location"]}')
+        return '\n'.join(lines)
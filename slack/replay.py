@@ -0,0 +1,373 @@
+"""
+Record Slack API traffic into cassettes and replay it against a local stand-in
+"""
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from .endpoints import ENDPOINTS
+from .transport import Transport
+from .utils import Functions
+
+CASSETTE_VERSION = 1
+
+
+def _params(query: str) -> Dict[str, str]:
+    return {key: value for key, value in parse_qsl(query, keep_blank_values=True) if key != 'token'}
+
+
+def _key(method: str, params: Dict[str, str]) -> Tuple[str, str]:
+    return method, '&'.join(f'{key}={params[key]}' for key in sorted(params))
+
+
+class RecordingTransport:
+    def __init__(self, transport: Union[Transport, None], path: str):
+        """
+        Transport wrapper appending every request/response pair to a cassette
+
+        A cassette is NDJSON: a header line, then one line per call with its
+        offset from the start of the recording, api method, parameters
+        (without the token, which travels in the Authorization header),
+        status, body and round-trip time.
+
+        Args:
+            transport (Transport or None) : Transport that sends the requests
+            path (str) : Cassette file, truncated when the recorder is created
+        """
+        if not path:
+            raise ValueError('path is empty.')
+
+        self.logger = Functions.PrintFunc()
+        self.transport = transport or Transport()
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._start = time.monotonic()
+        self._write({'cassette': CASSETTE_VERSION, 'recorded': time.time()})
+
+    def __getattr__(self, name: str):
+        return getattr(self.transport, name)
+
+    @property
+    def last_response(self):
+        """
+        Last response received on the calling thread, kept by the wrapped transport
+        """
+        return self.transport.last_response
+
+    @last_response.setter
+    def last_response(self, res):
+        # an instance attribute would hide the wrapped transport's value from then on
+        self.transport.last_response = res
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def request(self, verb: str, url: str, **kwargs):
+        offset = time.monotonic() - self._start
+        started = time.perf_counter()
+        res = self.transport.request(verb, url, **kwargs)
+        # reading the body here keeps iter_content working for streamed calls
+        body = res.content
+        elapsed = time.perf_counter() - started
+
+        parts = urlsplit(url)
+        data = kwargs.get('data')
+        query = data.decode('utf-8') if isinstance(data, bytes) else (data or parts.query)
+        self._write({
+            'at': round(offset, 6),
+            'verb': verb,
+            'method': parts.path.rsplit('/', 1)[-1],
+            'params': _params(query),
+            'status': res.status_code,
+            'retry_after': res.headers.get('Retry-After'),
+            'body': body.decode('utf-8', 'replace'),
+            'elapsed': round(elapsed, 6)
+        })
+        return res
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        self.transport.close()
+
+
+class Cassette:
+    def __init__(self, path: str):
+        """
+        Recorded calls, in recording order
+
+        Args:
+            path (str) : Cassette written by RecordingTransport
+        """
+        self.path = path
+        self.entries = []  # type: List[dict]
+
+        with open(path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('cassette') != CASSETTE_VERSION:
+                raise ValueError(f'unsupported cassette \'{path}\'.')
+            for line in f:
+                if line.strip():
+                    self.entries.append(json.loads(line))
+
+        self.entries.sort(key=lambda entry: entry['at'])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def duration(self) -> float:
+        return self.entries[-1]['at'] if self.entries else 0.0
+
+    def responses(self) -> Dict[Tuple[str, str], deque]:
+        """
+        Recorded responses grouped by api method and normalized parameters
+        """
+        responses = {}
+        for entry in self.entries:
+            responses.setdefault(_key(entry['method'], entry['params']), deque()).append(entry)
+        return responses
+
+
+class ReplayServer:
+    def __init__(self, cassette: Cassette, speed: float = 1.0, host: str = '127.0.0.1', port: int = 0):
+        """
+        Local stand-in for the Web API answering from a cassette
+
+        Identical calls are answered with their recorded responses in turn,
+        after the recorded round-trip time divided by speed. Calls missing
+        from the cassette get a 404 with error 'not_recorded'.
+
+        Args:
+            cassette (Cassette) : Recorded traffic
+            speed (float) : Replay speed multiplier, e.g. 10 for 10x
+            host (str) : Interface to listen on
+            port (int) : Port to listen on, 0 for any free port
+        """
+        if speed <= 0:
+            raise ValueError('speed must be positive.')
+
+        self.speed = speed
+        self.served = 0
+        self.missed = 0
+
+        self._responses = cassette.responses()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None  # type: Union[threading.Thread, None]
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/api/'
+
+    def _lookup(self, method: str, params: Dict[str, str]) -> Union[dict, None]:
+        with self._lock:
+            queue = self._responses.get(_key(method, params))
+            if not queue:
+                self.missed += 1
+                return None
+            entry = queue[0]
+            queue.rotate(-1)
+            self.served += 1
+            return entry
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self, query: str):
+                entry = server._lookup(self.path.split('?', 1)[0].rsplit('/', 1)[-1], _params(query))
+                if entry is None:
+                    status, body, retry_after = 404, '{"ok":false,"error":"not_recorded"}', None
+                else:
+                    time.sleep(entry['elapsed'] / server.speed)
+                    status, body, retry_after = entry['status'], entry['body'], entry.get('retry_after')
+
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                if retry_after is not None:
+                    self.send_header('Retry-After', retry_after)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._reply(urlsplit(self.path).query)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self._reply(self.rfile.read(length).decode('utf-8'))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class ReplayReport:
+    __slots__ = ('requests', 'missed', 'elapsed', 'latencies', 'lags', 'peak_memory')
+
+    def __init__(
+            self,
+            requests: int,
+            missed: int,
+            elapsed: float,
+            latencies: List[float],
+            lags: List[float],
+            peak_memory: Union[int, None]):
+        """
+        Measurements of one replay
+
+        Args:
+            requests (int) : Calls sent
+            missed (int) : Calls the cassette had no response for
+            elapsed (float) : Wall time of the replay in seconds
+            latencies (list) : Seconds per call, measured around the manager
+            lags (list) : Seconds each call started behind its schedule
+            peak_memory (int or None) : Peak traced allocation in bytes, None when not traced
+        """
+        self.requests = requests
+        self.missed = missed
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.lags = sorted(lags)
+        self.peak_memory = peak_memory
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> float:
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def latency(self, q: float) -> float:
+        """
+        Latency percentile in seconds, q between 0 and 1
+        """
+        return self._percentile(self.latencies, q)
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'missed': self.missed,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'p50': self.latency(0.5),
+            'p90': self.latency(0.9),
+            'p99': self.latency(0.99),
+            'max': self.latencies[-1] if self.latencies else 0.0,
+            'max_lag': self.lags[-1] if self.lags else 0.0,
+            'peak_memory': self.peak_memory
+        }
+
+    def __str__(self) -> str:
+        memory = 'n/a' if self.peak_memory is None else f'{self.peak_memory / 2 ** 20:.1f} MiB'
+        return (
+            f'{self.requests} requests in {self.elapsed:.2f}s ({self.throughput:.0f} req/s), '
+            f'latency p50 {self.latency(0.5) * 1e3:.1f}ms p90 {self.latency(0.9) * 1e3:.1f}ms '
+            f'p99 {self.latency(0.99) * 1e3:.1f}ms, max schedule lag {self.as_dict()["max_lag"] * 1e3:.1f}ms, '
+            f'missed {self.missed}, peak memory {memory}'
+        )
+
+
+def replay(
+        cassette: Cassette,
+        speed: float = 1.0,
+        concurrency: int = 16,
+        transport: Union[Transport, None] = None,
+        trace_memory: bool = True) -> ReplayReport:
+    """
+    Replay a cassette through a SlackApiManager against a local stand-in
+
+    Calls are issued on their recorded schedule compressed by speed, from up
+    to concurrency threads, and go through the full client stack: parameter
+    encoding, transport, response decoding and unpacking.
+
+    Args:
+        cassette (Cassette) : Recorded traffic
+        speed (float) : Replay speed multiplier, e.g. 10 for 10x
+        concurrency (int) : Threads issuing calls
+        transport (Transport or None) : Transport under test, a default one when None
+        trace_memory (bool) : Measure peak Python allocations with tracemalloc (slows the replay)
+
+    Returns:
+        ReplayReport
+    """
+    from .slack import SlackApiManager
+
+    entries = [entry for entry in cassette.entries if entry['method'] in ENDPOINTS]
+    latencies = []
+    lags = []
+
+    with ReplayServer(cassette, speed) as server:
+        manager = SlackApiManager('xoxb-replay', transport=transport, url=server.url)
+
+        def call(entry: dict, due: float):
+            started = time.perf_counter()
+            lags.append(max(0.0, started - due))
+            manager._call(entry['method'], entry['params'])
+            latencies.append(time.perf_counter() - started)
+
+        if trace_memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for entry in entries:
+                due = start + entry['at'] / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(call, entry, due)
+        elapsed = time.perf_counter() - start
+
+        peak_memory = None
+        if trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        manager.transport.close()
+        missed = server.missed
+
+    return ReplayReport(len(entries), missed, elapsed, latencies, lags, peak_memory)
@@ -0,0 +1,345 @@
+"""
+Full-text search over synced message history
+"""
+import json
+import mmap
+import os
+import re
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from .utils import Functions
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(buf, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _encode_postings(postings: List[Tuple[int, List[int]]]) -> bytes:
+    out = bytearray()
+    _encode_varint(len(postings), out)
+    last_doc = 0
+    for doc, positions in postings:
+        _encode_varint(doc - last_doc, out)
+        last_doc = doc
+        _encode_varint(len(positions), out)
+        last_pos = 0
+        for position in positions:
+            _encode_varint(position - last_pos, out)
+            last_pos = position
+    return bytes(out)
+
+
+def _decode_postings(buf, pos: int) -> List[Tuple[int, List[int]]]:
+    count, pos = _decode_varint(buf, pos)
+    postings = []
+    doc = 0
+    for _ in range(count):
+        delta, pos = _decode_varint(buf, pos)
+        doc += delta
+        npos, pos = _decode_varint(buf, pos)
+        positions = []
+        position = 0
+        for _ in range(npos):
+            delta, pos = _decode_varint(buf, pos)
+            position += delta
+            positions.append(position)
+        postings.append((doc, positions))
+    return postings
+
+
+class MessageIndex:
+    POSTINGS = 'postings.bin'
+    LEXICON = 'lexicon.json'
+    DOC_TS = 'doc_ts.bin'
+    DOC_CHANNEL = 'doc_channel.bin'
+    META = 'meta.json'
+
+    def __init__(self):
+        """
+        Inverted index over message text
+
+        Messages are ingested incrementally per channel and deduplicated on
+        (channel, ts), so re-ingesting overlapping history exports is cheap and
+        pages may arrive in any order, newest first included. Postings carry
+        token positions for phrase queries.
+        """
+        self.logger = Functions.PrintFunc()
+
+        self._channels = []  # type: List[str]
+        self._channel_ids = {}  # type: Dict[str, int]
+        # ts already indexed per channel id, rebuilt from the doc arrays on load
+        self._seen = []  # type: List[Set[float]]
+
+        self._doc_ts = array('d')
+        self._doc_channel = array('I')
+
+        # postings added since the last load, term -> [(doc, positions)]
+        self._postings = {}  # type: Dict[str, List[Tuple[int, List[int]]]]
+
+        # read-only segment loaded from disk
+        self._file = None
+        self._mmap = None
+        self._lexicon = {}  # type: Dict[str, int]
+
+    def __len__(self) -> int:
+        return len(self._doc_ts)
+
+    def _channel_id(self, channel: str) -> int:
+        channel_id = self._channel_ids.get(channel)
+        if channel_id is None:
+            channel_id = self._channel_ids[channel] = len(self._channels)
+            self._channels.append(channel)
+            self._seen.append(set())
+        return channel_id
+
+    def ingest(self, channel: str, messages: Iterable[dict]) -> int:
+        """
+
+        Args:
+            channel (str) :
+                Channel the messages belong to.
+            messages (iterable of dict) :
+                Messages as returned by channels.history, in any order.
+
+        Returns:
+            int: number of messages added to the index
+        """
+        if not channel:
+            raise ValueError('channel is empty.')
+
+        channel_id = self._channel_id(channel)
+        seen = self._seen[channel_id]
+        added = 0
+
+        for message in messages:
+            ts = float(message['ts'])
+            if ts in seen:
+                continue
+            seen.add(ts)
+
+            doc = len(self._doc_ts)
+            self._doc_ts.append(ts)
+            self._doc_channel.append(channel_id)
+
+            positions = {}  # type: Dict[str, List[int]]
+            for position, token in enumerate(tokenize(message.get('text', ''))):
+                positions.setdefault(token, []).append(position)
+            for token, token_positions in positions.items():
+                self._postings.setdefault(token, []).append((doc, token_positions))
+
+            added += 1
+
+        return added
+
+    def ingest_stream(self, items: Iterable[Tuple[str, dict]]) -> int:
+        """
+
+        Args:
+            items (iterable of tuple) :
+                (channel, message) pairs, e.g. read from a history export.
+
+        Returns:
+            int: number of messages added to the index
+        """
+        added = 0
+        for channel, message in items:
+            added += self.ingest(channel, (message,))
+        return added
+
+    def postings(self, term: str) -> List[Tuple[int, List[int]]]:
+        found = []
+        offset = self._lexicon.get(term)
+        if offset is not None:
+            found = _decode_postings(self._mmap, offset)
+        return found + self._postings.get(term, [])
+
+    @staticmethod
+    def _match_phrase(tokens: List[str], docs: set, postings: dict) -> set:
+        # positions of every token, restricted to candidate docs
+        positions = [
+            {doc: set(pos) for doc, pos in postings[token] if doc in docs}
+            for token in tokens
+        ]
+        matched = set()
+        for doc in docs:
+            for start in positions[0][doc]:
+                if all(start + offset in positions[offset][doc] for offset in range(1, len(tokens))):
+                    matched.add(doc)
+                    break
+        return matched
+
+    def search(
+            self,
+            query: str = '',
+            phrase: str = '',
+            channel: Union[str, None] = None,
+            oldest: float = 0.0,
+            latest: Union[float, None] = None,
+            limit: Union[int, None] = None) -> List[dict]:
+        """
+
+        Args:
+            query (str) :
+                Terms that must all appear in the message.
+            phrase (str) :
+                Exact sequence of terms that must appear in the message.
+            channel (str or None) :
+                Only return messages from this channel.
+            oldest (float) :
+                Start of time range of messages to include in results.
+            latest (float or None) :
+                End of time range of messages to include in results.
+            limit (int or None) :
+                The maximum number of hits to return.
+
+        Returns:
+            list: hits as {'channel': ..., 'ts': ...}, newest first
+        """
+        terms = tokenize(query)
+        phrase_tokens = tokenize(phrase)
+
+        channel_id = None
+        if channel is not None:
+            channel_id = self._channel_ids.get(channel)
+            if channel_id is None:
+                return []
+
+        postings = {term: self.postings(term) for term in terms + phrase_tokens}
+
+        docs = None
+        # intersect rarest postings first to keep candidate sets small
+        for term in sorted(postings, key=lambda t: len(postings[t])):
+            term_docs = {doc for doc, _ in postings[term]}
+            docs = term_docs if docs is None else docs & term_docs
+            if not docs:
+                return []
+
+        if docs is None:
+            docs = range(len(self._doc_ts))
+
+        hits = []
+        for doc in docs:
+            if channel_id is not None and self._doc_channel[doc] != channel_id:
+                continue
+            ts = self._doc_ts[doc]
+            if ts < oldest or (latest is not None and ts > latest):
+                continue
+            hits.append(doc)
+
+        if len(phrase_tokens) > 1:
+            hits = list(self._match_phrase(phrase_tokens, set(hits), postings))
+
+        hits.sort(key=lambda doc: self._doc_ts[doc], reverse=True)
+        if limit is not None:
+            hits = hits[:limit]
+
+        return [
+            {
+                'channel': self._channels[self._doc_channel[doc]],
+                'ts': f'{self._doc_ts[doc]:.6f}'
+            }
+            for doc in hits
+        ]
+
+    def save(self, path: str):
+        """
+        Write the index to a directory
+
+        Args:
+            path (str) : Directory to write the index files to
+        """
+        os.makedirs(path, exist_ok=True)
+
+        terms = set(self._lexicon) | set(self._postings)
+        lexicon = {}
+        tmp = os.path.join(path, self.POSTINGS + '.tmp')
+        with open(tmp, 'wb') as f:
+            offset = 0
+            for term in sorted(terms):
+                block = _encode_postings(self.postings(term))
+                lexicon[term] = offset
+                f.write(block)
+                offset += len(block)
+
+        self.close()
+        os.replace(tmp, os.path.join(path, self.POSTINGS))
+
+        with open(os.path.join(path, self.LEXICON), 'w', encoding='utf-8') as f:
+            json.dump(lexicon, f, separators=(',', ':'))
+        with open(os.path.join(path, self.DOC_TS), 'wb') as f:
+            self._doc_ts.tofile(f)
+        with open(os.path.join(path, self.DOC_CHANNEL), 'wb') as f:
+            self._doc_channel.tofile(f)
+        with open(os.path.join(path, self.META), 'w', encoding='utf-8') as f:
+            json.dump({'channels': self._channels}, f)
+
+        self._open_segment(path, lexicon)
+
+    def _open_segment(self, path: str, lexicon: Dict[str, int]):
+        self._lexicon = lexicon
+        self._postings = {}
+        self._file = open(os.path.join(path, self.POSTINGS), 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def load(cls, path: str) -> 'MessageIndex':
+        """
+        Open an index written by save(); postings are read through mmap on demand
+
+        Args:
+            path (str) : Directory the index was saved to
+
+        Returns:
+            MessageIndex
+        """
+        index = cls()
+
+        with open(os.path.join(path, cls.META), encoding='utf-8') as f:
+            meta = json.load(f)
+        index._channels = meta['channels']
+        index._channel_ids = {channel: i for i, channel in enumerate(index._channels)}
+
+        with open(os.path.join(path, cls.DOC_TS), 'rb') as f:
+            index._doc_ts.frombytes(f.read())
+        with open(os.path.join(path, cls.DOC_CHANNEL), 'rb') as f:
+            index._doc_channel.frombytes(f.read())
+
+        index._seen = [set() for _ in index._channels]
+        for ts, channel_id in zip(index._doc_ts, index._doc_channel):
+            index._seen[channel_id].add(ts)
+        with open(os.path.join(path, cls.LEXICON), encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+        index._open_segment(path, lexicon)
+        return index
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -2,36 +2,169 @@
 Slack API Manager
 """
 import datetime
-from urllib.parse import urljoin, urlencode
-
-import requests
-from typing import Union
+from types import MappingProxyType
+
+from typing import Iterable, Iterator, Union
+from .broadcast import BroadcastResult, broadcast
+from .endpoints import ENDPOINTS, auth_headers, encode_params, endpoint_urls
+from .profiling import Profiler
+from .stream import stream_response
+from .template import MessageTemplate
+from .tracing import span, start_span
+from .transport import SlackApiError, Transport
 from .utils import Functions
 
 
-class SlackApiManager:
+class _Api:
+    logger = Functions.PrintFunc()
+
+    def _setup(self, token: str, transport: Union[Transport, None], url: Union[str, None]):
+        self.url = url or SlackApiManager.url
+        self.token = token
+        self.headers = auth_headers(SlackApiManager.headers, token)
+        self.transport = transport or Transport()
+        self._urls = endpoint_urls(self.url)
+
+    def _request(self, name: str, data: dict, stream: bool = False):
+        """
+        Send a registered endpoint call
+
+        Returns:
+            requests.Response or None: None when the call failed (already logged)
+        """
+        return self._send(name, encode_params(data), stream)
+
+    def _send(self, name: str, body: str, stream: bool = False):
+        """
+        Send an already encoded endpoint call
+
+        Returns:
+            requests.Response or None: None when the call failed (already logged)
+        """
+        endpoint = ENDPOINTS[name]
+        url = self._urls[name]
+
+        if endpoint.verb == 'GET':
+            res = self.transport.get(f'{url}?{body}' if body else url, headers=self.headers, stream=stream)
+        else:
+            res = self.transport.post(url, data=body.encode('utf-8'), headers=self.headers, stream=stream)
+
+        if res.status_code != 200:
+            self.logger.warning(f'Response not found \'{url}\'')
+            return None
+        return res
+
+    def _call(self, name: str, data: dict, stream: bool = False, strict: bool = False):
+        """
+        Send a registered endpoint call and unpack its response
+
+        Args:
+            name (str) : Api method registered in ENDPOINTS
+            data (dict) : Api parameters, without the token
+            stream (bool) : Decode the response field incrementally
+            strict (bool) : Raise SlackApiError on failure instead of returning the empty value
+
+        Returns:
+            response field of the endpoint, or its empty value on failure
+        """
+        return self._unpack(name, self._request(name, data, stream), stream, strict)
+
+    def _http_error(self, name: str) -> SlackApiError:
+        last = self.transport.last_response
+        error = f'HTTP {last.status_code}' if last is not None else 'http error'
+        return SlackApiError(name, error, last)
+
+    def _unpack(self, name: str, res, stream: bool = False, strict: bool = False):
+        endpoint = ENDPOINTS[name]
+        if res is None:
+            if strict:
+                raise self._http_error(name)
+            return endpoint.empty()
+
+        if stream:
+            return stream_response(res, endpoint.key, self.logger, strict)
+
+        body = res.json()
+        if not body.get('ok'):
+            if strict:
+                raise SlackApiError(name, body.get('error', 'unknown_error'), res)
+            self.logger.warning(f'{body.get("error")}')
+            return endpoint.empty()
+
+        return body if endpoint.key is None else body[endpoint.key]
+
+    def _pages(self, name: str, data: dict, cursor: str = ''):
+        """
+        Walk a cursor-paginated endpoint
+
+        A page that fails raises SlackApiError instead of ending the walk,
+        so callers can tell a truncated crawl from a complete one.
+
+        Yields:
+            list: response field of each page
+        """
+        endpoint = ENDPOINTS[name]
+        # the walk is activated only around its requests, never across a yield
+        walk = start_span(f'pages {name}')
+        try:
+            while True:
+                if cursor:
+                    data = dict(data, cursor=cursor)
+
+                with walk.activate():
+                    res = self._request(name, data)
+                if res is None:
+                    raise self._http_error(name)
+
+                body = res.json()
+                if not body.get('ok'):
+                    raise SlackApiError(name, body.get('error', 'unknown_error'), res)
+
+                walk.add('pages')
+                yield body[endpoint.key]
+
+                cursor = body.get('response_metadata', {}).get('next_cursor', '')
+                if not cursor:
+                    return
+        finally:
+            walk.finish()
+
+
+class SlackApiManager(_Api):
     url = 'https://slack.com/api/'
-    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    headers = MappingProxyType({'Content-Type': 'application/x-www-form-urlencoded'})
     logger = Functions.PrintFunc()
 
-    def __init__(self, token: str):
+    def __init__(
+            self,
+            token: str,
+            transport: Union[Transport, None] = None,
+            url: Union[str, None] = None):
         """
         Slack Api Manager
+
+        One manager can be shared by any number of threads: token, url and
+        headers are fixed at construction, headers are read-only, and the
+        transport gives every thread its own keep-alive session.
+
         Args:
             token (str):
+            transport (Transport or None):
+                Connection pool and rate limiter shared by every inner class.
+            url (str or None):
+                Base url of the Web API, e.g. a local stand-in for testing.
         """
         self.logger = SlackApiManager.logger
 
         if not token:
             self.logger.warning('Token is empty (SlackApiManager)')
 
-        # initialize inner class
-        self.channel = self.Channel(token)
-        self.user = self.User(token)
-        self.chat = self.Chat(token)
+        self._setup(token, transport, url)
 
-        self.token = token
-        self.headers = SlackApiManager.headers
+        # initialize inner class
+        self.channel = self.Channel(token, self.transport, self.url)
+        self.user = self.User(token, self.transport, self.url)
+        self.chat = self.Chat(token, self.transport, self.url)
 
     def test(self):
         """
@@ -39,16 +172,7 @@ class SlackApiManager:
         Returns:
             bool
         """
-        url = urljoin(self.url, './api.test')
-        res = requests.post(
-            url=url,
-            headers=self.headers
-        )
-        if res.status_code is not 200:
-            self.logger.warning('Response not found')
-            return False
-
-        return res.json()['ok']
+        return self._call('api.test', {})
 
     def is_auth(self):
         """
@@ -56,35 +180,77 @@ class SlackApiManager:
         Returns:
             bool
         """
-        url = urljoin(self.url, './auth.test')
-        data = {'token': self.token}
-        res = requests.post(
-            url=url,
-            data=urlencode(data).encode('utf-8'),
-            headers=self.headers
-        )
+        return self._call('auth.test', {})
 
-        if res.status_code is not 200:
-            self.logger.warning('Response not found \'{url}\'')
-            return False
+    def rtm_connect(self) -> dict:
+        """
+        Start a Real Time Messaging session
+        Returns:
+            dict: websocket url and connection info
+        """
+        return self._call('rtm.connect', {})
 
-        return res.json()['ok']
+    def usergroups(self, include_disabled: bool = False) -> list:
+        """
+        List the user groups of the team
 
-    class Channel:
-        def __init__(self, token: str):
+        Args:
+            include_disabled (bool) : Include disabled user groups
+
+        Returns:
+            list: user groups, each with its id and handle
+        """
+        data = {
+            'include_disabled': include_disabled
+        }
+
+        return self._call('usergroups.list', data)
+
+    def profile(
+            self,
+            cpu: bool = False,
+            memory: bool = False,
+            duration: Union[float, None] = None,
+            calls: Union[int, None] = None,
+            interval: float = 0.005) -> Profiler:
+        """
+        Start a per-stage profile (encode, wait, send, decode, post_process, log) of this manager
+
+        Use it as a with block, or let it stop after duration seconds or a
+        number of calls. Nothing is instrumented while no profile runs.
+
+        Args:
+            cpu (bool) : Also sample the stacks of threads inside a call
+            memory (bool) : Also track allocations with tracemalloc
+            duration (float or None) : Stop after this many seconds
+            calls (int or None) : Stop after this many HTTP calls
+            interval (float) : Seconds between stack samples
+
+        Returns:
+            Profiler: running profiler; print it or call report() once stopped
+        """
+        return Profiler(self, cpu, memory, interval, duration, calls).start()
+
+    class Channel(_Api):
+        def __init__(
+                self,
+                token: str,
+                transport: Union[Transport, None] = None,
+                url: Union[str, None] = None):
             """
             Slack Channel Api Manager
 
             Args:
                 token (str) : Authentication token bearing required scopes.
+                transport (Transport or None) : Shared connection pool and rate limiter.
+                url (str or None) : Base url of the Web API.
             """
+            self.logger = SlackApiManager.logger
+
             if not token:
                 self.logger.warning('Token is empty (SlackApiManager)')
 
-            self.logger = SlackApiManager.logger
-            self.url = SlackApiManager.url
-            self.token = token
-            self.headers = SlackApiManager.headers
+            self._setup(token, transport, url)
 
         def archive(self, channel: str) -> bool:
             """
@@ -98,27 +264,11 @@ class SlackApiManager:
             if not channel:
                 raise ValueError('channel is emtpy.')
 
-            url = urljoin(self.url, './channels.archive')
-
             data = {
-                'token': self.token,
                 'channel': channel
             }
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning('Response not found \'{url}\'')
-                return False
-
-            if res.json()['ok'] is False:
-                self.logger.warning(f'{res.json()["error"]}')
-
-            return res.json()['ok']
+            return self._call('channels.archive', data)
 
         def create(self, name: str, validate: bool = True) -> dict:
             """
@@ -136,37 +286,23 @@ class SlackApiManager:
             if not name:
                 raise ValueError('name is empty.')
 
-            url = urljoin(self.url, './channels.create')
-
             data = {
-                'token': self.token,
                 'name': name,
                 'validate': validate
             }
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning('Response not found \'{url}\'')
-                return {}
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-
-            return res.json()['channel']
+            return self._call('channels.create', data)
 
         def history(
                 self,
                 channel: str,
                 count: int = 100,
                 inclusive: int = 0,
-                latest: datetime.datetime = datetime.datetime.now(),
-                oldest: int = 0,
-                unreads: int = 0) -> list:
+                latest: Union[datetime.datetime, float, str, None] = None,
+                oldest: Union[float, str] = 0,
+                unreads: int = 0,
+                stream: bool = False,
+                strict: bool = False) -> Union[list, Iterator[dict]]:
             """
 
             Args:
@@ -176,42 +312,72 @@ class SlackApiManager:
                     Number of messages to return, between 1 and 1000.
                 inclusive (int):
                     Include messages with latest or oldest timestamp in results.
-                latest (datetime.datetime):
+                latest (datetime.datetime, float, str or None):
                     End of time range of messages to include in results.
-                oldest (int):
+                    Defaults to the current time.
+                oldest (float or str):
                     Start of time range of messages to include in results.
                 unreads (int):
                     Include unread_count_display in the output?
+                stream (bool):
+                    Decode messages incrementally while the response arrives
+                    and return an iterator instead of a list.
+                strict (bool):
+                    Raise SlackApiError when the call fails instead of returning
+                    an empty result; a streamed error body raises at the end of iteration.
 
             Returns:
-                list
+                list or iterator
             """
             if not channel:
                 raise ValueError('channel is emtpy.')
 
-            url = urljoin(self.url, './channels.history')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'count': count,
                 'inclusive': inclusive,
-                'latest': latest,
                 'oldest': oldest,
                 'unreads': unreads
             }
+            if isinstance(latest, datetime.datetime):
+                latest = latest.timestamp()
+            if latest is not None:
+                data.update({'latest': latest})
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
+            return self._call('channels.history', data, stream=stream, strict=strict)
 
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return []
+        def history_since(self, channel: str, oldest: Union[float, str], count: int = 1000) -> list:
+            """
+            Fetch every message newer than oldest, paging backwards with latest
+
+            A page that fails raises SlackApiError instead of returning the
+            pages fetched so far, which would leave a gap before them.
 
-            return res.json()['messages']
+            Args:
+                channel (str):
+                    Channel to fetch history for.
+                oldest (float or str):
+                    Messages at or before this timestamp are excluded.
+                count (int):
+                    Number of messages to request per page, between 1 and 1000.
+
+            Returns:
+                list: messages, oldest first
+            """
+            messages = []
+            latest = None
+            with span('history_since', channel=channel) as current:
+                while True:
+                    page = self.history(channel, count=count, latest=latest, oldest=oldest, strict=True)
+                    messages.extend(page)
+                    if len(page) < count:
+                        break
+                    latest = page[-1]['ts']
+                current.set('messages', len(messages))
+
+            messages = [message for message in messages if float(message['ts']) > float(oldest)]
+            messages.sort(key=lambda message: float(message['ts']))
+            return messages
 
         def info(self, channel: str, include_locale: bool = False) -> dict:
             """
@@ -228,29 +394,12 @@ class SlackApiManager:
             if not channel:
                 raise ValueError('channel is emtpy.')
 
-            url = urljoin(self.url, './channels.info')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'include_locale': include_locale
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return {}
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
-
-            return res.json()['channel']
+            return self._call('channels.info', data)
 
         def invite(self, channel: str, user: str) -> dict:
             """
@@ -269,29 +418,12 @@ class SlackApiManager:
             if not user:
                 raise ValueError('User is empty.')
 
-            url = urljoin(self.url, './channels.invite')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'user': user
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return {}
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
-
-            return res.json()['channel']
+            return self._call('channels.invite', data)
 
         def join(self, name: str, validate: bool = True) -> dict:
             """
@@ -309,29 +441,12 @@ class SlackApiManager:
             if not name:
                 raise ValueError('name is empty.')
 
-            url = urljoin(self.url, './channels.join')
-
             data = {
-                'token': self.token,
                 'name': name,
                 'validate': validate
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return {}
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
-
-            return res.json()['channel']
+            return self._call('channels.join', data)
 
         def kick(self, channel: str, user: str) -> bool:
             """
@@ -350,29 +465,12 @@ class SlackApiManager:
             if not user:
                 raise ValueError('user is empty.')
 
-            url = urljoin(self.url, './channels.kick')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'user': user
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
+            return self._call('channels.kick', data)
 
         def leave(self, channel: str) -> bool:
             """
@@ -386,28 +484,11 @@ class SlackApiManager:
             if not channel:
                 raise ValueError('channel is empty.')
 
-            url = urljoin(self.url, './channels.leave')
-
             data = {
-                'token': self.token,
                 'channel': channel
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
+            return self._call('channels.leave', data)
 
         def replies(self, channel: str, thread_ts: str) -> list:
             """
@@ -426,25 +507,12 @@ class SlackApiManager:
             if not thread_ts:
                 raise ValueError('thread_ts is emtpy.')
 
-            url = urljoin(self.url, './channels.replies')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'thread_ts': thread_ts
             }
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return []
-
-            return res.json()['messages']
+            return self._call('channels.replies', data)
 
         def list(
                 self,
@@ -472,10 +540,7 @@ class SlackApiManager:
             Returns:
                 dict
             """
-            url = urljoin(self.url, './channels.list')
-
             data = {
-                'token': self.token,
                 'exclude_archived': exclude_archived,
                 'exclude_member': exclude_member,
                 'limit': limit
@@ -483,19 +548,36 @@ class SlackApiManager:
             if cursor is not None:
                 data.update({'cursor': cursor})
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
+            return self._call('channels.list', data)
 
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
+        def pages(
+                self,
+                exclude_archived: bool = False,
+                exclude_member: bool = False,
+                limit: int = 200):
+            """
+            Walk channels.list with cursor pagination
 
-            return res.json()['channels']
+            Args:
+                exclude_archived (bool) :
+                    Exclude archived channels from the list
+                exclude_member (bool):
+                    Exclude the members collection from each channel
+                limit (int) :
+                    The maximum number of items to return per page.
 
-        def mark(self, channel: str, ts: str) -> bool:
+            Yields:
+                list: channels of each page, raising SlackApiError when a page fails
+            """
+            data = {
+                'exclude_archived': exclude_archived,
+                'exclude_member': exclude_member,
+                'limit': limit
+            }
+
+            return self._pages('channels.list', data)
+
+        def mark(self, channel: str, ts: str, strict: bool = False) -> bool:
             """
 
             Args:
@@ -503,6 +585,8 @@ class SlackApiManager:
                     Channel to set reading cursor in.
                 ts (str) :
                     Timestamp of the most recently seen message.
+                strict (bool) :
+                    Raise SlackApiError when the call fails instead of returning False.
 
             Returns:
                 bool
@@ -512,29 +596,12 @@ class SlackApiManager:
             if not ts:
                 raise ValueError('ts (timestamp) is empty.')
 
-            url = urljoin(self.url, './channels.mark')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'ts': ts
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
+            return self._call('channels.mark', data, strict=strict)
 
         def rename(self, channel: str, name: str,
                    validate: bool = True) -> dict:
@@ -557,28 +624,15 @@ class SlackApiManager:
             if not name:
                 raise ValueError('name is emtpy.')
 
-            url = urljoin(self.url, './channels.rename')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'name': name,
                 'validate': validate
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
+            return self._call('channels.rename', data)
 
-            return res.json()['channel']
-
-        def setPurpose(self, channel: str, purpose: str) -> bool:
+        def setPurpose(self, channel: str, purpose: str, strict: bool = False) -> bool:
             """
 
             Args:
@@ -586,6 +640,8 @@ class SlackApiManager:
                     Channel to set the purpose of
                 purpose (str) :
                     The new purpose
+                strict (bool) :
+                    Raise SlackApiError when the call fails instead of returning False.
 
             Returns:
                 bool
@@ -595,31 +651,14 @@ class SlackApiManager:
             if not purpose:
                 raise ValueError('purpose is empty.')
 
-            url = urljoin(self.url, './channels.setPurpose')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'purpose': purpose
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
+            return self._call('channels.setPurpose', data, strict=strict)
 
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
-
-        def setTopic(self, channel: str, topic: str) -> bool:
+        def setTopic(self, channel: str, topic: str, strict: bool = False) -> bool:
             """
 
             Args:
@@ -627,6 +666,8 @@ class SlackApiManager:
                     Channel to set the topic of
                 topic (str) :
                     The new topic
+                strict (bool) :
+                    Raise SlackApiError when the call fails instead of returning False.
 
             Returns:
                 bool
@@ -636,29 +677,12 @@ class SlackApiManager:
             if not topic:
                 raise ValueError('topic is empty')
 
-            url = urljoin(self.url, './channels.setTopic')
-
             data = {
-                'token': self.token,
                 'channel': channel,
                 'topic': topic
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
+            return self._call('channels.setTopic', data, strict=strict)
 
         def unarchive(self, channel: str) -> bool:
             """
@@ -672,44 +696,31 @@ class SlackApiManager:
             if not channel:
                 raise ValueError('channel is empty.')
 
-            url = urljoin(self.url, './channels.unarchive')
-
             data = {
-                'token': self.token,
                 'channel': channel
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return False
+            return self._call('channels.unarchive', data)
 
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return False
-
-            return res.json()['ok']
-
-    class Chat:
-        def __init__(self, token: str):
+    class Chat(_Api):
+        def __init__(
+                self,
+                token: str,
+                transport: Union[Transport, None] = None,
+                url: Union[str, None] = None):
             """
             Slack Chat API Manager
             Args:
                 token (str) : Authentication token bearing required scopes.
+                transport (Transport or None) : Shared connection pool and rate limiter.
+                url (str or None) : Base url of the Web API.
             """
             self.logger = SlackApiManager.logger
-            self.url = SlackApiManager.url
 
             if not token:
-                self.logger.warning('Token is empty (SlackApiManager.Channel)')
+                self.logger.warning('Token is empty (SlackApiManager.Chat)')
 
-            self.token = token
-            self.headers = SlackApiManager.headers
+            self._setup(token, transport, url)
 
         def postMessage(
                 self,
@@ -756,38 +767,63 @@ class SlackApiManager:
             Returns:
                 dict
             """
-            url = urljoin(self.url, './chat.postMessage')
             data = {
-                'token': self.token,
                 'channel': channel,
                 'text': text
             }
             if kwargs:
                 data.update(kwargs)
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
+            return self._call('chat.postMessage', data)
 
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return {}
+        def postTemplate(self, template: MessageTemplate, **values) -> dict:
+            """
+            Post a message from a pre-serialized template
 
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
+            Args:
+                template (MessageTemplate) : Compiled chat.postMessage parameters
+                **values : Value per slot of the template, e.g. channel='C0123', title='CPU high'
 
-            return res.json()
+            Returns:
+                dict
+            """
+            return self._unpack('chat.postMessage', self._send('chat.postMessage', template.render(**values)))
 
-    class User:
-        def __init__(self, token: str):
+        def broadcast(
+                self,
+                channels: Iterable[str],
+                text: str,
+                journal: Union[str, None] = None,
+                max_workers: int = 8,
+                **kwargs) -> BroadcastResult:
+            """
+            Post the same message to many channels concurrently
+
+            Args:
+                channels (iterable of str) : Target channel ids
+                text (str) : Message text
+                journal (str or None) : File recording posted channels, so a rerun skips them
+                max_workers (int) : Concurrent posts
+                **kwargs : Other chat.postMessage parameters
+
+            Returns:
+                BroadcastResult: ts per posted channel and error per failed channel
+            """
+            return broadcast(self, channels, text, journal, max_workers, **kwargs)
+
+    class User(_Api):
+        def __init__(
+                self,
+                token: str,
+                transport: Union[Transport, None] = None,
+                url: Union[str, None] = None):
             """
             Slack User Api Manager
 
             Args:
                 token (str) : Authentication token bearing required scopes.
+                transport (Transport or None) : Shared connection pool and rate limiter.
+                url (str or None) : Base url of the Web API.
             """
             self.logger = SlackApiManager.logger
 
@@ -796,62 +832,74 @@ class SlackApiManager:
                     f'[{datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}] '
                     'WARNING: Token is empty (SlackApiManager.User)')
 
-            self.url = SlackApiManager.url
-            self.token = token
-            self.headers = SlackApiManager.headers
+            self._setup(token, transport, url)
 
         def info(self, user: str='', include_locale: str=''):
-            url = urljoin(self.url, './users.info')
-
             data = {
-                'token': self.token,
                 'user': user,
                 'include_locale': include_locale
             }
 
-            res = requests.get(
-                url=url,
-                params=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
-
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return {}
-
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return {}
-
-            return res.json()['user']
+            return self._call('users.info', data)
 
         def list(
                 self,
                 cursor: str='',
                 include_locale: str='',
                 limit: int=0,
-                presence: bool=False):
-            url = urljoin(self.url, './users.list')
+                presence: bool=False,
+                stream: bool=False) -> Union[list, Iterator[dict]]:
+            """
+
+            Args:
+                cursor (str) :
+                    Paginate through collections of data by setting the cursor parameter
+                    to a next_cursor attribute returned by a previous request's response_metadata.
+                include_locale (str) :
+                    Set this to true to receive the locale for users.
+                limit (int) :
+                    The maximum number of items to return.
+                presence (bool) :
+                    Whether to include presence data in the output.
+                stream (bool) :
+                    Decode members incrementally while the response arrives
+                    and return an iterator instead of a list.
+
+            Returns:
+                list or iterator
+            """
             data = {
-                'token': self.token,
                 'cursor': cursor,
                 'include_locale': include_locale,
                 'limit': limit,
                 'presence': presence
             }
 
-            res = requests.post(
-                url=url,
-                data=urlencode(data).encode('utf-8'),
-                headers=self.headers
-            )
+            return self._call('users.list', data, stream=stream)
+
+        def pages(
+                self,
+                include_locale: str='',
+                limit: int=200,
+                presence: bool=False):
+            """
+            Walk users.list with cursor pagination
 
-            if res.status_code is not 200:
-                self.logger.warning(f'Response not found \'{url}\'')
-                return []
+            Args:
+                include_locale (str) :
+                    Set this to true to receive the locale for users.
+                limit (int) :
+                    The maximum number of items to return per page.
+                presence (bool) :
+                    Whether to include presence data in the output.
 
-            if not res.json()['ok']:
-                self.logger.warning(f'{res.json()["error"]}')
-                return []
+            Yields:
+                list: members of each page, raising SlackApiError when a page fails
+            """
+            data = {
+                'include_locale': include_locale,
+                'limit': limit,
+                'presence': presence
+            }
 
-            return res.json()['members']
+            return self._pages('users.list', data)
@@ -0,0 +1,131 @@
+"""
+Warm-start snapshots of the user and channel directories
+"""
+import json
+import os
+import threading
+import time
+from typing import Union
+
+from .directory import ChannelDirectory, UserDirectory
+from .utils import Functions
+
+MAGIC = b'SLACKDIR1\n'
+
+
+class DirectorySnapshot:
+    def __init__(self, path: str, users: UserDirectory, channels: ChannelDirectory):
+        """
+        Persist directories to disk and reconcile them in the background
+
+        The snapshot is a single compact JSON document behind a magic line, so a
+        load is one read plus one C-level decode regardless of workspace size.
+        After loading, reconcile() re-crawls users.list and channels.list through
+        cursor pagination and applies only what changed.
+
+        Args:
+            path (str) : Snapshot file
+            users (UserDirectory) : Directory to load into and save from
+            channels (ChannelDirectory) : Directory to load into and save from
+        """
+        self.logger = Functions.PrintFunc()
+        self.path = path
+        self.users = users
+        self.channels = channels
+        self.saved_at = None  # type: Union[float, None]
+
+        self._thread = None
+        self._reconciled = threading.Event()
+
+    def save(self):
+        body = {
+            'saved_at': time.time(),
+            'users': list(self.users),
+            'channels': list(self.channels)
+        }
+
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        os.replace(tmp, self.path)
+        self.saved_at = body['saved_at']
+
+    def load(self) -> bool:
+        """
+
+        Returns:
+            bool: False when there is no usable snapshot
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+
+        if not data.startswith(MAGIC):
+            self.logger.warning(f'Ignoring snapshot with unknown format \'{self.path}\'')
+            return False
+
+        body = json.loads(data[len(MAGIC):])
+        self.users.update(body['users'])
+        self.channels.update(body['channels'])
+        self.saved_at = body['saved_at']
+        return True
+
+    def reconcile(self) -> int:
+        """
+        Re-crawl both directories and save the result
+
+        Returns:
+            int: number of entries that changed
+        """
+        try:
+            touched = self.users.refresh() + self.channels.refresh()
+            if touched or self.saved_at is None:
+                self.save()
+            return touched
+        finally:
+            self._reconciled.set()
+
+    def _reconcile(self):
+        try:
+            touched = self.reconcile()
+            self.logger.info(f'reconciled directory snapshot ({touched} changes)')
+        except Exception as e:
+            self.logger.warning(f'reconciling directory snapshot failed: {e}')
+
+    def start(self) -> 'DirectorySnapshot':
+        """
+        Reconcile on a background thread
+        """
+        if self._thread is None:
+            self._reconciled.clear()
+            self._thread = threading.Thread(target=self._reconcile, name='slack-snapshot', daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Union[float, None] = None) -> bool:
+        """
+        Block until the background reconciliation finished
+
+        Returns:
+            bool
+        """
+        return self._reconciled.wait(timeout)
+
+
+def warm_start(manager, path: str) -> DirectorySnapshot:
+    """
+    Load directories from a snapshot and reconcile them in the background
+
+    Args:
+        manager (SlackApiManager) : Api manager used to crawl users.list and channels.list
+        path (str) : Snapshot file, created on the first run
+
+    Returns:
+        DirectorySnapshot: use .users and .channels right away
+    """
+    snapshot = DirectorySnapshot(path, UserDirectory(manager.user), ChannelDirectory(manager.channel))
+    snapshot.load()
+    return snapshot.start()
@@ -0,0 +1,151 @@
+"""
+Incremental decoding of large Slack API responses
+"""
+import codecs
+import json
+from typing import Iterable, Iterator, Union
+from urllib.parse import urlsplit
+
+from .transport import SlackApiError
+from .utils import Functions
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER = '0123456789.eE+-'
+
+
+class _Reader:
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json = json.JSONDecoder()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+
+        # drop the consumed prefix so the buffer stays as small as one item
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+        for chunk in self.chunks:
+            if chunk:
+                self.text += self.decoder.decode(chunk)
+                return True
+
+        self.text += self.decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError('unexpected end of JSON response')
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f'expected one of {chars!r} at position {self.pos}, got {char!r}')
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.json.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # a number or literal touching the end of the buffer may be cut short, and
+            # a number cut as '12.' or '1e' stops before the character it could not use
+            if (end == len(self.text) or self.text[end] in _NUMBER) and self.fill():
+                continue
+
+            self.pos = end
+            return obj
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str, meta: Union[dict, None] = None) -> Iterator:
+    """
+    Yield the items of a top-level array field while the body is still arriving
+
+    Args:
+        chunks (iterable of bytes) :
+            Raw response body, e.g. requests.Response.iter_content().
+        key (str) :
+            Name of the top-level field holding the array, e.g. 'members'.
+        meta (dict or None) :
+            Receives every other top-level field ('ok', 'error', 'response_metadata', ...).
+
+    Yields:
+        items of the array, one at a time
+    """
+    if meta is None:
+        meta = {}
+
+    reader = _Reader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+
+        if name == key:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            meta[name] = reader.value()
+
+        if reader.expect(',}') == '}':
+            return
+
+
+def stream_response(res, key: str, logger=None, strict: bool = False) -> Iterator:
+    """
+    Stream the array field of a response requested with stream=True
+
+    Args:
+        res (requests.Response) :
+            Response of a request made with stream=True.
+        key (str) :
+            Name of the top-level field holding the array.
+        logger (Functions.PrintFunc or None) :
+            Logger for API errors.
+        strict (bool) :
+            Raise SlackApiError after the last item when the body reports an error.
+
+    Yields:
+        items of the array, one at a time
+    """
+    logger = logger or Functions.PrintFunc()
+    meta = {}
+    try:
+        yield from iter_json_array(res.iter_content(chunk_size=CHUNK_SIZE), key, meta)
+    finally:
+        res.close()
+
+    if not meta.get('ok', True):
+        if strict:
+            method = urlsplit(res.url).path.rsplit('/', 1)[-1]
+            raise SlackApiError(method, meta.get('error', 'unknown_error'), res)
+        logger.warning(f'{meta.get("error")}')
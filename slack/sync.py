@@ -0,0 +1,193 @@
+"""
+Differential users.list synchronisation
+"""
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from .utils import Functions
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+
+def fingerprint(member: dict) -> bytes:
+    """
+    Stable digest of a member record, independent of key order
+    """
+    encoded = json.dumps(member, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).digest()
+
+
+def changed_fields(old: dict, new: dict, prefix: str = '') -> List[str]:
+    """
+    Dotted paths of the fields that differ, descending into nested objects such as profile
+
+    Args:
+        old (dict) : Previous record
+        new (dict) : Current record
+        prefix (str) : Path of the records inside their parent
+
+    Returns:
+        list
+    """
+    fields = []
+    for key in sorted(set(old) | set(new)):
+        before = old.get(key)
+        after = new.get(key)
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            fields.extend(changed_fields(before, after, f'{prefix}{key}.'))
+        else:
+            fields.append(f'{prefix}{key}')
+    return fields
+
+
+class UserChange:
+    __slots__ = ('kind', 'user_id', 'fields', 'member', 'previous')
+
+    def __init__(
+            self,
+            kind: str,
+            user_id: str,
+            fields: Tuple[str, ...] = (),
+            member: Union[dict, None] = None,
+            previous: Union[dict, None] = None):
+        """
+        One member added, removed or changed between two syncs
+
+        Args:
+            kind (str) : 'added', 'removed' or 'changed'
+            user_id (str) : Member id
+            fields (tuple) : Dotted paths of changed fields, e.g. 'profile.title'
+            member (dict or None) : Current record, None when removed
+            previous (dict or None) : Record of the previous sync, None when added
+        """
+        self.kind = kind
+        self.user_id = user_id
+        self.fields = fields
+        self.member = member
+        self.previous = previous
+
+    def __repr__(self) -> str:
+        return f'UserChange({self.kind!r}, {self.user_id!r}, fields={self.fields!r})'
+
+
+class UserDeltaSync:
+    def __init__(self, user=None, path: Union[str, None] = None):
+        """
+        Turn full users.list crawls into added/removed/changed events
+
+        Every member is fingerprinted and compared with the previous snapshot;
+        only members whose fingerprint moved are diffed field by field, so the
+        work handed downstream scales with churn rather than headcount.
+
+        Args:
+            user (SlackApiManager.User or None) :
+                User api manager used to crawl users.list.
+            path (str or None) :
+                File keeping the previous snapshot between runs.
+        """
+        self.logger = Functions.PrintFunc()
+        self.user = user
+        self.path = path
+
+        self._members = {}  # type: Dict[str, dict]
+        self._fingerprints = {}  # type: Dict[str, bytes]
+
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                members = json.load(f)
+        except FileNotFoundError:
+            return False
+
+        self._members = {member['id']: member for member in members}
+        self._fingerprints = {user_id: fingerprint(member) for user_id, member in self._members.items()}
+        return True
+
+    def save(self):
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(list(self._members.values()), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def diff(self, members: Iterable[dict]) -> List[UserChange]:
+        """
+        Compare a complete member list with the previous snapshot and adopt it
+
+        Args:
+            members (iterable of dict) : Every member of the workspace
+
+        Returns:
+            list: UserChange per added, removed or changed member
+        """
+        changes = []
+        members_by_id = {}
+        fingerprints = {}
+
+        for member in members:
+            user_id = member['id']
+            digest = fingerprint(member)
+            members_by_id[user_id] = member
+            fingerprints[user_id] = digest
+
+            previous_digest = self._fingerprints.get(user_id)
+            if previous_digest is None:
+                changes.append(UserChange(ADDED, user_id, member=member))
+            elif previous_digest != digest:
+                previous = self._members[user_id]
+                fields = tuple(changed_fields(previous, member))
+                changes.append(UserChange(CHANGED, user_id, fields, member, previous))
+
+        for user_id, previous in self._members.items():
+            if user_id not in members_by_id:
+                changes.append(UserChange(REMOVED, user_id, previous=previous))
+
+        self._members = members_by_id
+        self._fingerprints = fingerprints
+        return changes
+
+    def sync(self, on_change: Union[Callable[[UserChange], None], None] = None) -> List[UserChange]:
+        """
+        Crawl users.list, emit the differences and persist the new snapshot
+
+        Only a complete crawl is diffed: a page that fails raises SlackApiError
+        before any change is emitted, since a truncated member list would report
+        every unseen member as removed. The previous snapshot is kept.
+
+        Args:
+            on_change (callable or None) : Called with every UserChange
+
+        Returns:
+            list: UserChange per added, removed or changed member
+        """
+        if self.user is None:
+            raise ValueError('user api manager is empty.')
+
+        members = []
+        # pages() raises on a failed page, so a partial crawl never reaches diff()
+        for page in self.user.pages():
+            members.extend(page)
+
+        if not members:
+            self.logger.warning('users.list returned no members, keeping previous snapshot')
+            return []
+
+        changes = self.diff(members)
+        if on_change is not None:
+            for change in changes:
+                on_change(change)
+
+        if self.path is not None and changes:
+            self.save()
+        return changes
@@ -0,0 +1,172 @@
+"""
+Adaptive polling of channels.history
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Union
+
+from .utils import Functions
+
+
+class _TailState:
+    __slots__ = ('oldest', 'interval', 'generation')
+
+    def __init__(self, oldest: str, interval: float, generation: int):
+        self.oldest = oldest
+        self.interval = interval
+        self.generation = generation
+
+
+class ChannelTailer:
+    def __init__(
+            self,
+            manager,
+            handler: Callable[[str, List[dict]], None],
+            min_interval: float = 1.0,
+            max_interval: float = 300.0,
+            decay: float = 2.0,
+            count: int = 200):
+        """
+        Poll many channels from one thread, following their activity
+
+        Each channel keeps the last seen ts and is polled with oldest set to it.
+        A poll returning messages shortens the channel's interval towards
+        min_interval; an empty poll grows it by decay up to max_interval. Due
+        channels are kept in a heap, so quiet channels cost almost nothing.
+
+        Args:
+            manager (SlackApiManager) :
+                Api manager used for channels.history.
+            handler (callable) :
+                Called with (channel, messages) for new messages, oldest first.
+            min_interval (float) :
+                Shortest polling interval in seconds.
+            max_interval (float) :
+                Longest polling interval in seconds.
+            decay (float) :
+                Factor applied to the interval after an empty poll.
+            count (int) :
+                Number of messages requested per channels.history page.
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError('invalid polling interval range.')
+        if decay <= 1:
+            raise ValueError('decay must be greater than 1.')
+
+        self.logger = Functions.PrintFunc()
+        self.manager = manager
+        self.handler = handler
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decay = decay
+        self.count = count
+
+        self._channels = {}  # type: Dict[str, _TailState]
+        self._heap = []  # type: List[tuple]
+        self._generation = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = threading.Event()
+        self._thread = None
+
+    def add(self, channel: str, oldest: Union[str, float, None] = None):
+        """
+
+        Args:
+            channel (str) :
+                Channel to tail.
+            oldest (str, float or None) :
+                Only deliver messages after this ts. Defaults to now.
+        """
+        if not channel:
+            raise ValueError('channel is empty.')
+
+        if oldest is None:
+            oldest = time.time()
+
+        with self._lock:
+            state = _TailState(f'{float(oldest):.6f}', self.min_interval, next(self._generation))
+            self._channels[channel] = state
+            heapq.heappush(self._heap, (time.monotonic(), state.generation, channel))
+        self._wakeup.set()
+
+    def remove(self, channel: str):
+        # stale heap entries are skipped when popped
+        with self._lock:
+            self._channels.pop(channel, None)
+
+    def intervals(self) -> Dict[str, float]:
+        with self._lock:
+            return {channel: state.interval for channel, state in self._channels.items()}
+
+    def _poll(self, channel: str, state: _TailState):
+        try:
+            messages = self.manager.channel.history_since(channel, state.oldest, count=self.count)
+        except Exception as e:
+            # a failed poll is not a quiet one: keep oldest and the interval, and retry
+            self.logger.warning(f'polling {channel} failed: {e}')
+            return
+
+        if messages:
+            state.oldest = messages[-1]['ts']
+            state.interval = max(self.min_interval, state.interval / self.decay)
+            try:
+                self.handler(channel, messages)
+            except Exception as e:
+                self.logger.danger(f'tail handler failed: {e}')
+        else:
+            state.interval = min(self.max_interval, state.interval * self.decay)
+
+    def poll_once(self) -> float:
+        """
+        Poll every channel that is due
+
+        Returns:
+            float: seconds until the next channel is due
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return self.max_interval
+
+                due, generation, channel = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    return due - now
+
+                heapq.heappop(self._heap)
+                state = self._channels.get(channel)
+                if state is None or state.generation != generation:
+                    continue
+
+            self._poll(channel, state)
+
+            with self._lock:
+                if self._channels.get(channel) is state:
+                    heapq.heappush(self._heap, (time.monotonic() + state.interval, generation, channel))
+
+    def run(self):
+        self._running.set()
+        self._loop()
+
+    def _loop(self):
+        while self._running.is_set():
+            delay = self.poll_once()
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._loop, name='slack-tailer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Union[float, None] = None):
+        self._running.clear()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,160 @@
+"""
+Pre-serialized message templates for high-volume chat.postMessage
+"""
+import json
+import uuid
+from typing import Any, Dict, List, Tuple, Union
+from urllib.parse import quote_plus
+
+from .endpoints import _encode_value
+
+
+class Slot:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        """
+        Placeholder for a value filled in on every send
+
+        A slot can stand for a whole API parameter (e.g. channel or text) or
+        for any value inside a JSON parameter such as attachments or blocks,
+        where it is replaced by the JSON encoding of the value.
+
+        Args:
+            name (str) : Keyword the value is passed under when rendering
+        """
+        if not name:
+            raise ValueError('name is empty.')
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f'Slot({self.name!r})'
+
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+# same output as quote_plus for ASCII text, without its per-call overhead
+_QUOTE_TABLE = {
+    code: '+' if code == 0x20 else f'%{code:02X}'
+    for code in range(128)
+    if not (chr(code).isalnum() or chr(code) in '_.-~')
+}
+
+
+def _quote(text: str) -> str:
+    return text.translate(_QUOTE_TABLE) if text.isascii() else quote_plus(text)
+
+
+def _encode_json_slot(value: Any) -> str:
+    return _quote(_dumps(value))
+
+
+def _encode_param_slot(value: Any) -> str:
+    if isinstance(value, (dict, list, tuple)):
+        return _encode_json_slot(value)
+    if value.__class__ is str:
+        return _quote(value)
+    return _encode_value(value)
+
+
+class MessageTemplate:
+    def __init__(self, **params):
+        """
+        chat.postMessage parameters compiled once into an encoded request body
+
+        Lists and dicts (attachments, blocks) are serialized to JSON and the
+        whole body is form-encoded at construction; render() only encodes the
+        slot values and joins them with the pre-encoded static pieces.
+
+        Args:
+            **params : Api parameters, e.g. channel=Slot('channel'), text=Slot('text'),
+                attachments=[{'title': Slot('title'), 'color': 'danger'}], as_user=True
+        """
+        if not params:
+            raise ValueError('params is empty.')
+
+        self.params = params
+        self._marker = f'__slot_{uuid.uuid4().hex}_'
+        self._slots = []  # type: List[Slot]
+        # static encoded text, or (slot name, encoder) to fill in on render
+        self._parts = []  # type: List[Union[str, Tuple[str, Any]]]
+
+        for key, value in params.items():
+            if value is None:
+                continue
+            self._static(f'{"&" if self._parts else ""}{key}=')
+            if isinstance(value, Slot):
+                self._parts.append((value.name, _encode_param_slot))
+            elif isinstance(value, (dict, list, tuple)):
+                self._compile_json(value)
+            else:
+                self._static(_encode_value(value))
+
+        self.slots = tuple(dict.fromkeys(part[0] for part in self._parts if isinstance(part, tuple)))
+
+    def _static(self, text: str):
+        if self._parts and isinstance(self._parts[-1], str):
+            self._parts[-1] += text
+        else:
+            self._parts.append(text)
+
+    def _replace_slots(self, value: Any) -> Any:
+        if isinstance(value, Slot):
+            self._slots.append(value)
+            return f'{self._marker}{len(self._slots) - 1}'
+        if isinstance(value, dict):
+            return {key: self._replace_slots(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._replace_slots(item) for item in value]
+        return value
+
+    def _compile_json(self, value: Any):
+        encoded = _dumps(self._replace_slots(value))
+        pieces = encoded.split(f'"{self._marker}')
+        self._static(_quote(pieces[0]))
+        for piece in pieces[1:]:
+            index, rest = piece.split('"', 1)
+            self._parts.append((self._slots[int(index)].name, _encode_json_slot))
+            self._static(_quote(rest))
+
+    def render(self, **values) -> str:
+        """
+        Encoded request body with the slots filled in
+
+        Args:
+            **values : Value per slot name
+
+        Returns:
+            str
+        """
+        try:
+            return ''.join([
+                part if part.__class__ is str else part[1](values[part[0]])
+                for part in self._parts
+            ])
+        except KeyError as e:
+            raise ValueError(f'slot {e.args[0]} is missing.') from None
+
+    def __repr__(self) -> str:
+        return f'MessageTemplate(slots={self.slots!r})'
+
+
+def render_params(template: MessageTemplate, **values) -> Dict[str, Any]:
+    """
+    Parameters of a rendered template as a plain dict, for debugging and comparisons
+    """
+    def fill(value):
+        if isinstance(value, Slot):
+            return values[value.name]
+        if isinstance(value, dict):
+            return {key: fill(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [fill(item) for item in value]
+        return value
+
+    return {
+        key: _dumps(fill(value))
+        if isinstance(value, (dict, list, tuple)) else fill(value)
+        for key, value in template.params.items()
+        if value is not None
+    }
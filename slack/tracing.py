@@ -0,0 +1,224 @@
+"""
+Hierarchical tracing of composite operations and their HTTP calls
+"""
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Union
+
+_current = contextvars.ContextVar('slack_span', default=None)
+_tracer = None  # type: Union[Tracer, None]
+_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ('tracer', 'id', 'parent', 'name', 'attributes', 'start', 'end', 'thread')
+
+    def __init__(self, tracer: 'Tracer', name: str, parent: Union['Span', None], attributes: dict):
+        """
+        One timed operation; parent is the span that was current when it started
+
+        Args:
+            tracer (Tracer) : Tracer collecting the span when it finishes
+            name (str) : Operation, e.g. 'channels.history' or 'broadcast'
+            parent (Span or None) : Enclosing span
+            attributes (dict) : Values shown with the span, e.g. channel or status
+        """
+        self.tracer = tracer
+        self.id = next(_ids)
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None  # type: Union[float, None]
+        self.thread = threading.get_ident()
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def add(self, key: str, value: float = 1):
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Make this span the parent of the spans started inside the block
+        """
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.perf_counter()
+            self.tracer._collect(self)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def __repr__(self) -> str:
+        return f'Span({self.name!r}, {self.duration * 1e3:.1f}ms, {self.attributes!r})'
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, key: str, value):
+        pass
+
+    def add(self, key: str, value: float = 1):
+        pass
+
+    @contextlib.contextmanager
+    def activate(self):
+        yield self
+
+    def finish(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, max_spans: int = 1_000_000):
+        """
+        Collects finished spans while installed
+
+        Nothing is recorded, and each instrumented call costs one global
+        lookup, unless a tracer is installed with install() or a with block.
+
+        Args:
+            max_spans (int) : Spans kept; later spans are counted as dropped
+        """
+        self.max_spans = max_spans
+        self.spans = []  # type: List[Span]
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def _collect(self, span: Span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def install(self):
+        global _tracer
+        _tracer = self
+
+    def uninstall(self):
+        global _tracer
+        if _tracer is self:
+            _tracer = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+
+    def chrome_trace(self) -> dict:
+        """
+        Spans in the Chrome trace event format (chrome://tracing, Perfetto, speedscope)
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = dict(span.attributes, span_id=span.id)
+            if span.parent is not None:
+                args['parent_id'] = span.parent.id
+            events.append({
+                'name': span.name,
+                'cat': 'slack',
+                'ph': 'X',
+                'ts': round((span.start - self._origin) * 1e6, 3),
+                'dur': round((span.end - span.start) * 1e6, 3),
+                'pid': pid,
+                'tid': span.thread,
+                'args': args
+            })
+        events.sort(key=lambda event: event['ts'])
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped': self.dropped}}
+
+    def export(self, path: str):
+        """
+        Write the spans as Chrome trace JSON
+        """
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        os.replace(tmp, path)
+
+
+def start_span(name: str, **attributes):
+    """
+    Start a span under the current one without making it current
+
+    Used by generators, which must not leave a context variable set while
+    suspended; activate() it around the work that belongs to it.
+
+    Returns:
+        Span, or NULL_SPAN when no tracer is installed
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, name, _current.get(), attributes)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """
+    Time the block as a child of the current span
+
+    Args:
+        name (str) : Operation name
+        **attributes : Values shown with the span
+
+    Yields:
+        Span, or NULL_SPAN when no tracer is installed
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield NULL_SPAN
+        return
+
+    current = Span(tracer, name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set('error', repr(e))
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Bind func to the caller's context, so spans it starts in a worker thread keep their parent
+
+    The whole context is copied whether or not a tracer is installed, so
+    other context variables, such as the priority traffic class, reach the
+    worker threads too.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
@@ -0,0 +1,223 @@
+"""
+Shared HTTP transport for Slack API calls
+"""
+import threading
+import time
+import weakref
+from typing import Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .concurrency import AdaptiveLimiter
+from .tracing import NULL_SPAN, start_span
+from .utils import Functions
+
+
+class SlackApiError(Exception):
+    def __init__(self, method: str, error: str, response=None):
+        """
+        Error reported by the Slack API or the transport
+
+        Args:
+            method (str) : Api method or url that failed
+            error (str) : Slack error code or http status description
+            response (requests.Response or None) : Failed response
+        """
+        super().__init__(f'{method}: {error}')
+        self.method = method
+        self.error = error
+        self.response = response
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Token bucket shared by every call going through a transport
+
+        Args:
+            rate (float) : Requests allowed per second
+            burst (int) : Requests allowed back to back after idling
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token
+
+        Returns:
+            float: seconds the caller has to wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent
+
+        Returns:
+            float: seconds waited
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class Transport:
+    def __init__(
+            self,
+            pool_size: int = 10,
+            rate_limiter: Union[RateLimiter, None] = None,
+            max_retries: int = 3,
+            concurrency: Union[AdaptiveLimiter, None] = None):
+        """
+        Pooled HTTP transport with an optional shared rate limiter
+
+        Each thread gets its own requests.Session on first use, so sessions are
+        never shared between threads and the request path takes no locks
+        (except the rate limiter's, when one is configured). A session is
+        referenced only by its thread, so the keep-alive connections of
+        short-lived pool threads are closed when the thread exits.
+
+        Args:
+            pool_size (int) :
+                Number of keep-alive connections kept per host and thread.
+            rate_limiter (RateLimiter or None) :
+                Limiter every request waits on before it is sent.
+            max_retries (int) :
+                How often a request rejected with 429 is retried after Retry-After.
+            concurrency (AdaptiveLimiter or None) :
+                Adaptive limit on requests in flight per api method.
+        """
+        self.logger = Functions.PrintFunc()
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+
+        self._local = threading.local()
+        # weak, so a session goes away with the thread-local storage of its thread
+        self._sessions = weakref.WeakSet()  # type: weakref.WeakSet
+        self._sessions_lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # close the pooled sockets once the owning thread has exited
+        weakref.finalize(session, adapter.close)
+
+        with self._sessions_lock:
+            self._sessions.add(session)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Session of the calling thread
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    def close(self):
+        """
+        Close the sessions of every thread
+        """
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.close()
+
+    @property
+    def last_response(self) -> Union[requests.Response, None]:
+        """
+        Last response received on the calling thread
+        """
+        return getattr(self._local, 'response', None)
+
+    @last_response.setter
+    def last_response(self, res: Union[requests.Response, None]):
+        self._local.response = res
+
+    def request(self, verb: str, url: str, **kwargs) -> requests.Response:
+        """
+
+        Args:
+            verb (str) : HTTP method
+            url (str) : Request url
+            **kwargs : Passed to requests.Session.request
+
+        Returns:
+            requests.Response
+        """
+        trace = start_span(verb)
+        traced = trace is not NULL_SPAN
+        method = url.rsplit('/', 1)[-1].split('?', 1)[0] if traced or self.concurrency is not None else None
+        if traced:
+            trace.name = method
+            trace.set('verb', verb)
+
+        attempt = 0
+        try:
+            while True:
+                if self.rate_limiter is not None:
+                    waited = self.rate_limiter.acquire()
+                    if traced:
+                        trace.add('rate_limit_wait', waited)
+                if self.concurrency is not None:
+                    requested = time.monotonic()
+                    start = self.concurrency.acquire(method)
+                    if traced:
+                        trace.add('concurrency_wait', start - requested)
+                status = None
+                try:
+                    res = self.session.request(verb, url, **kwargs)
+                    status = res.status_code
+                finally:
+                    if self.concurrency is not None:
+                        self.concurrency.release(method, start, status)
+                    if traced:
+                        trace.set('status', status)
+
+                if res.status_code != 429 or attempt >= self.max_retries:
+                    break
+
+                attempt += 1
+                delay = float(res.headers.get('Retry-After', 1))
+                self.logger.warning(f'Rate limited \'{url}\', retrying in {delay:.0f}s')
+                res.close()
+                if traced:
+                    trace.add('retries')
+                    trace.add('retry_wait', delay)
+                time.sleep(delay)
+        except BaseException as e:
+            trace.set('error', repr(e))
+            raise
+        finally:
+            trace.finish()
+
+        self.last_response = res
+        return res
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
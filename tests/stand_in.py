@@ -0,0 +1,273 @@
+"""
+Local stand-ins for the Slack Web API and websocket used by the tests
+"""
+import base64
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class SlackStandIn:
+    def __init__(self, handler):
+        """
+        HTTP server on a free local port answering every api method with handler
+
+        Args:
+            handler (callable) :
+                Called with (method, params); returns a response body dict, or
+                a (status, body) tuple for non-200 responses.
+        """
+        self.handler = handler
+        self.calls = []
+        self._lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode('utf-8') if length else parts.query
+                method = parts.path.rsplit('/', 1)[-1]
+                params = dict(parse_qsl(body))
+                with stand_in._lock:
+                    stand_in.calls.append((method, params))
+
+                result = stand_in.handler(method, params)
+                status, result = result if isinstance(result, tuple) else (200, result)
+                data = json.dumps(result).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def methods(self) -> list:
+        with self._lock:
+            return [method for method, _ in self.calls]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def paged(key: str, pages: list, fail: dict = None):
+    """
+    Handler serving cursor pages of key, failing the pages listed in fail
+
+    Args:
+        key (str) : Response field, e.g. 'members'
+        pages (list) : Items of every page
+        fail (dict or None) : Page index to the (status, body) returned instead
+
+    Returns:
+        callable
+    """
+    fail = fail or {}
+
+    def handler(method, params):
+        index = int(params.get('cursor') or 0)
+        if index in fail:
+            return fail[index]
+        cursor = str(index + 1) if index + 1 < len(pages) else ''
+        return {'ok': True, key: pages[index], 'response_metadata': {'next_cursor': cursor}}
+    return handler
+
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def _ws_accept(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def _ws_read_frame(sock) -> tuple:
+    def read(size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('connection closed')
+            data += chunk
+        return data
+
+    first, second = read(2)
+    length = second & 0x7f
+    if length == 126:
+        length = struct.unpack('!H', read(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', read(8))[0]
+    mask = read(4) if second & 0x80 else None
+    payload = read(length)
+    if mask is not None:
+        payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return first & 0x0f, payload
+
+
+def _ws_frame(opcode: int, payload: bytes, masked: bool) -> bytes:
+    header = bytearray([0x80 | opcode])
+    flag = 0x80 if masked else 0
+    if len(payload) < 126:
+        header.append(flag | len(payload))
+    elif len(payload) < 2 ** 16:
+        header.append(flag | 126)
+        header += struct.pack('!H', len(payload))
+    else:
+        header.append(flag | 127)
+        header += struct.pack('!Q', len(payload))
+    if not masked:
+        return bytes(header) + payload
+    mask = os.urandom(4)
+    return bytes(header) + mask + bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+
+class WebsocketStandIn:
+    def __init__(self, sessions: list):
+        """
+        Websocket server replaying scripted sessions, one per connection
+
+        Each session is a list of events sent as text frames, after which the
+        server closes the connection; frames sent by the client (e.g. Socket
+        Mode acknowledgements) are collected in received. Connections beyond the
+        scripted sessions stay open and silent until the client closes them.
+
+        Args:
+            sessions (list) : Events (dict) sent on each connection
+        """
+        self.sessions = list(sessions)
+        self.connections = 0
+        self.received = []
+        self._lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                request = b''
+                while b'\r\n\r\n' not in request:
+                    chunk = sock.recv(4096)
+                    if not chunk:
+                        return
+                    request += chunk
+                headers = dict(
+                    line.split(': ', 1) for line in request.decode('latin-1').split('\r\n')[1:] if ': ' in line
+                )
+                sock.sendall((
+                    'HTTP/1.1 101 Switching Protocols\r\n'
+                    'Upgrade: websocket\r\n'
+                    'Connection: Upgrade\r\n'
+                    f'Sec-WebSocket-Accept: {_ws_accept(headers["Sec-WebSocket-Key"])}\r\n\r\n'
+                ).encode('latin-1'))
+
+                with stand_in._lock:
+                    session = stand_in.sessions[stand_in.connections] \
+                        if stand_in.connections < len(stand_in.sessions) else None
+                    stand_in.connections += 1
+
+                for event in session or ():
+                    sock.sendall(_ws_frame(0x1, json.dumps(event).encode('utf-8'), masked=False))
+                if session is not None:
+                    # collect acknowledgements briefly, then drop the connection
+                    sock.settimeout(0.2)
+                try:
+                    while True:
+                        opcode, payload = _ws_read_frame(sock)
+                        if opcode == 0x8:
+                            break
+                        with stand_in._lock:
+                            stand_in.received.append(json.loads(payload))
+                except (ConnectionError, OSError):
+                    pass
+                finally:
+                    sock.close()
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'ws://127.0.0.1:{self.server.server_address[1]}/'
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WebsocketConnection:
+    def __init__(self, url: str):
+        """
+        Minimal websocket client, used when websocket-client is not installed
+
+        Args:
+            url (str) : ws:// url
+        """
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port))
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.sock.sendall((
+            f'GET {parts.path or "/"} HTTP/1.1\r\n'
+            f'Host: {parts.netloc}\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\n'
+            'Sec-WebSocket-Version: 13\r\n\r\n'
+        ).encode('latin-1'))
+
+        response = b''
+        while b'\r\n\r\n' not in response:
+            chunk = self.sock.recv(1)
+            if not chunk:
+                raise ConnectionError('handshake failed')
+            response += chunk
+        if _ws_accept(key) not in response.decode('latin-1'):
+            raise ConnectionError('handshake failed')
+
+    def recv(self) -> str:
+        try:
+            opcode, payload = _ws_read_frame(self.sock)
+        except (ConnectionError, OSError):
+            return ''
+        return '' if opcode == 0x8 else payload.decode('utf-8')
+
+    def send(self, text: str):
+        self.sock.sendall(_ws_frame(0x1, text.encode('utf-8'), masked=True))
+
+    def close(self):
+        try:
+            self.sock.sendall(_ws_frame(0x8, b'', masked=True))
+        except OSError:
+            pass
+        self.sock.close()
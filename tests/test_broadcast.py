@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn
+
+
+def post(method, params):
+    channel = params['channel']
+    if channel == 'C404':
+        return {'ok': False, 'error': 'channel_not_found'}
+    if channel == 'CNOTS':
+        return {'ok': True}
+    if channel == 'C500':
+        return 500, {}
+    return {'ok': True, 'channel': channel, 'ts': f'1.{channel[1:]}'}
+
+
+class TestBroadcast(unittest.TestCase):
+    def test_failures_are_recorded_per_channel(self):
+        with SlackStandIn(post) as stand_in:
+            chat = SlackApiManager('xoxb-test', url=stand_in.url).chat
+            result = chat.broadcast(['C1', 'C404', 'CNOTS', 'C500', 'C2'], 'hello', max_workers=4)
+
+        self.assertEqual(result.sent, {'C1': '1.1', 'C2': '1.2'})
+        self.assertEqual(result.failed, {'C404': 'channel_not_found', 'CNOTS': 'missing_ts', 'C500': 'http 500'})
+        self.assertFalse(result.ok)
+
+    def test_journal_skips_posted_channels(self):
+        with tempfile.TemporaryDirectory() as directory, SlackStandIn(post) as stand_in:
+            journal = os.path.join(directory, 'journal.ndjson')
+            chat = SlackApiManager('xoxb-test', url=stand_in.url).chat
+
+            chat.broadcast(['C1', 'C2'], 'hello', journal=journal)
+            result = chat.broadcast(['C1', 'C2', 'C3'], 'hello', journal=journal)
+
+            self.assertEqual(result.skipped, {'C1': '1.1', 'C2': '1.2'})
+            self.assertEqual(result.sent, {'C3': '1.3'})
+            self.assertEqual(len(stand_in.calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
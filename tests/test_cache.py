@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from slack.batch import BatchDispatcher
+from slack.cache import CachingTransport
+from slack.slack import SlackApiManager
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn
+
+
+def users(method, params):
+    if params.get('user') == 'U404':
+        return {'ok': False, 'error': 'user_not_found'}
+    return {'ok': True, 'user': {'id': params.get('user')}}
+
+
+class TestCachingTransport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hits_skip_the_network(self):
+        with SlackStandIn(users) as stand_in:
+            transport = CachingTransport(self.path)
+            manager = SlackApiManager('xoxb-test', transport, stand_in.url)
+            for _ in range(3):
+                self.assertEqual(manager.user.info('U1'), {'id': 'U1'})
+            self.assertEqual(manager.user.info('U404'), {})
+            self.assertEqual(manager.user.info('U404'), {})
+
+        self.assertEqual(stand_in.methods(), ['users.info'] * 3)
+        self.assertEqual(transport.stats()['hits'], 2)
+
+    def test_batch_over_cache(self):
+        with SlackStandIn(users) as stand_in:
+            manager = SlackApiManager('xoxb-test', CachingTransport(self.path), stand_in.url)
+            with BatchDispatcher(manager, max_workers=4) as batch:
+                calls = [('user.info', ('U1',)), ('user.info', ('U404',)), ('user.info', ('U1',))]
+                results = batch.run(calls)
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, SlackApiError)
+
+    def test_workspaces_do_not_share_entries(self):
+        def workspace(name):
+            return lambda method, params: {'ok': True, 'members': [{'id': f'{name}-workspace'}]}
+
+        with SlackStandIn(workspace('A')) as first, SlackStandIn(workspace('B')) as second:
+            transport = CachingTransport(self.path)
+            managers = [
+                SlackApiManager('xoxb-a', transport, first.url),
+                SlackApiManager('xoxb-b', transport, second.url),
+                SlackApiManager('xoxb-c', transport, first.url),
+            ]
+            members = [manager.user.list() for manager in managers]
+
+        self.assertEqual(members[0], [{'id': 'A-workspace'}])
+        self.assertEqual(members[1], [{'id': 'B-workspace'}])
+        self.assertEqual(members[2], [{'id': 'A-workspace'}])
+        self.assertEqual(first.methods(), ['users.list'] * 2)
+        self.assertEqual(transport.stats()['hits'], 0)
+
+    def test_streamed_calls_bypass_the_cache(self):
+        def history(method, params):
+            return {'ok': True, 'messages': [{'ts': '1.0'}, {'ts': '2.0'}]}
+
+        with SlackStandIn(history) as stand_in:
+            transport = CachingTransport(self.path)
+            manager = SlackApiManager('xoxb-test', transport, stand_in.url)
+            messages = manager.channel.history('C1', stream=True)
+            self.assertIs(transport.last_response._content, False)
+            self.assertEqual(list(messages), [{'ts': '1.0'}, {'ts': '2.0'}])
+
+        self.assertEqual(transport.stats()['entries'], 0)
+
+    def test_offline_miss(self):
+        transport = CachingTransport(self.path, offline=True)
+        with self.assertRaises(SlackApiError):
+            transport.get('http://127.0.0.1:1/users.info?user=U1')
+
+
+if __name__ == '__main__':
+    unittest.main()
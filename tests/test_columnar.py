@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from slack.columnar import COLUMNS, MessageStore
+
+MESSAGES = [
+    {'channel': 'C1', 'ts': '100.000000', 'user': 'U1', 'thread_ts': '100.000000', 'reply_count': 2},
+    {'channel': 'C1', 'ts': '130.000000', 'user': 'U2', 'thread_ts': '100.000000'},
+    {'channel': 'C1', 'ts': '160.000000', 'user': 'U1', 'thread_ts': '100.000000'},
+    {'channel': 'C2', 'ts': '200.000000', 'user': 'U2', 'thread_ts': '200.000000', 'reply_count': 1},
+    {'channel': 'C2', 'ts': '260.000000', 'user': 'U3', 'thread_ts': '200.000000'},
+    {'channel': 'C2', 'ts': '300.000000', 'subtype': 'bot_message'},
+    {'channel': 'C1', 'ts': '4000.000000', 'user': 'U2'},
+]
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        self.store = MessageStore.from_messages(MESSAGES)
+
+    def test_first_reply_latency(self):
+        # C1 thread 100 is first answered at 130, C2 thread 200 at 260
+        self.assertEqual(self.store.first_reply_latency().tolist(), [30.0, 60.0])
+        self.assertEqual(self.store.first_reply_latency(channel='C2').tolist(), [60.0])
+        self.assertEqual(self.store.first_reply_latency(user='U3').tolist(), [60.0])
+        self.assertEqual(self.store.reply_latency_stats()['mean'], 45.0)
+
+    def test_top_posters(self):
+        self.assertEqual(self.store.top_posters(), [('U2', 3), ('U1', 2), ('U3', 1)])
+        self.assertEqual(self.store.top_posters(limit=1), [('U2', 3)])
+        self.assertEqual(self.store.top_posters(limit=1, oldest=120, latest=300), [('U2', 2)])
+        self.assertEqual(self.store.top_posters(channel='C9'), [])
+
+    def test_counts(self):
+        self.assertEqual(self.store.per_channel(), {'C1': 4, 'C2': 3})
+        self.assertEqual(self.store.replies_per_channel(), {'C1': 2, 'C2': 1})
+        hours, counts = self.store.messages_per_hour()
+        self.assertEqual(hours.tolist(), [0, 3600])
+        self.assertEqual(counts.tolist(), [6, 1])
+
+    def test_save_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'store')
+            self.store.save(path)
+            for mmap in (True, False):
+                loaded = MessageStore.load(path, mmap=mmap)
+                for name in COLUMNS:
+                    numpy.testing.assert_array_equal(getattr(loaded, name), getattr(self.store, name))
+                self.assertEqual(loaded.users, ['U1', 'U2', 'U3'])
+                self.assertEqual(loaded.channels, ['C1', 'C2'])
+                self.assertEqual(loaded.first_reply_latency().tolist(), [30.0, 60.0])
+                self.assertEqual(loaded.top_posters(), [('U2', 3), ('U1', 2), ('U3', 1)])
+                del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
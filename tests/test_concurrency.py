@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+from slack.concurrency import AdaptiveLimiter
+from slack.slack import SlackApiManager
+from slack.transport import Transport
+
+from .stand_in import SlackStandIn
+
+
+def respond(limiter: AdaptiveLimiter, latency: float, status=200, method: str = 'users.info'):
+    limiter.acquire(method)
+    limiter.release(method, time.monotonic() - latency, status)
+
+
+def limit(limiter: AdaptiveLimiter, method: str = 'users.info') -> float:
+    return limiter._methods[method].limit
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_additive_increase(self):
+        limiter = AdaptiveLimiter(initial=4, maximum=6)
+        for _ in range(5):
+            respond(limiter, 0.01)
+        # 4 + 1/4 + 1/4.25 + ... reaches 5 after five responses
+        self.assertEqual(limiter.limits(), {'users.info': 5})
+
+        for _ in range(100):
+            respond(limiter, 0.01)
+        self.assertEqual(limiter.limits(), {'users.info': 6})
+
+    def test_multiplicative_decrease_once_per_round_trip(self):
+        for status in (429, 503, None):
+            limiter = AdaptiveLimiter(initial=8)
+            respond(limiter, 0.01)
+            start = limit(limiter)
+
+            respond(limiter, 0.01, status)
+            respond(limiter, 0.01, status)
+            self.assertEqual(limit(limiter), start * 0.5)
+
+            time.sleep(0.02)
+            respond(limiter, 0.01, status)
+            self.assertEqual(limit(limiter), start * 0.25)
+
+    def test_minimum(self):
+        limiter = AdaptiveLimiter(initial=2, minimum=2)
+        respond(limiter, 0.001, 429)
+        self.assertEqual(limiter.limits(), {'users.info': 2})
+
+    def test_latency_increase_backs_off(self):
+        limiter = AdaptiveLimiter(initial=8)
+        # slow warm-up, then the steady state the baseline settles on
+        for latency in (0.5, 0.4) + (0.01,) * 20:
+            respond(limiter, latency)
+        before = limit(limiter)
+        self.assertAlmostEqual(limiter.stats()['users.info']['baseline'], 0.01, delta=0.001)
+
+        time.sleep(0.05)
+        for _ in range(10):
+            respond(limiter, 0.05)
+        self.assertLess(limit(limiter), before)
+
+    def test_baseline_decays(self):
+        limiter = AdaptiveLimiter(initial=4)
+        # one unusually fast response, then a steady latency five times higher
+        respond(limiter, 0.001)
+        for _ in range(150):
+            respond(limiter, 0.005)
+            time.sleep(0.002)
+
+        stats = limiter.stats()['users.info']
+        self.assertGreater(stats['baseline'], 0.0025)
+        self.assertGreater(stats['limit'], 1)
+
+        pinned = AdaptiveLimiter(initial=4, baseline_decay=0)
+        respond(pinned, 0.001)
+        for _ in range(150):
+            respond(pinned, 0.005)
+            time.sleep(0.002)
+        self.assertEqual(pinned.limits(), {'users.info': 1})
+
+    def test_limit_bounds_inflight_requests(self):
+        inflight = []
+        current = [0]
+        lock = threading.Lock()
+
+        def slow(method, params):
+            with lock:
+                current[0] += 1
+                inflight.append(current[0])
+            time.sleep(0.02)
+            with lock:
+                current[0] -= 1
+            return {'ok': True, 'user': {}}
+
+        limiter = AdaptiveLimiter(initial=2, maximum=2)
+        with SlackStandIn(slow) as stand_in:
+            manager = SlackApiManager('xoxb-test', Transport(concurrency=limiter), stand_in.url)
+            threads = [threading.Thread(target=manager.user.info, args=('U1',)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(max(inflight), 2)
+        self.assertEqual(limiter.stats()['users.info']['inflight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
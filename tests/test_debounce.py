@@ -0,0 +1,108 @@
+import time
+import unittest
+
+from slack.debounce import Debouncer, latest_ts, read_cursor_coalescer
+from slack.slack import SlackApiManager
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn
+
+
+class TestDebouncer(unittest.TestCase):
+    def test_coalesces_to_latest(self):
+        calls = []
+        debouncer = Debouncer(lambda key, value: calls.append((key, value)), merge=latest_ts)
+        for ts in ('1.0', '3.0', '2.0'):
+            debouncer.submit('C1', ts)
+
+        self.assertEqual(debouncer.flush(), 1)
+        self.assertEqual(calls, [('C1', '3.0')])
+
+        debouncer.submit('C1', '2.0')
+        self.assertEqual(debouncer.pending(), {})
+
+    def test_false_return_is_retried(self):
+        results = [False, True]
+        calls = []
+
+        def mark(key, value):
+            calls.append(value)
+            return results.pop(0)
+
+        debouncer = Debouncer(mark, interval=0.01)
+        debouncer.submit('C1', 'topic')
+        debouncer.flush()
+        self.assertEqual(debouncer.pending(), {'C1': 'topic'})
+
+        time.sleep(0.02)
+        debouncer.flush()
+        self.assertEqual(calls, ['topic', 'topic'])
+        self.assertEqual(debouncer.pending(), {})
+
+    def test_retries_back_off(self):
+        calls = []
+        debouncer = Debouncer(lambda key, value: calls.append(value) or False, interval=0.05)
+        debouncer.submit('C1', 'topic')
+
+        debouncer.flush()
+        self.assertEqual(debouncer.flush(), 0)
+        time.sleep(0.06)
+        self.assertEqual(debouncer.flush(), 1)
+        # the second failure doubles the delay
+        time.sleep(0.06)
+        self.assertEqual(debouncer.flush(), 0)
+        time.sleep(0.08)
+        self.assertEqual(debouncer.flush(), 1)
+        self.assertEqual(len(calls), 3)
+
+    def test_dropped_after_max_attempts(self):
+        calls = []
+        debouncer = Debouncer(lambda key, value: calls.append(value) or False, interval=0.001, max_attempts=3)
+        debouncer.submit('C1', 'topic')
+        for _ in range(5):
+            debouncer.flush(force=True)
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(debouncer.pending(), {})
+        self.assertEqual(debouncer.dropped, 1)
+
+        # a later value starts over
+        debouncer.submit('C1', 'other')
+        self.assertEqual(debouncer.pending(), {'C1': 'other'})
+
+    def test_non_retryable_error_is_dropped(self):
+        def set_topic(key, value):
+            raise SlackApiError('channels.setTopic', 'not_in_channel' if key == 'C1' else 'ratelimited')
+
+        debouncer = Debouncer(set_topic)
+        debouncer.submit('C1', 'topic')
+        debouncer.submit('C2', 'topic')
+        self.assertEqual(debouncer.flush(), 2)
+
+        self.assertEqual(debouncer.pending(), {'C2': 'topic'})
+        self.assertEqual(debouncer.dropped, 1)
+
+    def test_failed_mark_is_not_recorded_as_sent(self):
+        responses = [(500, {}), {'ok': False, 'error': 'channel_not_found'}, {'ok': True}]
+        with SlackStandIn(lambda method, params: responses.pop(0)) as stand_in:
+            channel = SlackApiManager('xoxb-test', url=stand_in.url).channel
+            debouncer = read_cursor_coalescer(channel, interval=0.01)
+
+            debouncer.submit('C1', '5.000000')
+            debouncer.flush()
+            self.assertEqual(debouncer.pending(), {'C1': '5.000000'})
+
+            # channel_not_found is not retried
+            time.sleep(0.02)
+            debouncer.flush()
+            self.assertEqual(debouncer.pending(), {})
+
+            debouncer.submit('C1', '5.000000')
+            debouncer.flush()
+            self.assertEqual(stand_in.methods(), ['channels.mark'] * 3)
+            debouncer.submit('C1', '5.000000')
+            self.assertEqual(debouncer.pending(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
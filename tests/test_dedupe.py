@@ -0,0 +1,55 @@
+import time
+import unittest
+
+from slack.dedupe import MessageDeduper
+
+
+def messages(channel: str, start: int, count: int) -> list:
+    return [{'channel': channel, 'ts': f'{start + i}.000100'} for i in range(count)]
+
+
+class TestMessageDeduper(unittest.TestCase):
+    def test_drops_repeated_pages(self):
+        deduper = MessageDeduper(capacity=10_000, window=1_000)
+        page = messages('C1', 0, 100)
+
+        self.assertEqual(len(list(deduper.filter(page))), 100)
+        self.assertEqual(list(deduper.filter(page[50:])), [])
+        self.assertTrue(deduper.seen('C1', '10.000100'))
+        self.assertFalse(deduper.seen('C2', '10.000100'))
+
+    def test_interleaved_consumers_share_state(self):
+        deduper = MessageDeduper(capacity=4_000, window=500)
+        first = deduper.filter(messages('C1', 0, 5_000))
+        second = deduper.filter(messages('C2', 0, 5_000))
+
+        passed = 0
+        for message in first:
+            passed += 1 + (next(second, None) is not None)
+            passed += not deduper.seen('C3', message['ts'])
+
+        self.assertEqual(deduper.stats()['passed'], passed)
+        # 15,000 keys with a capacity of 4,000 rotate the generations
+        self.assertIsNotNone(deduper._previous)
+        self.assertLess(deduper._current.count, deduper.capacity)
+        self.assertLessEqual(len(deduper._older), deduper.window)
+        self.assertLess(len(deduper._recent), deduper.window)
+
+    def test_rotation_reuses_sizing(self):
+        deduper = MessageDeduper(capacity=1_000_000, window=100)
+        current = deduper._current
+
+        start = time.perf_counter()
+        deduper._rotate()
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertIs(deduper._current._patterns, current._patterns)
+        self.assertEqual(deduper._current.blocks, current.blocks)
+        self.assertEqual(deduper._current.count, 0)
+
+    def test_window_larger_than_capacity(self):
+        with self.assertRaises(ValueError):
+            MessageDeduper(capacity=1_000, window=2_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
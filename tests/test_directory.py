@@ -0,0 +1,51 @@
+import unittest
+
+from slack.directory import ChannelDirectory, UserDirectory
+from slack.slack import SlackApiManager
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn, paged
+
+
+def member(user_id: str) -> dict:
+    return {'id': user_id, 'name': user_id.lower(), 'profile': {'email': f'{user_id.lower()}@example.com'}}
+
+
+class TestRefresh(unittest.TestCase):
+    def setUp(self):
+        self.pages = [[member('U1'), member('U2')], [member('U3'), member('U4')], [member('U5'), member('U6')]]
+
+    def test_full_crawl_drops_stale_members(self):
+        with SlackStandIn(paged('members', self.pages[:2])) as stand_in:
+            users = UserDirectory(SlackApiManager('xoxb-test', url=stand_in.url).user)
+            users.update(sum(self.pages, []))
+
+            self.assertEqual(users.refresh(), 2)
+            self.assertEqual(sorted(user['id'] for user in users), ['U1', 'U2', 'U3', 'U4'])
+
+    def test_failed_page_keeps_unseen_members(self):
+        handler = paged('members', self.pages, fail={1: (500, {})})
+        with SlackStandIn(handler) as stand_in:
+            users = UserDirectory(SlackApiManager('xoxb-test', url=stand_in.url).user)
+            users.update(sum(self.pages, []))
+
+            with self.assertRaises(SlackApiError):
+                users.refresh()
+            self.assertEqual(len(users), 6)
+            self.assertIsNotNone(users.by_email('u6@example.com'))
+
+    def test_error_body_keeps_unseen_channels(self):
+        pages = [[{'id': 'C1', 'name': 'general'}], [{'id': 'C2', 'name': 'random'}]]
+        handler = paged('channels', pages, fail={1: {'ok': False, 'error': 'internal_error'}})
+        with SlackStandIn(handler) as stand_in:
+            channels = ChannelDirectory(SlackApiManager('xoxb-test', url=stand_in.url).channel)
+            channels.update(sum(pages, []))
+
+            with self.assertRaises(SlackApiError) as raised:
+                channels.refresh()
+            self.assertEqual(raised.exception.error, 'internal_error')
+            self.assertEqual(channels.resolve('#random'), 'C2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from slack.distributed import DONE, FAILED, PENDING, ExportCoordinator, ExportWorker, WorkQueue
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn
+
+DAY = 86400.0
+
+
+class History:
+    def __init__(self, channels: dict):
+        """
+        channels.list and channels.history over fixed message timestamps, with injectable failures
+        """
+        self.channels = channels
+        self.fail = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, params):
+        if method == 'channels.list':
+            channels = [{'id': channel, 'name': channel.lower(), 'created': 0} for channel in self.channels]
+            return {'ok': True, 'channels': channels, 'response_metadata': {'next_cursor': ''}}
+
+        with self._lock:
+            if self.fail:
+                return self.fail.pop(0)
+        latest = float(params['latest'])
+        oldest = float(params['oldest'])
+        matching = [ts for ts in sorted(self.channels[params['channel']], reverse=True) if oldest < ts < latest]
+        return {'ok': True, 'messages': [{'ts': f'{ts:.6f}'} for ts in matching[:int(params['count'])]]}
+
+
+def exported(queue: WorkQueue) -> list:
+    keys = []
+    for unit in queue.units():
+        for path in unit['checkpoint'].get('files', []):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                keys.extend((message['channel'], message['ts']) for message in map(json.loads, f))
+    return sorted(keys)
+
+
+class TestDistributedExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(os.path.join(self.directory.name, 'queue.sqlite'), lease_seconds=0.6)
+        self.output = os.path.join(self.directory.name, 'out')
+        self.history = History({
+            'C1': [float(ts) for ts in range(1, 26)],
+            'C2': [DAY + ts for ts in range(1, 8)]
+        })
+
+    def tearDown(self):
+        self.queue.close()
+        self.directory.cleanup()
+
+    def worker(self, manager, **kwargs) -> ExportWorker:
+        options = dict(checkpoint_pages=2, count=3, retry_delay=0)
+        options.update(kwargs)
+        return ExportWorker(manager, self.queue, self.output, **options)
+
+    def expected(self) -> list:
+        return sorted((channel, f'{ts:.6f}') for channel, stamps in self.history.channels.items() for ts in stamps)
+
+    def test_replanning_adds_nothing(self):
+        with SlackStandIn(self.history) as stand_in:
+            coordinator = ExportCoordinator(SlackApiManager('xoxb-test', url=stand_in.url), self.queue)
+            planned = coordinator.plan(period=DAY)
+            time.sleep(0.01)
+            self.assertEqual(coordinator.plan(period=DAY), 0)
+
+        ends = {unit['latest'] for unit in self.queue.units()}
+        self.assertGreater(planned, 0)
+        self.assertTrue(all(end % DAY == 0 and end <= time.time() for end in ends))
+
+    def test_export_is_exact(self):
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=2 * DAY, period=DAY)
+            self.assertEqual(self.worker(manager).run(), 4)
+
+        self.assertEqual(exported(self.queue), self.expected())
+
+    def test_failed_page_is_not_completed(self):
+        self.history.fail = [(503, {})] * 1000
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=DAY, period=DAY)
+            self.assertEqual(self.worker(manager, retry_delay=60).run(), 0)
+
+        units = self.queue.units()
+        self.assertEqual([unit['state'] for unit in units], [PENDING, PENDING])
+        self.assertIsNone(self.queue.lease('other'))
+
+    def test_unit_fails_after_max_attempts(self):
+        self.history.fail = [{'ok': False, 'error': 'internal_error'}] * 3
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=DAY, period=DAY)
+            self.assertEqual(self.worker(manager, max_attempts=3).run(), 1)
+
+        self.assertEqual(self.queue.progress(), {PENDING: 0, 'leased': 0, DONE: 1, FAILED: 1})
+        failed = [unit for unit in self.queue.units() if unit['state'] == FAILED]
+        self.assertIn('internal_error', failed[0]['checkpoint']['error'])
+        self.assertIsNone(self.queue.lease('other'))
+
+    def test_stop_releases_the_current_unit(self):
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=DAY, period=DAY)
+            worker = self.worker(manager)
+
+            def stopping(method, params):
+                worker.stop()
+                return self.history(method, params)
+
+            stand_in.handler = stopping
+            self.assertEqual(worker.run(), 0)
+
+        unit = self.queue.lease('other')
+        self.assertIsNotNone(unit)
+        self.assertEqual(unit.attempts, 1)
+        self.assertEqual(unit.checkpoint['messages'], 3)
+
+    def test_retry_resumes_after_failure(self):
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=2 * DAY, period=DAY)
+
+            # second page of the first unit fails once, after three messages were written
+            original = self.history.__call__
+            calls = []
+
+            def flaky(method, params):
+                if method == 'channels.history':
+                    calls.append(params['channel'])
+                    if len(calls) == 2:
+                        return {'ok': False, 'error': 'internal_error'}
+                return original(method, params)
+
+            stand_in.handler = flaky
+            self.assertEqual(self.worker(manager).run(), 4)
+
+        self.assertEqual(exported(self.queue), self.expected())
+        self.assertTrue(all(unit['state'] == DONE for unit in self.queue.units()))
+
+    def test_expired_lease_is_taken_over(self):
+        with SlackStandIn(self.history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            ExportCoordinator(manager, self.queue).plan(latest=DAY, period=DAY)
+
+            dead = self.queue.lease('dead-worker')
+            self.assertIsNotNone(dead)
+            self.assertEqual(self.worker(manager).run(idle_timeout=1), 2)
+
+        self.assertFalse(self.queue.heartbeat(dead, 'dead-worker'))
+        self.assertEqual(exported(self.queue), [key for key in self.expected() if key[0] == 'C1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from urllib.parse import urlencode
+
+from slack.endpoints import ENDPOINTS, encode_params, endpoint_urls
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn
+
+
+class TestEncodeParams(unittest.TestCase):
+    def test_matches_urlencode(self):
+        data = {
+            'channel': 'C0123ABC',
+            'text': 'a b&c=d+e%f/g?h#i\n"q" ~_.- ü ☃ 🚀',
+            'count': 100,
+            'oldest': 1530000000.123456,
+            'empty': '',
+            'negative': -1,
+        }
+        self.assertEqual(encode_params(data), urlencode(data))
+
+    def test_booleans_are_lowercase(self):
+        # urlencode sent True/False; the API documents true/false (and accepts 1/0)
+        self.assertEqual(encode_params({'validate': True, 'exclude_archived': False}),
+                         'validate=true&exclude_archived=false')
+        self.assertEqual(encode_params({'inclusive': 1, 'unreads': 0}), 'inclusive=1&unreads=0')
+
+    def test_none_is_omitted(self):
+        self.assertEqual(encode_params({'cursor': None, 'limit': 0, 'channel': 'C1'}), 'limit=0&channel=C1')
+        self.assertEqual(encode_params({}), '')
+
+    def test_wire_format_of_calls(self):
+        with SlackStandIn(lambda method, params: {'ok': True, 'channel': {}, 'channels': []}) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            manager.channel.create('new channel', validate=True)
+            manager.channel.info('C1')
+            manager.channel.list(cursor=None, exclude_archived=True)
+
+        self.assertEqual(stand_in.calls, [
+            ('channels.create', {'name': 'new channel', 'validate': 'true'}),
+            ('channels.info', {'channel': 'C1', 'include_locale': 'false'}),
+            ('channels.list', {'exclude_archived': 'true', 'exclude_member': 'false', 'limit': '0'}),
+        ])
+
+    def test_endpoint_urls(self):
+        urls = endpoint_urls('http://127.0.0.1:8080/api/')
+        self.assertEqual(set(urls), set(ENDPOINTS))
+        self.assertEqual(urls['users.list'], 'http://127.0.0.1:8080/api/users.list')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+
+from slack.events import EventClient
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn, WebsocketConnection, WebsocketStandIn
+
+try:
+    import websocket  # noqa: F401
+    connect = None
+except ImportError:
+    connect = WebsocketConnection
+
+
+def history(method, params):
+    if method != 'channels.history':
+        return {'ok': True}
+    messages = [{'type': 'message', 'ts': ts, 'text': ts} for ts in ('3.000000', '2.000000')]
+    return {'ok': True, 'messages': [m for m in messages if float(m['ts']) > float(params['oldest'])]}
+
+
+class TestEventClient(unittest.TestCase):
+    def test_reconnect_backfills_missed_messages(self):
+        sessions = [
+            [{'type': 'hello'}, {'type': 'message', 'channel': 'C1', 'ts': '1.000000', 'text': '1'}],
+            [{'type': 'hello'}, {'type': 'message', 'channel': 'C1', 'ts': '3.000000', 'text': '3'},
+             {'envelope_id': 'e1', 'payload': {'event': {'type': 'message', 'channel': 'C1', 'ts': '4.000000'}}}]
+        ]
+        received = []
+        done = threading.Event()
+
+        def on_message(event):
+            received.append(event['ts'])
+            if len(received) == 4:
+                done.set()
+
+        with SlackStandIn(history) as api, WebsocketStandIn(sessions) as ws:
+            manager = SlackApiManager('xoxb-test', url=api.url)
+            client = EventClient(manager, url_provider=lambda: ws.url, connect=connect, backoff=0.01)
+            client.on('message', on_message)
+            with client:
+                self.assertTrue(done.wait(5))
+
+            # 3.0 arrives both through backfill and live, and is dispatched once
+            self.assertEqual(sorted(received), ['1.000000', '2.000000', '3.000000', '4.000000'])
+            self.assertEqual(ws.received, [{'envelope_id': 'e1'}])
+            self.assertIn('channels.history', api.methods())
+
+    def test_failed_backfill_keeps_the_gap(self):
+        failures = [(503, {})]
+
+        def flaky_history(method, params):
+            if method == 'channels.history' and failures:
+                return failures.pop()
+            messages = [{'type': 'message', 'ts': f'{ts}.000000', 'text': str(ts)} for ts in (5, 4, 3, 2)]
+            return {'ok': True, 'messages': [m for m in messages if float(m['ts']) > float(params['oldest'])]}
+
+        live = [{'type': 'hello'}, {'type': 'message', 'channel': 'C1', 'ts': '5.000000', 'text': '5'}]
+        sessions = [[{'type': 'hello'}, {'type': 'message', 'channel': 'C1', 'ts': '1.000000', 'text': '1'}], live, live]
+        received = []
+        done = threading.Event()
+
+        def on_message(event):
+            received.append(event['ts'])
+            if len(received) == 5:
+                done.set()
+
+        with SlackStandIn(flaky_history) as api, WebsocketStandIn(sessions) as ws:
+            client = EventClient(
+                SlackApiManager('xoxb-test', url=api.url), url_provider=lambda: ws.url, connect=connect, backoff=0.01)
+            client.on('message', on_message)
+            with client:
+                self.assertTrue(done.wait(5))
+                time.sleep(0.3)
+
+        self.assertEqual(received, ['1.000000', '2.000000', '3.000000', '4.000000', '5.000000'])
+        self.assertEqual(client.latest, {'C1': '5.000000'})
+
+    def test_stop_interrupts_backoff(self):
+        def unavailable():
+            raise ConnectionError('unavailable')
+
+        client = EventClient(SlackApiManager('xoxb-test'), url_provider=unavailable, backoff=30, max_backoff=60)
+        client.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        client.stop(timeout=5)
+        self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
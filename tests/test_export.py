@@ -0,0 +1,59 @@
+import gzip
+import json
+import tempfile
+import unittest
+
+from slack.export import ExportWriter, export_history
+from slack.slack import SlackApiManager
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn
+
+
+def history(channels: dict, fail: dict):
+    def handler(method, params):
+        channel = params['channel']
+        if channel in fail:
+            return fail[channel]
+        latest = float(params['latest']) if params.get('latest') else float('inf')
+        older = [ts for ts in sorted(channels[channel], reverse=True) if ts < latest]
+        page = older[:int(params['count'])]
+        return {'ok': True, 'messages': [{'ts': f'{ts:.6f}', 'text': 'x'} for ts in page]}
+    return handler
+
+
+def read(files: list) -> list:
+    messages = []
+    for path in files:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            messages.extend(json.loads(line) for line in f)
+    return messages
+
+
+class TestExportHistory(unittest.TestCase):
+    def test_exports_every_page(self):
+        channels = {'C1': [float(i) for i in range(1, 8)], 'C2': [1.0, 2.0]}
+        with tempfile.TemporaryDirectory() as directory, SlackStandIn(history(channels, {})) as stand_in:
+            channel_api = SlackApiManager('xoxb-test', url=stand_in.url).channel
+            with ExportWriter(directory) as writer:
+                written = export_history(channel_api, ['C1', 'C2'], writer, count=3, workers=2)
+
+            self.assertEqual(written, 9)
+            self.assertEqual(len(read(writer.files)), 9)
+
+    def test_failed_channel_is_reported(self):
+        channels = {'C1': [1.0, 2.0, 3.0], 'C2': [1.0], 'C3': [1.0]}
+        fail = {'C2': (503, {}), 'C3': {'ok': False, 'error': 'channel_not_found'}}
+        with tempfile.TemporaryDirectory() as directory, SlackStandIn(history(channels, fail)) as stand_in:
+            channel_api = SlackApiManager('xoxb-test', url=stand_in.url).channel
+            failed = {}
+            with ExportWriter(directory) as writer:
+                with self.assertRaises(SlackApiError):
+                    export_history(channel_api, ['C1', 'C2', 'C3'], writer, count=2, failed=failed)
+
+            self.assertEqual(failed, {'C2': 'HTTP 503', 'C3': 'channel_not_found'})
+            self.assertEqual(len(read(writer.files)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
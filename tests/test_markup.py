@@ -0,0 +1,85 @@
+import unittest
+
+from slack.directory import ChannelDirectory, UserDirectory
+from slack.markup import MarkupRenderer
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn
+
+
+class Workspace:
+    def __init__(self):
+        """
+        users.list, channels.list and usergroups.list of a small team
+        """
+        self.members = [
+            {'id': 'U1', 'name': 'alice', 'profile': {'display_name': 'Alice'}},
+            {'id': 'U2', 'name': 'bob', 'profile': {'real_name': 'Bob B'}},
+        ]
+        self.channels = [{'id': 'C1', 'name': 'general'}]
+        self.usergroups = [{'id': 'S1', 'handle': 'devs'}]
+
+    def __call__(self, method, params):
+        if method == 'usergroups.list':
+            return {'ok': True, 'usergroups': self.usergroups}
+        key = 'members' if method == 'users.list' else 'channels'
+        return {'ok': True, key: getattr(self, key), 'response_metadata': {'next_cursor': ''}}
+
+
+class TestMarkupRenderer(unittest.TestCase):
+    def setUp(self):
+        self.workspace = Workspace()
+        self.stand_in = SlackStandIn(self.workspace)
+        manager = SlackApiManager('xoxb-test', url=self.stand_in.url)
+        self.users = UserDirectory(manager.user)
+        self.channels = ChannelDirectory(manager.channel)
+        self.renderer = MarkupRenderer(self.users, self.channels, {'S2': 'ops'}, manager.usergroups)
+
+    def tearDown(self):
+        self.stand_in.close()
+
+    def render(self, text: str) -> str:
+        return self.renderer.render_messages([{'text': text}])[0]['text']
+
+    def test_user_mentions(self):
+        self.assertEqual(self.render('<@U1> and <@U2>'), '@Alice and @Bob B')
+        self.assertEqual(self.render('<@U9|carol> <@U8>'), '@carol @U8')
+
+    def test_channel_mentions(self):
+        self.assertEqual(self.render('see <#C1> or <#C9|old-name>'), 'see #general or #old-name')
+
+    def test_subteam_mentions(self):
+        text = '<!subteam^S1> <!subteam^S2|@ops-team> <!subteam^S9|@gone> <!here>'
+        self.assertEqual(self.render(text), '@devs @ops @gone @here')
+        self.render('<!subteam^S9>')
+        self.assertEqual(self.stand_in.methods(), ['usergroups.list'])
+
+    def test_links(self):
+        text = '<https://example.com|Example> <https://example.com/a?b=1> <mailto:a@example.com>'
+        self.assertEqual(self.render(text), 'Example https://example.com/a?b=1 a@example.com')
+
+    def test_entities(self):
+        self.assertEqual(self.render('1 &lt; 2 &amp;&amp; 3 &gt; 2 &amp;lt;'), '1 < 2 && 3 > 2 &lt;')
+
+    def test_one_crawl_per_batch(self):
+        messages = [{'user': 'U1', 'text': '<@U2> <#C1>'}, {'user': 'U2', 'text': '<@U1> <@U7>'}]
+        rendered = self.renderer.render_messages(messages)
+
+        self.assertEqual([message['user_name'] for message in rendered], ['Alice', 'Bob B'])
+        self.assertEqual(sorted(self.stand_in.methods()), ['channels.list', 'users.list'])
+
+        # U7 was still unknown after the crawl, so it does not trigger another one
+        self.render('<@U7>')
+        self.assertEqual(self.stand_in.methods().count('users.list'), 1)
+
+    def test_unresolved_retried_after_refresh(self):
+        self.assertEqual(self.render('<@U7>'), '@U7')
+        self.users.refresh()
+
+        self.workspace.members.append({'id': 'U7', 'name': 'dave', 'profile': {}})
+        self.assertEqual(self.render('<@U7>'), '@dave')
+        self.assertEqual(self.stand_in.methods(), ['users.list'] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
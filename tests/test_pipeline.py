@@ -0,0 +1,23 @@
+import unittest
+
+from slack.pipeline import flatten_attachments
+
+
+class TestFlattenAttachments(unittest.TestCase):
+    def test_fallback_per_attachment(self):
+        message = {'attachments': [
+            {'title': 'Build', 'fallback': 'Build failed'},
+            {'fallback': 'Deploy skipped'},
+            {'fallback': 'Alert', 'fields': [{'title': 'host', 'value': 'web-1'}]}
+        ]}
+
+        text = flatten_attachments(message)['attachments_text']
+        self.assertEqual(text.split('\n'), ['Build', 'Deploy skipped', 'Alert', 'host: web-1'])
+
+    def test_without_attachments(self):
+        message = {'text': 'hello'}
+        self.assertIs(flatten_attachments(message), message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+
+from slack.priority import BULK, INTERACTIVE, NORMAL, PriorityRateLimiter
+
+
+def flood(limiter: PriorityRateLimiter, classes: list, seconds: float) -> dict:
+    """
+    Acquire continuously from one thread per entry of classes for seconds
+
+    Returns:
+        dict: tokens granted per class
+    """
+    granted = dict.fromkeys(set(classes), 0)
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def run(name):
+        while time.monotonic() < deadline:
+            limiter.acquire(name)
+            with lock:
+                granted[name] += 1
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in classes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return granted
+
+
+class TestPriorityRateLimiter(unittest.TestCase):
+    def test_higher_classes_go_first(self):
+        limiter = PriorityRateLimiter(20, shares={})
+        limiter.acquire(BULK)
+
+        order = []
+
+        def acquire(name):
+            limiter.acquire(name)
+            order.append(name)
+
+        threads = []
+        for name, count in ((BULK, 3), (NORMAL, 2), (INTERACTIVE, 2)):
+            for _ in range(count):
+                thread = threading.Thread(target=acquire, args=(name,))
+                thread.start()
+                threads.append(thread)
+            # queue every class before the next token, lowest priority first
+            while limiter.stats()[name]['queued'] < count:
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, [INTERACTIVE] * 2 + [NORMAL] * 2 + [BULK] * 3)
+        self.assertEqual(limiter.stats()[BULK]['granted'], 4)
+
+    def test_share_caps_a_class(self):
+        capped = flood(PriorityRateLimiter(200, shares={BULK: 0.5}), [BULK], 0.5)
+        uncapped = flood(PriorityRateLimiter(200, shares={}), [BULK], 0.5)
+
+        self.assertLess(capped[BULK], 70)
+        self.assertGreater(capped[BULK], 35)
+        self.assertGreater(uncapped[BULK], 80)
+
+    def test_capped_higher_class_leaves_room_for_bulk(self):
+        limiter = PriorityRateLimiter(200, shares={INTERACTIVE: 0.5})
+        granted = flood(limiter, [INTERACTIVE] * 4 + [BULK] * 2, 0.5)
+
+        # interactive is held to half of the rate, bulk gets the rest instead of starving
+        total = granted[INTERACTIVE] + granted[BULK]
+        self.assertGreater(total, 80)
+        self.assertGreater(granted[BULK], total * 0.3)
+        self.assertLess(granted[INTERACTIVE], total * 0.7)
+
+    def test_unknown_class(self):
+        with self.assertRaises(ValueError):
+            PriorityRateLimiter(10, shares={'urgent': 0.5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import time
+import unittest
+
+from slack.concurrency import AdaptiveLimiter
+from slack.slack import SlackApiManager, _Api
+from slack.transport import RateLimiter, Transport
+
+from .stand_in import SlackStandIn
+
+
+def slow_users(method, params):
+    if params.get('user') == 'U500':
+        return 500, {}
+    time.sleep(0.05)
+    return {'ok': True, 'user': {'id': params.get('user'), 'padding': 'x' * 100000}}
+
+
+class TestProfiler(unittest.TestCase):
+    def manager(self, url: str) -> SlackApiManager:
+        transport = Transport(rate_limiter=RateLimiter(10), concurrency=AdaptiveLimiter())
+        return SlackApiManager('xoxb-test', transport, url)
+
+    def test_stage_attribution(self):
+        with SlackStandIn(slow_users) as stand_in:
+            manager = self.manager(stand_in.url)
+            with manager.profile() as profiler:
+                for _ in range(3):
+                    manager.user.info('U1')
+                manager.user.info('U500')
+
+        stages = profiler.report()['stages']
+        self.assertEqual(profiler.requests, 4)
+        # requests behind a 10/s limiter wait about 50ms each after the first 50ms response
+        self.assertGreater(stages['wait']['seconds'], 0.1)
+        # three 50ms responses; waits are nested in the send and excluded from it
+        self.assertGreater(stages['send']['seconds'], 0.14)
+        self.assertLess(stages['send']['seconds'], 0.25)
+        self.assertEqual(stages['encode']['count'], 4)
+        self.assertEqual(stages['decode']['count'], 3)
+        self.assertEqual(stages['post_process']['count'], 4)
+        # the 500 is logged once
+        self.assertEqual(stages['log']['count'], 1)
+        self.assertLess(sum(stage['seconds'] for stage in stages.values()), profiler.elapsed)
+
+    def test_stop_restores_originals(self):
+        with SlackStandIn(slow_users) as stand_in:
+            manager = self.manager(stand_in.url)
+            apis = (manager, manager.channel, manager.user, manager.chat)
+            transport = manager.transport
+            before = [dict(vars(api)) for api in apis]
+            limiters = (transport.rate_limiter, transport.concurrency)
+
+            profiler = manager.profile()
+            self.assertIn('_send', vars(manager.user))
+            self.assertIn('acquire', vars(transport.rate_limiter))
+            manager.user.info('U1')
+            profiler.stop()
+
+            self.assertEqual([dict(vars(api)) for api in apis], before)
+            for limiter in limiters:
+                self.assertNotIn('acquire', vars(limiter))
+            self.assertIs(type(manager.user)._send, _Api._send)
+            self.assertNotIn('_profiler', vars(manager))
+
+            # a stopped profiler records nothing more, and a new one can start
+            totals = dict(profiler.totals)
+            self.assertEqual(manager.user.info('U2')['id'], 'U2')
+            self.assertEqual(profiler.totals, totals)
+            second = manager.profile(calls=1)
+            manager.user.info('U3')
+            self.assertTrue(second.wait(5))
+            self.assertNotIn('_profiler', vars(manager))
+
+    def test_stops_after_calls(self):
+        with SlackStandIn(slow_users) as stand_in:
+            manager = self.manager(stand_in.url)
+            profiler = manager.profile(calls=2)
+            manager.user.info('U1')
+            manager.user.info('U2')
+            self.assertTrue(profiler.wait(5))
+
+        self.assertEqual(profiler.requests, 2)
+        self.assertNotIn('_send', vars(manager.user))
+
+
+if __name__ == '__main__':
+    unittest.main()
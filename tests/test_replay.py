@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from slack.batch import BatchDispatcher
+from slack.replay import Cassette, RecordingTransport
+from slack.slack import SlackApiManager
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn
+
+
+def users(method, params):
+    if params.get('user') == 'U404':
+        return {'ok': False, 'error': 'user_not_found'}
+    return {'ok': True, 'user': {'id': params.get('user')}}
+
+
+class TestRecordingTransport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'calls.ndjson')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_batch_errors_through_recorder(self):
+        with SlackStandIn(users) as stand_in:
+            recorder = RecordingTransport(None, self.path)
+            manager = SlackApiManager('xoxb-test', recorder, stand_in.url)
+            with BatchDispatcher(manager, max_workers=4) as batch:
+                results = batch.run([('user.info', ('U1',)), ('user.info', ('U404',)), ('user.info', ('U2',))])
+            recorder.close()
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, SlackApiError)
+        self.assertEqual(results[1].error.error, 'user_not_found')
+        self.assertNotIn('last_response', vars(recorder))
+
+        cassette = Cassette(self.path)
+        self.assertEqual(len(cassette), 3)
+        self.assertEqual(sorted(entry['params']['user'] for entry in cassette.entries), ['U1', 'U2', 'U404'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+
+from slack.search import MessageIndex
+
+
+def message(ts: str, text: str) -> dict:
+    return {'ts': ts, 'text': text}
+
+
+class TestIngest(unittest.TestCase):
+    def test_stream_newest_first(self):
+        index = MessageIndex()
+        items = [('C1', message('1500000003.000100', 'deploy done')),
+                 ('C1', message('1500000002.000100', 'deploy started')),
+                 ('C1', message('1500000001.000100', 'deploy planned'))]
+
+        self.assertEqual(index.ingest_stream(items), 3)
+        self.assertEqual(len(index.search('deploy')), 3)
+
+    def test_older_page_after_newer_page(self):
+        index = MessageIndex()
+        self.assertEqual(index.ingest('C1', [message('1500000004.0', 'a'), message('1500000003.0', 'b')]), 2)
+        self.assertEqual(index.ingest('C1', [message('1500000002.0', 'c'), message('1500000001.0', 'd')]), 2)
+        self.assertEqual(len(index), 4)
+
+    def test_overlap_is_skipped_after_reload(self):
+        index = MessageIndex()
+        index.ingest('C1', [message('1500000002.0', 'hello'), message('1500000001.0', 'hello')])
+        with tempfile.TemporaryDirectory() as path:
+            index.save(path)
+            index.close()
+
+            loaded = MessageIndex.load(path)
+            added = loaded.ingest('C1', [message('1500000003.0', 'hello'), message('1500000002.0', 'hello')])
+            self.assertEqual(added, 1)
+            self.assertEqual(loaded.ingest('C2', [message('1500000002.0', 'hello')]), 1)
+            self.assertEqual(len(loaded.search('hello')), 4)
+            loaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
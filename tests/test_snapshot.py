@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from slack.directory import ChannelDirectory, UserDirectory
+from slack.slack import SlackApiManager
+from slack.snapshot import DirectorySnapshot, warm_start
+
+from .stand_in import SlackStandIn, paged
+
+
+def member(i: int) -> dict:
+    return {'id': f'U{i}', 'name': f'user{i}', 'profile': {'email': f'user{i}@example.com'}}
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'directory.snapshot')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def seed(self, members: list, channels: list):
+        users = UserDirectory()
+        users.update(members)
+        directory = ChannelDirectory()
+        directory.update(channels)
+        DirectorySnapshot(self.path, users, directory).save()
+
+    def test_partial_crawl_keeps_snapshot(self):
+        self.seed([member(i) for i in range(6)], [{'id': 'C1', 'name': 'general'}])
+        pages = [[member(0), member(1)], [member(2), member(3)], [member(4), member(5)]]
+        users = paged('members', pages, fail={1: (503, {})})
+
+        def handler(method, params):
+            if method == 'users.list':
+                return users(method, params)
+            return {'ok': True, 'channels': [{'id': 'C1', 'name': 'general'}]}
+
+        with SlackStandIn(handler) as stand_in:
+            snapshot = warm_start(SlackApiManager('xoxb-test', url=stand_in.url), self.path)
+            self.assertTrue(snapshot.wait(5))
+
+        self.assertEqual(len(snapshot.users), 6)
+        reloaded = DirectorySnapshot(self.path, UserDirectory(), ChannelDirectory())
+        reloaded.load()
+        self.assertEqual(len(reloaded.users), 6)
+
+    def test_reads_during_reconcile(self):
+        old = [member(i) for i in range(0, 4000)]
+        new = [member(i) for i in range(2000, 6000)]
+        self.seed(old, [])
+        pages = [new[i:i + 500] for i in range(0, len(new), 500)]
+        users = paged('members', pages)
+
+        def handler(method, params):
+            if method == 'users.list':
+                return users(method, params)
+            return {'ok': True, 'channels': []}
+
+        errors = []
+        interval = sys.getswitchinterval()
+        # switch threads often so readers land inside refresh()'s updates
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        with SlackStandIn(handler) as stand_in:
+            snapshot = warm_start(SlackApiManager('xoxb-test', url=stand_in.url), self.path)
+
+            def read():
+                while not snapshot.wait(0):
+                    try:
+                        snapshot.users._trie = None
+                        snapshot.users.complete('user1')
+                        snapshot.users.by_email('user1999@example.com')
+                        list(snapshot.users)
+                    except Exception as e:
+                        errors.append(e)
+
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join(30)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(user['id'] for user in snapshot.users), sorted(user['id'] for user in new))
+
+
+if __name__ == '__main__':
+    unittest.main()
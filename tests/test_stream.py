@@ -0,0 +1,83 @@
+import json
+import unittest
+
+from slack.slack import SlackApiManager
+from slack.stream import iter_json_array
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn
+
+BODY = (
+    '{"ok": true, "cache_ts": 1530000000.25, "members": [\n'
+    '  {"id": "U1", "name": "quote \\" and \\\\ backslash", "tz_offset": -25200},\n'
+    '  {"id": "U2", "name": "caf\\u00e9 \\ud83d\\ude80", "real_name": "ünïcode ☃ 🚀", "score": 12345.678e-3},\n'
+    '  {"id": "U3", "deleted": true, "bot": false, "profile": null, "tags": [1, [2, {"a": "]}"}]]},\n'
+    '  "]", 0, -1.5E+3, true, null\n'
+    '], "response_metadata": {"next_cursor": "dXNlcjpVMEc5V0ZYTlo="}}'
+).encode('utf-8')
+
+
+def split(body: bytes, *positions: int) -> list:
+    bounds = (0,) + positions + (len(body),)
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    def check(self, chunks: list):
+        expected = json.loads(b''.join(chunks))
+        meta = {}
+        self.assertEqual(list(iter_json_array(chunks, 'members', meta)), expected.pop('members'))
+        self.assertEqual(meta, expected)
+
+    def test_every_split_point(self):
+        # covers cuts inside strings, escapes, \\u sequences, multi-byte characters, numbers and literals
+        for position in range(1, len(BODY)):
+            with self.subTest(position=position):
+                self.check(split(BODY, position))
+
+    def test_single_byte_chunks(self):
+        self.check([BODY[i:i + 1] for i in range(len(BODY))])
+
+    def test_number_cut_at_every_digit(self):
+        body = b'{"members": [123456.789e-2, 42], "ok": true}'
+        start = body.index(b'1')
+        for position in range(start, start + 12):
+            self.assertEqual(list(iter_json_array(split(body, position), 'members')), [1234.56789, 42])
+
+    def test_empty_array(self):
+        for body in (b'{"ok": true, "members": []}', b'{"members":[ ] ,"ok":true}', b'{}'):
+            meta = {}
+            self.assertEqual(list(iter_json_array([body], 'members', meta)), [])
+
+    def test_error_body(self):
+        meta = {}
+        items = list(iter_json_array([b'{"ok": false, ', b'"error": "invalid_auth"}'], 'members', meta))
+        self.assertEqual(items, [])
+        self.assertEqual(meta, {'ok': False, 'error': 'invalid_auth'})
+
+    def test_truncated_body(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([BODY[:len(BODY) // 2]], 'members'))
+
+
+class TestStreamResponse(unittest.TestCase):
+    def test_streamed_history(self):
+        messages = [{'ts': f'{n}.000000', 'text': 'x' * 1000} for n in range(200)]
+        with SlackStandIn(lambda method, params: {'ok': True, 'messages': messages}) as stand_in:
+            history = SlackApiManager('xoxb-test', url=stand_in.url).channel.history('C1', stream=True)
+            self.assertNotIsInstance(history, list)
+            self.assertEqual(list(history), messages)
+
+    def test_error_body(self):
+        with SlackStandIn(lambda method, params: {'ok': False, 'error': 'channel_not_found'}) as stand_in:
+            channel = SlackApiManager('xoxb-test', url=stand_in.url).channel
+            self.assertEqual(list(channel.history('C1', stream=True)), [])
+
+            with self.assertRaises(SlackApiError) as raised:
+                list(channel.history('C1', stream=True, strict=True))
+            self.assertEqual(raised.exception.error, 'channel_not_found')
+            self.assertEqual(raised.exception.method, 'channels.history')
+
+
+if __name__ == '__main__':
+    unittest.main()
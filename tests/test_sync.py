@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from slack.slack import SlackApiManager
+from slack.sync import ADDED, CHANGED, REMOVED, UserDeltaSync
+from slack.transport import SlackApiError
+
+from .stand_in import SlackStandIn, paged
+
+
+def member(i: int, title: str = '') -> dict:
+    return {'id': f'U{i}', 'name': f'user{i}', 'profile': {'title': title}}
+
+
+class TestUserDeltaSync(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'users.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sync(self, pages: list, fail: dict = None) -> list:
+        with SlackStandIn(paged('members', pages, fail)) as stand_in:
+            sync = UserDeltaSync(SlackApiManager('xoxb-test', url=stand_in.url).user, self.path)
+            return sync.sync()
+
+    def test_changes(self):
+        self.sync([[member(1), member(2)], [member(3)]])
+        changes = self.sync([[member(1, 'lead'), member(3)], [member(4)]])
+
+        kinds = sorted((change.kind, change.user_id) for change in changes)
+        self.assertEqual(kinds, [(ADDED, 'U4'), (CHANGED, 'U1'), (REMOVED, 'U2')])
+        self.assertEqual(next(c for c in changes if c.kind == CHANGED).fields, ('profile.title',))
+
+    def test_failed_page_emits_nothing(self):
+        pages = [[member(1), member(2)], [member(3), member(4)], [member(5), member(6)]]
+        self.sync(pages)
+
+        with self.assertRaises(SlackApiError):
+            self.sync(pages, fail={1: (503, {})})
+        self.assertEqual(self.sync(pages), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
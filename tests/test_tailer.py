@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from slack.slack import SlackApiManager
+from slack.tailer import ChannelTailer
+
+from .stand_in import SlackStandIn
+
+
+class History:
+    def __init__(self, timestamps: list, fail_pages: int):
+        """
+        channels.history over timestamps, answering 503 to the second page while fail_pages lasts
+        """
+        self.messages = [{'type': 'message', 'ts': ts} for ts in sorted(timestamps, key=float, reverse=True)]
+        self.fail_pages = fail_pages
+
+    def __call__(self, method, params):
+        if 'latest' in params and self.fail_pages:
+            self.fail_pages -= 1
+            return 503, {}
+        latest = float(params.get('latest', 'inf'))
+        page = [m for m in self.messages if float(params['oldest']) < float(m['ts']) < latest]
+        return {'ok': True, 'messages': page[:int(params['count'])]}
+
+
+class TestChannelTailer(unittest.TestCase):
+    def test_failed_page_keeps_oldest(self):
+        history = History(['101.0', '102.0', '103.0', '104.0', '105.0'], fail_pages=1)
+        delivered = []
+        with SlackStandIn(history) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            tailer = ChannelTailer(manager, lambda channel, messages: delivered.extend(messages), min_interval=0.01, count=2)
+            tailer.add('C1', oldest='100.0')
+
+            tailer.poll_once()
+            self.assertEqual(delivered, [])
+            self.assertEqual(tailer._channels['C1'].oldest, '100.000000')
+            self.assertEqual(tailer.intervals(), {'C1': tailer.min_interval})
+
+            time.sleep(0.02)
+            tailer.poll_once()
+
+        self.assertEqual([m['ts'] for m in delivered], ['101.0', '102.0', '103.0', '104.0', '105.0'])
+        self.assertEqual(tailer._channels['C1'].oldest, '105.0')
+
+    def test_quiet_channel_backs_off(self):
+        with SlackStandIn(History([], fail_pages=0)) as stand_in:
+            tailer = ChannelTailer(SlackApiManager('xoxb-test', url=stand_in.url), lambda *args: None)
+            tailer.add('C1', oldest='100.0')
+            tailer.poll_once()
+
+        self.assertEqual(tailer.intervals(), {'C1': tailer.min_interval * tailer.decay})
+
+
+if __name__ == '__main__':
+    unittest.main()
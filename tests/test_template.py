@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from slack.endpoints import encode_params
+from slack.slack import SlackApiManager
+from slack.template import MessageTemplate, Slot, render_params
+
+from .stand_in import SlackStandIn
+
+AWKWARD = 'a b&c=d+e%f/g?h#i\n"quoted" \\ <b> ü ☃ 🚀 100%'
+
+
+class TestMessageTemplate(unittest.TestCase):
+    def setUp(self):
+        self.template = MessageTemplate(
+            channel=Slot('channel'),
+            text=Slot('text'),
+            as_user=True,
+            unfurl_links=False,
+            thread_ts=None,
+            parse='full & none',
+            attachments=[{
+                'title': Slot('title'),
+                'text': 'static "text" & ünïcode ☃',
+                'color': 'danger',
+                'fields': [{'title': 'Count', 'value': Slot('count'), 'short': True}],
+            }],
+        )
+
+    def test_matches_encode_params(self):
+        for values in (
+                {'channel': 'C1', 'text': 'hello', 'title': 'CPU', 'count': 3},
+                {'channel': 'C 2', 'text': AWKWARD, 'title': AWKWARD, 'count': AWKWARD},
+                {'channel': 'C3', 'text': '', 'title': None, 'count': [1, {'a': 'b c'}]},
+        ):
+            rendered = self.template.render(**values)
+            self.assertEqual(rendered, encode_params(render_params(self.template, **values)))
+
+    def test_wire_values(self):
+        rendered = self.template.render(channel='C1', text=AWKWARD, title='CPU high', count=2)
+        params = dict(pair.split('=', 1) for pair in rendered.split('&'))
+
+        self.assertNotIn('thread_ts', params)
+        self.assertEqual(params['as_user'], 'true')
+        self.assertEqual(params['unfurl_links'], 'false')
+        self.assertEqual(params['parse'], 'full+%26+none')
+
+    def test_posted_params(self):
+        with SlackStandIn(lambda method, params: {'ok': True, 'ts': '1.0'}) as stand_in:
+            chat = SlackApiManager('xoxb-test', url=stand_in.url).chat
+            chat.postTemplate(self.template, channel='C1', text=AWKWARD, title='CPU "high"', count=7)
+
+        method, params = stand_in.calls[0]
+        self.assertEqual(method, 'chat.postMessage')
+        self.assertEqual(params['text'], AWKWARD)
+        attachment = json.loads(params['attachments'])[0]
+        self.assertEqual(attachment['title'], 'CPU "high"')
+        self.assertEqual(attachment['text'], 'static "text" & ünïcode ☃')
+        self.assertEqual(attachment['fields'][0]['value'], 7)
+
+    def test_missing_slot(self):
+        with self.assertRaises(ValueError):
+            self.template.render(channel='C1', text='hello')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from slack.batch import BatchDispatcher
+from slack.priority import INTERACTIVE, PriorityRateLimiter, traffic_class
+from slack.slack import SlackApiManager
+from slack.tracing import Tracer
+from slack.transport import Transport
+
+from .stand_in import SlackStandIn
+
+
+def ok(method, params):
+    return {'ok': True, 'ts': '1.000000', 'user': {'id': params.get('user')}}
+
+
+class TestPropagation(unittest.TestCase):
+    def manager(self, url: str) -> SlackApiManager:
+        return SlackApiManager('xoxb-test', Transport(rate_limiter=PriorityRateLimiter(1000, burst=100)), url)
+
+    def test_traffic_class_reaches_workers_without_tracer(self):
+        with SlackStandIn(ok) as stand_in:
+            manager = self.manager(stand_in.url)
+            with traffic_class(INTERACTIVE):
+                manager.chat.broadcast(['C1', 'C2', 'C3'], 'hello', max_workers=3)
+                with BatchDispatcher(manager, max_workers=2) as batch:
+                    batch.run([('user.info', ('U1',)), ('user.info', ('U2',))])
+
+        stats = manager.transport.rate_limiter.stats()
+        self.assertEqual(stats[INTERACTIVE]['granted'], 5)
+        self.assertEqual(stats['normal']['granted'], 0)
+
+    def test_spans_keep_their_parent_in_workers(self):
+        with SlackStandIn(ok) as stand_in, Tracer() as tracer:
+            manager = self.manager(stand_in.url)
+            manager.chat.broadcast(['C1', 'C2'], 'hello', max_workers=2)
+
+        spans = {span.name: span for span in tracer.spans}
+        posts = [span for span in tracer.spans if span.name == 'chat.postMessage']
+        self.assertEqual(len(posts), 2)
+        self.assertTrue(all(span.parent is spans['broadcast'] for span in posts))
+
+
+if __name__ == '__main__':
+    unittest.main()
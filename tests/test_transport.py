@@ -0,0 +1,48 @@
+import gc
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from slack.slack import SlackApiManager
+
+from .stand_in import SlackStandIn
+
+
+def echo(method, params):
+    channel = params.get('channel', '')
+    return {'ok': True, 'channel': {'id': channel, 'name': f'name-{channel}'}}
+
+
+class TestTransportThreads(unittest.TestCase):
+    def test_shared_manager_under_many_threads(self):
+        with SlackStandIn(echo) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+
+            def worker(n: int) -> list:
+                mismatched = []
+                for i in range(10):
+                    channel = f'C{n:04d}{i:04d}'
+                    if manager.channel.info(channel).get('id') != channel:
+                        mismatched.append(channel)
+                return mismatched
+
+            with ThreadPoolExecutor(max_workers=64) as executor:
+                mismatched = sum(executor.map(worker, range(64)), [])
+            manager.transport.close()
+
+        self.assertEqual(mismatched, [])
+        self.assertEqual(len(stand_in.calls), 640)
+
+    def test_sessions_released_with_their_threads(self):
+        with SlackStandIn(echo) as stand_in:
+            manager = SlackApiManager('xoxb-test', url=stand_in.url)
+            for _ in range(10):
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    list(executor.map(manager.channel.info, [f'C{i}' for i in range(32)]))
+            gc.collect()
+
+            self.assertLessEqual(len(manager.transport._sessions), 1)
+            manager.transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()